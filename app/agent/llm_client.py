@@ -1,11 +1,16 @@
 import os
-from typing import Optional
+from typing import Callable, List, Optional
 import hashlib
 import time
 from functools import lru_cache
 import threading
+import contextvars
+import zlib
 from collections import defaultdict
 from app.agent.response_policy import ResponseCategory
+from app.core import degradation, tenants
+from app.metrics import ledger, prometheus
+from app.utils import tracing
 
 
 def _get_gemini_key():
@@ -20,6 +25,8 @@ GEMINI_MODELS = [
 
 # Rate limiting tracking
 _request_times = defaultdict(list)
+# (tenant name, model) -> request times, for keys with an llm_share below 1
+_tenant_request_times = defaultdict(list)
 _rate_limit_lock = threading.Lock()
 
 # Model quotas (RPM limits) - increased to maximize API usage
@@ -36,6 +43,12 @@ _cache_ttl = 600
 # Connection reuse
 _client_cache = None
 
+# Set by streaming endpoints: called on the event loop thread with each
+# fragment of a Gemini reply as it arrives
+reply_chunks: contextvars.ContextVar[Optional[Callable[[str], None]]] = contextvars.ContextVar(
+    "reply_chunks", default=None
+)
+
 
 FALLBACK_RESPONSES = {
     ResponseCategory.CONFUSION: [
@@ -109,14 +122,23 @@ _fallback_index = {}
 
 
 def get_fallback_response(category: ResponseCategory) -> str:
+    prometheus.inc("honeypot_llm_fallback_total", category=category.name)
+    ledger.record_fallback()
     idx = _fallback_index.get(category, 0)
     responses = FALLBACK_RESPONSES.get(category, ["Okay."])
     _fallback_index[category] = idx + 1
     return responses[idx % len(responses)]
 
 
+def deterministic_fallback(category: ResponseCategory, seed: str) -> str:
+    """A fallback picked by hashing seed: the same request always gets the same reply."""
+    responses = FALLBACK_RESPONSES.get(category, ["Okay."])
+    return responses[zlib.crc32(seed.encode()) % len(responses)]
+
+
 def should_use_gemini(category: ResponseCategory) -> bool:
-    return bool(_get_gemini_key())
+    # Degraded mode serves replies from the pools (bar a few probe calls)
+    return bool(_get_gemini_key()) and degradation.allow_llm()
 
 
 def _can_make_request(model_name: str) -> bool:
@@ -127,11 +149,26 @@ def _can_make_request(model_name: str) -> bool:
             t for t in _request_times[model_name] if t > minute_ago
         ]
         limit = MODEL_LIMITS.get(model_name, 5)
-        return len(_request_times[model_name]) < limit
+        if len(_request_times[model_name]) >= limit:
+            return False
+        # Each API key may use only its llm_share of the model's RPM
+        tenant = tenants.current_tenant.get()
+        if tenant is None or tenant.llm_share >= 1.0:
+            return True
+        key = (tenant.name, model_name)
+        _tenant_request_times[key] = [t for t in _tenant_request_times[key] if t > minute_ago]
+        # At least one request a minute, however small the share
+        return len(_tenant_request_times[key]) < max(1, int(limit * tenant.llm_share))
 
 def _record_request(model_name: str):
     with _rate_limit_lock:
-        _request_times[model_name].append(time.time())
+        now = time.time()
+        _request_times[model_name].append(now)
+        tenant = tenants.current_tenant.get()
+        if tenant is not None:
+            prometheus.inc("honeypot_tenant_llm_requests_total", tenant=tenant.name, model=model_name)
+            if tenant.llm_share < 1.0:
+                _tenant_request_times[(tenant.name, model_name)].append(now)
 
 def get_quota_status() -> dict:
     with _rate_limit_lock:
@@ -163,7 +200,10 @@ def _get_cached_client():
     if _client_cache is None:
         try:
             from google import genai
-            _client_cache = genai.Client(api_key=_get_gemini_key())
+            # GEMINI_BASE_URL points the SDK at another endpoint (e.g. the load-test fake)
+            base_url = os.getenv("GEMINI_BASE_URL")
+            http_options = {"base_url": base_url} if base_url else None
+            _client_cache = genai.Client(api_key=_get_gemini_key(), http_options=http_options)
         except Exception:
             pass
     return _client_cache
@@ -171,40 +211,69 @@ def _get_cached_client():
 def _cache_key(prompt: str, model: str) -> str:
     return hashlib.md5(f"{model}:{prompt}".encode()).hexdigest()
 
+def _cached_response(cache_key: str) -> Optional[str]:
+    if cache_key in _response_cache:
+        cached_response, timestamp = _response_cache[cache_key]
+        if time.time() - timestamp < _cache_ttl:
+            prometheus.inc("honeypot_llm_cache_total", result="hit")
+            tracing.event("gemini.cache_hit")
+            return cached_response
+        else:
+            del _response_cache[cache_key]
+    prometheus.inc("honeypot_llm_cache_total", result="miss")
+    return None
+
+
+def _generation_config(model_name: str):
+    from google.genai import types
+    return types.GenerateContentConfig(
+        max_output_tokens=60,
+        temperature=0.95,
+        thinking_config=types.ThinkingConfig(thinking_budget=0) if "gemini" in model_name else None,
+    )
+
+
 def call_gemini(prompt: str) -> Optional[str]:
     try:
-        from google.genai import types
         cache_key = _cache_key(prompt, "cached")
-        if cache_key in _response_cache:
-            cached_response, timestamp = _response_cache[cache_key]
-            if time.time() - timestamp < _cache_ttl:
-                return cached_response
-            else:
-                del _response_cache[cache_key]
+        cached_response = _cached_response(cache_key)
+        if cached_response is not None:
+            return cached_response
         client = _get_cached_client()
         if not client:
             return None
         for model_name in GEMINI_MODELS:
             if not _can_make_request(model_name):
+                tracing.event("gemini.skipped", model=model_name, reason="rate_limit")
                 continue
-            try:
-                _record_request(model_name)
-                config = types.GenerateContentConfig(
-                    max_output_tokens=60,
-                    temperature=0.95,
-                    thinking_config=types.ThinkingConfig(thinking_budget=0) if "gemini" in model_name else None,
-                )
-                response = client.models.generate_content(
-                    model=model_name,
-                    contents=prompt,
-                    config=config,
-                )
-                if response and response.text:
-                    result = response.text.strip()
-                    _response_cache[cache_key] = (result, time.time())
-                    return result
-            except Exception:
-                continue
+            with tracing.span("gemini.generate_content", model=model_name) as attempt:
+                call_start = time.perf_counter_ns()
+                try:
+                    _record_request(model_name)
+                    response = client.models.generate_content(
+                        model=model_name,
+                        contents=prompt,
+                        config=_generation_config(model_name),
+                    )
+                    usage = getattr(response, "usage_metadata", None)
+                    ledger.record_llm_call(
+                        model_name,
+                        time.perf_counter_ns() - call_start,
+                        ok=bool(response and response.text),
+                        tokens_in=getattr(usage, "prompt_token_count", None) or 0,
+                        tokens_out=getattr(usage, "candidates_token_count", None) or 0,
+                    )
+                    if response and response.text:
+                        result = response.text.strip()
+                        _response_cache[cache_key] = (result, time.time())
+                        return result
+                    if attempt:
+                        attempt.set(outcome="empty")
+                except Exception as e:
+                    ledger.record_llm_call(model_name, time.perf_counter_ns() - call_start, ok=False)
+                    if attempt:
+                        attempt.set(outcome="error", error=type(e).__name__)
+                    continue
         return None
     except Exception:
         return None
@@ -214,12 +283,90 @@ async def call_gemini_async(prompt: str) -> Optional[str]:
     import asyncio
     try:
         loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, call_gemini, prompt)
+        # run_in_executor does not carry contextvars; copy them so spans
+        # recorded in the worker thread attach to this request's trace
+        ctx = contextvars.copy_context()
+        result = await loop.run_in_executor(None, ctx.run, call_gemini, prompt)
         return result
     except Exception:
         return None
 
 
+def stream_gemini(prompt: str, on_chunk: Callable[[str], None]) -> Optional[str]:
+    """
+    call_gemini over generate_content_stream: each text fragment goes to
+    on_chunk as it arrives. A model failing after it has produced text keeps
+    that text (it has already been sent) instead of falling through to the
+    next model; only complete replies are cached.
+    """
+    try:
+        cache_key = _cache_key(prompt, "cached")
+        cached_response = _cached_response(cache_key)
+        if cached_response is not None:
+            on_chunk(cached_response)
+            return cached_response
+        client = _get_cached_client()
+        if not client:
+            return None
+        for model_name in GEMINI_MODELS:
+            if not _can_make_request(model_name):
+                tracing.event("gemini.skipped", model=model_name, reason="rate_limit")
+                continue
+            with tracing.span("gemini.generate_content_stream", model=model_name) as attempt:
+                call_start = time.perf_counter_ns()
+                parts: List[str] = []
+                usage = None
+                try:
+                    _record_request(model_name)
+                    for chunk in client.models.generate_content_stream(
+                        model=model_name,
+                        contents=prompt,
+                        config=_generation_config(model_name),
+                    ):
+                        usage = getattr(chunk, "usage_metadata", None) or usage
+                        if chunk.text:
+                            parts.append(chunk.text)
+                            on_chunk(chunk.text)
+                    ledger.record_llm_call(
+                        model_name,
+                        time.perf_counter_ns() - call_start,
+                        ok=bool(parts),
+                        tokens_in=getattr(usage, "prompt_token_count", None) or 0,
+                        tokens_out=getattr(usage, "candidates_token_count", None) or 0,
+                    )
+                except Exception as e:
+                    ledger.record_llm_call(model_name, time.perf_counter_ns() - call_start, ok=False)
+                    if attempt:
+                        attempt.set(outcome="error", error=type(e).__name__)
+                    if parts:
+                        return "".join(parts).strip() or None
+                    continue
+                result = "".join(parts).strip()
+                if result:
+                    _response_cache[cache_key] = (result, time.time())
+                    return result
+                if attempt:
+                    attempt.set(outcome="empty")
+        return None
+    except Exception:
+        return None
+
+
+async def stream_gemini_async(prompt: str, on_chunk: Callable[[str], None]) -> Optional[str]:
+    """stream_gemini in the executor; on_chunk is called back on the event loop thread."""
+    import asyncio
+    try:
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+
+        def forward(text: str) -> None:
+            loop.call_soon_threadsafe(on_chunk, text)
+
+        return await loop.run_in_executor(None, ctx.run, stream_gemini, prompt, forward)
+    except Exception:
+        return None
+
+
 def generate_response(
     category: ResponseCategory,
     persona_traits: dict,
@@ -238,5 +385,11 @@ async def generate_response_async(
     if not should_use_gemini(category):
         return get_fallback_response(category)
     prompt = build_prompt(category, persona_traits)
-    gemini_response = await call_gemini_async(prompt)
+    on_chunk = reply_chunks.get()
+    start_ns = time.perf_counter_ns()
+    if on_chunk is not None:
+        gemini_response = await stream_gemini_async(prompt, on_chunk)
+    else:
+        gemini_response = await call_gemini_async(prompt)
+    degradation.observe("llm", time.perf_counter_ns() - start_ns)
     return gemini_response or get_fallback_response(category)
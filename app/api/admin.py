@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.api.auth import verify_admin_key
+from app.core import session_store, session_locks, snapshot
+from app.core.state_machine import FSMState
+from app.core.termination import cleanup_session
+from app.extraction import store as extraction_store
+from app.metrics import counters, ledger
+from app.callback import sender
+from app.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+router = APIRouter(prefix="/admin", dependencies=[Depends(verify_admin_key)])
+
+MAX_PAGE_SIZE = 1000
+
+
+@router.get("/sessions/stats", summary="Session counts per FSM state")
+async def session_stats():
+    return {
+        "active": session_store.active_session_count(),
+        "byState": session_store.count_sessions_by_state(),
+    }
+
+
+@router.get("/sessions", summary="List sessions in one FSM state")
+async def list_sessions(
+    state: FSMState,
+    cursor: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+):
+    session_ids, next_cursor = session_store.list_sessions(state, cursor, limit)
+    return {
+        "state": state.value,
+        "sessions": session_ids,
+        "nextCursor": next_cursor,
+    }
+
+
+@router.get("/sessions/{session_id}", summary="Inspect one session")
+async def inspect_session(session_id: str):
+    if not session_store.session_exists(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {
+        "sessionId": session_id,
+        "state": session_store.get_session_state(session_id).value,
+        "turnCount": counters.get_message_count(session_id),
+        "callbackSent": sender.has_callback_been_sent(session_id),
+        "intelligence": extraction_store.get_all_intelligence(session_id),
+        "cost": ledger.get_session_cost(session_id),
+    }
+
+
+@router.delete("/sessions/{session_id}", summary="Force-evict one session")
+async def evict_session(session_id: str):
+    """
+    Drop all in-memory data for a session and mark it terminated.
+    Waits for an in-flight turn of that session, never for other sessions.
+    """
+    if not session_store.session_exists(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    async with session_locks.get_session_lock(session_id):
+        previous_state = session_store.get_session_state(session_id).value
+        cleanup_session(session_id)
+        snapshot.mark_dirty(session_id)
+    logger.info(f"[{session_id}] Force-evicted by admin (was {previous_state})")
+    return {"sessionId": session_id, "evicted": True, "previousState": previous_state}
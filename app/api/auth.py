@@ -1,18 +1,59 @@
+import hmac
 import os
+from typing import Optional
+
 from fastapi import HTTPException, Header
 
+from app.core import tenants
+
+
+def resolve_tenant(key: Optional[str]) -> tenants.Tenant:
+    """Tenant owning the key; raises if no keys are configured at all."""
+    if not tenants.has_keys():
+        raise RuntimeError("No API keys configured (API_KEY, API_KEYS or API_KEYS_FILE)")
+    tenant = tenants.lookup(key)
+    if tenant is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid API key"
+        )
+    return tenant
+
 
-def get_api_key() -> str:
-    """Get API key from environment, raising if not set."""
-    key = os.getenv("API_KEY")
-    if not key:
-        raise RuntimeError("API_KEY environment variable is not set")
-    return key
+def admit_request(tenant: tenants.Tenant) -> None:
+    """Charge one request to the tenant's token bucket (429 when empty)."""
+    if not tenant.try_acquire():
+        tenants.record_request(tenant, "rate_limited")
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded for this API key",
+            headers={"Retry-After": str(tenant.retry_after())},
+        )
+    tenants.record_request(tenant, "ok")
+
+
+async def verify_api_key(x_api_key: str = Header(...)) -> None:
+    # async: a plain def dependency would be run in the threadpool on every
+    # request, and would set current_tenant in a copied context
+    tenant = resolve_tenant(x_api_key)
+    admit_request(tenant)
+    tenants.current_tenant.set(tenant)
 
 
-def verify_api_key(x_api_key: str = Header(...)) -> None:
-    expected_key = get_api_key()
-    if x_api_key != expected_key:
+async def authenticate_api_key(x_api_key: str = Header(...)) -> None:
+    """verify_api_key for endpoints that call admit_request per item (batches)."""
+    tenants.current_tenant.set(resolve_tenant(x_api_key))
+
+
+async def verify_admin_key(x_api_key: str = Header(...)) -> None:
+    """Admin endpoints use a separate ADMIN_API_KEY; they are disabled without one."""
+    expected_key = os.getenv("ADMIN_API_KEY")
+    if not expected_key:
+        raise HTTPException(
+            status_code=403,
+            detail="Admin API is disabled"
+        )
+    if not hmac.compare_digest(x_api_key.encode(), expected_key.encode()):
         raise HTTPException(
             status_code=401,
             detail="Invalid API key"
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+
+from app.api.auth import admit_request, authenticate_api_key
+from app.api.routes import process_incoming, read_body, validate_incoming
+from app.api.schemas import IncomingRequest
+from app.core import session_token, tenants
+from app.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+# Authenticated once, but each item is charged to the key's rate limit
+router = APIRouter(dependencies=[Depends(authenticate_api_key)])
+
+MAX_BATCH_ITEMS = int(os.getenv("MAX_BATCH_ITEMS", "1000"))
+MAX_BATCH_BYTES = int(os.getenv("MAX_BATCH_BYTES", str(16 * 1024 * 1024)))
+# Sessions of one batch processed at the same time
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "32"))
+
+NDJSON = "application/x-ndjson"
+
+
+def _line(item: Dict[str, Any]) -> bytes:
+    return json.dumps(jsonable_encoder(item), separators=(",", ":")).encode() + b"\n"
+
+
+def _error(index: int, session_id: Any, code: int, detail: Any) -> Dict[str, Any]:
+    return {"index": index, "sessionId": session_id, "status": "error", "error": {"code": code, "detail": detail}}
+
+
+def _parse_lines(body: bytes) -> Tuple["OrderedDict[str, List[Tuple[int, IncomingRequest]]]", List[Dict[str, Any]]]:
+    """
+    Group valid items by session (keeping their order); collect per-line
+    validation errors. Raises 413 before validating anything when the body
+    has more than MAX_BATCH_ITEMS items.
+    """
+    lines = [raw_line for raw_line in body.split(b"\n") if raw_line.strip()]
+    if len(lines) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_ITEMS} items per batch")
+
+    by_session: "OrderedDict[str, List[Tuple[int, IncomingRequest]]]" = OrderedDict()
+    errors = []
+    for index, raw_line in enumerate(lines):
+        try:
+            request = validate_incoming(raw_line)
+        except RequestValidationError as e:
+            errors.append(_error(index, None, 422, e.errors()))
+            continue
+        by_session.setdefault(request.sessionId, []).append((index, request))
+    return by_session, errors
+
+
+@router.post("/messages/batch", summary="Process many messages, streaming NDJSON replies")
+async def batch_endpoint(raw_request: Request) -> StreamingResponse:
+    """
+    Body: one IncomingRequest JSON object per line. Items of different
+    sessions run concurrently; items of the same session run one after the
+    other in body order. Each reply is streamed as one JSON line as soon as
+    it is ready (completion order), tagged with the item's 0-based index:
+    {"index", "sessionId", "status": "success", "reply"} or
+    {"index", "sessionId", "status": "error", "error": {"code", "detail"}}.
+    """
+    if session_token.STATELESS_MODE:
+        raise HTTPException(status_code=400, detail="Batch requests are not available in stateless mode")
+    body = await read_body(raw_request, MAX_BATCH_BYTES)
+    by_session, errors = _parse_lines(body)
+    item_count = len(errors) + sum(len(items) for items in by_session.values())
+
+    tenant = tenants.current_tenant.get()
+    results: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+    limit = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run_session(items: List[Tuple[int, IncomingRequest]]) -> None:
+        async with limit:
+            for index, request in items:
+                try:
+                    admit_request(tenant)
+                    result = await process_incoming(request, Response())
+                    item = {"index": index, "sessionId": request.sessionId, "status": result.status, "reply": result.reply}
+                except HTTPException as e:
+                    item = _error(index, request.sessionId, e.status_code, e.detail)
+                except Exception:
+                    logger.exception("[%s] Batch item %s failed", request.sessionId, index)
+                    item = _error(index, request.sessionId, 500, "Internal error")
+                await results.put(item)
+
+    async def stream():
+        for item in errors:
+            yield _line(item)
+        tasks = [asyncio.create_task(run_session(items)) for items in by_session.values()]
+        try:
+            for _ in range(item_count - len(errors)):
+                yield _line(await results.get())
+        finally:
+            # Client went away mid-stream: stop the remaining items
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type=NDJSON)
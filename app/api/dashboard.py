@@ -0,0 +1,110 @@
+import gzip
+import hashlib
+import os
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Header, Response
+
+from app.utils.logging import get_logger
+
+try:
+    import brotli
+except ImportError:  # listed in requirements.txt; gzip only without it
+    brotli = None
+
+
+logger = get_logger(__name__)
+router = APIRouter()
+
+DASHBOARD_PATH = os.getenv(
+    "DASHBOARD_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", "dashboard.html")
+)
+# The dashboard URL is not content-addressed: let browsers reuse it briefly,
+# then revalidate (a 304 costs no body)
+DASHBOARD_CACHE_SECONDS = int(os.getenv("DASHBOARD_CACHE_SECONDS", "300"))
+
+HTML = "text/html; charset=utf-8"
+
+
+class StaticAsset:
+    """A file read and compressed once, with one strong ETag per encoding."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            identity = f.read()
+        self.digest = hashlib.sha256(identity).hexdigest()[:32]
+        # mtime=0 keeps the gzip bytes (and so the ETag) stable across restarts
+        self.bodies: Dict[str, bytes] = {
+            "identity": identity,
+            "gzip": gzip.compress(identity, compresslevel=9, mtime=0),
+        }
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(identity, quality=11)
+
+    def etag(self, encoding: str) -> str:
+        return f'"{self.digest}"' if encoding == "identity" else f'"{self.digest}-{encoding}"'
+
+    def matches(self, if_none_match: str) -> bool:
+        """If-None-Match uses weak comparison: any encoding of this content matches."""
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*":
+                return True
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag.strip('"').split("-", 1)[0] == self.digest:
+                return True
+        return False
+
+    def choose_encoding(self, accept_encoding: str) -> str:
+        accepted = set()
+        for item in accept_encoding.lower().split(","):
+            coding, _, params = item.strip().partition(";")
+            q = params.strip()
+            if q.startswith("q="):
+                try:
+                    if float(q[2:]) <= 0:
+                        continue
+                except ValueError:
+                    continue
+            accepted.add(coding.strip())
+        for encoding in ("br", "gzip"):
+            if encoding in self.bodies and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+    def response(self, accept_encoding: Optional[str], if_none_match: Optional[str]) -> Response:
+        encoding = self.choose_encoding(accept_encoding or "")
+        headers = {
+            "ETag": self.etag(encoding),
+            "Cache-Control": f"public, max-age={DASHBOARD_CACHE_SECONDS}",
+            "Vary": "Accept-Encoding",
+        }
+        if if_none_match and self.matches(if_none_match):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=self.bodies[encoding], media_type=HTML, headers=headers)
+
+
+_dashboard: Optional[StaticAsset] = None
+
+
+def load_dashboard() -> StaticAsset:
+    """Read and compress the dashboard on first use (or at startup)."""
+    global _dashboard
+    if _dashboard is None:
+        _dashboard = StaticAsset(DASHBOARD_PATH)
+        logger.info(
+            "Dashboard loaded: %s",
+            ", ".join(f"{encoding}={len(body)}B" for encoding, body in _dashboard.bodies.items()),
+        )
+    return _dashboard
+
+
+@router.get("/", summary="Dashboard", response_class=Response)
+async def dashboard(
+    accept_encoding: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
+    return load_dashboard().response(accept_encoding, if_none_match)
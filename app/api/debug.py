@@ -0,0 +1,47 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.api.auth import verify_admin_key
+from app.utils import profiling, tracing
+
+
+router = APIRouter(prefix="/debug", dependencies=[Depends(verify_admin_key)])
+
+
+@router.get("/traces", summary="Recent sampled request traces")
+async def get_traces(
+    output_format: str = Query("json", alias="format", pattern="^(json|chrome)$"),
+    limit: Optional[int] = Query(None, ge=1),
+):
+    """
+    Span trees from the in-memory ring buffer (TRACE_SAMPLE_RATE controls sampling).
+    format=chrome returns trace-event JSON for chrome://tracing or Perfetto.
+    """
+    if output_format == "chrome":
+        return tracing.export_chrome(limit)
+    return {
+        "sampleRate": tracing.TRACE_SAMPLE_RATE,
+        "traces": tracing.export_json(limit),
+    }
+
+
+@router.get("/profile", summary="Profile the running process for N seconds")
+async def get_profile(
+    seconds: float = Query(5.0, gt=0, le=profiling.MAX_PROFILE_SECONDS),
+    output_format: str = Query("pstats", alias="format", pattern="^(pstats|collapsed)$"),
+):
+    """
+    format=pstats runs cProfile on the event loop thread and returns pstats text
+    sorted by cumulative time. format=collapsed samples every thread's stack
+    and returns collapsed stacks for flamegraph.pl or speedscope.
+    Only one profile runs at a time (409 otherwise).
+    """
+    try:
+        if output_format == "collapsed":
+            body = await profiling.profile_collapsed(seconds)
+        else:
+            body = await profiling.profile_cprofile(seconds)
+    except profiling.ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(body)
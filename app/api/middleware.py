@@ -0,0 +1,96 @@
+import time
+
+from app.metrics import prometheus
+from app.utils import capture
+from app.utils.logging import get_logger
+
+
+access_logger = get_logger("app.access")
+
+
+class AccessLogMiddleware:
+    """
+    Pure ASGI access log (no BaseHTTPMiddleware task or response wrapping).
+    Also marks the request start time used for the validation-stage metric.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_ns = time.perf_counter_ns()
+        prometheus.request_start_ns.set(start_ns)
+        status_code = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            access_logger.info(
+                "%s %s %s %.1fms",
+                scope["method"],
+                scope["path"],
+                status_code,
+                (time.perf_counter_ns() - start_ns) / 1e6,
+            )
+
+
+class CaptureMiddleware:
+    """
+    Records raw POST bodies for the message endpoints, with arrival time,
+    status and latency, for later replay (see app.utils.capture).
+    Only installed when CAPTURE_PATH is set.
+    """
+
+    PATHS = frozenset({"/message", "/"})
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        arrival = time.time()
+        start_ns = time.perf_counter_ns()
+        chunks = []
+        size = 0
+        status_code = 500
+
+        async def receive_and_keep():
+            nonlocal size
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                size += len(body)
+                if size <= capture.CAPTURE_MAX_BODY_BYTES:
+                    chunks.append(body)
+            return message
+
+        async def send_with_status(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive_and_keep, send_with_status)
+        finally:
+            if chunks and size <= capture.CAPTURE_MAX_BODY_BYTES:
+                capture.record(
+                    arrival,
+                    scope["path"],
+                    b"".join(chunks),
+                    status_code,
+                    (time.perf_counter_ns() - start_ns) / 1e6,
+                )
@@ -1,19 +1,28 @@
+import json
 import logging
-from fastapi import APIRouter, Depends
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from app.api import schemas
 from app.api.schemas import IncomingRequest, APIResponse
 from app.api.auth import verify_api_key
 
-from app.core import session_store, orchestrator, detection
+from app.core import admission, degradation, session_store, orchestrator, detection, snapshot, session_locks, session_token, history_store, idempotency_store, tenants
 from app.core.state_machine import FSMState
 from app.agent import response_policy, llm_client, persona
-from app.metrics import counters
+from app.metrics import counters, ledger, prometheus
 from app.extraction import extractor
 from app.extraction import store as extraction_store
 from app.core.termination import finalize_intelligence, mark_callback_sent, terminate_session, cleanup_session
 from app.callback.payload_builder import build_callback_payload
 from app.callback.sender import send_callback
 from app.utils.logging import get_logger
-from fastapi.responses import JSONResponse
+from app.utils import tracing
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi import Request
 
 
@@ -23,11 +32,160 @@ router = APIRouter()
 MIN_TURNS_FOR_FINALIZATION = 6
 MIN_INTEL_TYPES = 2
 
+# Request bodies above this are rejected (413) before any parsing. The
+# default fits the largest schema-valid body: the message plus
+# MAX_HISTORY_ITEMS history items at their length limits, every character
+# \uXXXX-escaped (12 bytes for a surrogate pair, as json.dumps writes
+# astral characters), plus room for keys, numbers and whitespace.
+_MAX_ESCAPED_CHAR_BYTES = 12
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", str(
+    (schemas.MAX_HISTORY_ITEMS + 1)
+    * (schemas.MAX_MESSAGE_LENGTH + schemas.MAX_SENDER_LENGTH)
+    * _MAX_ESCAPED_CHAR_BYTES
+    + 64 * 1024
+)))
+
+# Constant replies, JSON-encoded once
+_ENCODED_REPLIES = {
+    reply: APIResponse(status="success", reply=reply).model_dump_json().encode()
+    for reply in ("Thank you.", "Okay.")
+}
+
+
+def _inline_refs(schema: Any, defs: Dict[str, Any]) -> Any:
+    if isinstance(schema, dict):
+        if "$ref" in schema:
+            return _inline_refs(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+        return {k: _inline_refs(v, defs) for k, v in schema.items() if k != "$defs"}
+    if isinstance(schema, list):
+        return [_inline_refs(v, defs) for v in schema]
+    return schema
+
+
+def _request_body_doc() -> Dict[str, Any]:
+    schema = IncomingRequest.model_json_schema()
+    return {"requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": _inline_refs(schema, schema.get("$defs", {}))}},
+    }}
+
+
+# The message endpoints read raw bytes, so the body schema is documented explicitly
+MESSAGE_OPENAPI_EXTRA = _request_body_doc()
+
+
+# -----------------------------
+# Raw body decode / encode
+# -----------------------------
+
+async def read_body(raw_request: Request, limit: int) -> bytes:
+    """Read the request body, answering 413 as soon as it exceeds `limit` bytes."""
+    declared = raw_request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > limit:
+        raise HTTPException(status_code=413, detail="Request body too large")
+    chunks = []
+    size = 0
+    async for chunk in raw_request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise HTTPException(status_code=413, detail="Request body too large")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def read_incoming(raw_request: Request) -> IncomingRequest:
+    """
+    Read the body with a size cap and validate it straight from bytes
+    (IncomingRequest.model_validate_json). Errors come back as the same 422
+    payload FastAPI produces for a declared body parameter.
+    """
+    body = await read_body(raw_request, MAX_REQUEST_BYTES)
+    content_type = raw_request.headers.get("content-type")
+    if content_type is not None and not _is_json_media_type(content_type):
+        # FastAPI passes such a body to validation as a string, not JSON
+        try:
+            IncomingRequest.model_validate(body.decode("utf-8", "replace"), from_attributes=True)
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors()], body=body,
+            )
+    return validate_incoming(body)
+
+
+def _is_json_media_type(content_type: str) -> bool:
+    """application/json or application/*+json, parameters ignored (FastAPI's rule)."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    maintype, _, subtype = media_type.partition("/")
+    return maintype == "application" and (subtype == "json" or subtype.endswith("+json"))
+
+
+def validate_incoming(body: bytes) -> IncomingRequest:
+    if not body:
+        raise RequestValidationError(
+            [{"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}]
+        )
+    try:
+        return IncomingRequest.model_validate_json(body)
+    except ValidationError as e:
+        errors = e.errors()
+    if any(error["type"] == "json_invalid" for error in errors):
+        try:
+            json.loads(body)
+        except json.JSONDecodeError as decode_error:
+            raise RequestValidationError([{
+                "type": "json_invalid",
+                "loc": ("body", decode_error.pos),
+                "msg": "JSON decode error",
+                "input": {},
+                "ctx": {"error": decode_error.msg},
+            }], body=body.decode("utf-8", "replace"))
+    raise RequestValidationError(
+        [{**error, "loc": ("body", *error["loc"])} for error in errors], body=body,
+    )
+
+
+def encode_reply(result: APIResponse, response: Response) -> Response:
+    """Serialize the reply to bytes, keeping headers set on the injected response."""
+    content = _ENCODED_REPLIES.get(result.reply) if result.status == "success" else None
+    if content is None:
+        content = result.model_dump_json().encode()
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return Response(content=content, media_type="application/json", headers=headers)
+
 
 @router.get("/health", summary="Health Check")
-def health_check():
+async def health_check():
     """Simple health check endpoint for monitoring and testing platforms"""
-    return {"status": "healthy", "service": "agentic-honeypot", "version": "1.0.0"}
+    return {
+        "status": "healthy",
+        "service": "agentic-honeypot",
+        "version": "1.0.0",
+        **degradation.status(),
+    }
+
+
+@router.get("/metrics", summary="Prometheus Metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus text exposition of stage latencies, counters and session gauges"""
+    # async: gauges read live stores that are only safe to touch on the event loop
+    if not prometheus.ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(
+        prometheus.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+prometheus.register_gauge(
+    "honeypot_sessions",
+    lambda: {(("state", state),): count for state, count in session_store.count_sessions_by_state().items()},
+    "Sessions currently in each FSM state",
+)
+prometheus.register_gauge(
+    "honeypot_llm_requests_last_minute",
+    lambda: {(("model", model),): info["requests_last_minute"] for model, info in llm_client.get_quota_status().items()},
+    "Gemini requests per model in the last minute",
+)
 
 
 @router.options("/message", summary="CORS Preflight")
@@ -130,15 +288,260 @@ def build_agent_notes(
         notes.append("IFSC code captured.")
 
     notes.append(f"Engaged for {turn_count} turns.")
+    if ledger.LEDGER_IN_AGENT_NOTES:
+        notes.append(ledger.format_for_notes(session_id))
     return " ".join(notes)
 
 
+@asynccontextmanager
+async def session_turn(session_id: str):
+    """
+    Envelope around one conversation turn. Raises admission.Overloaded
+    when the turn is shed.
+    """
+    # Serialize turns of the same session: the LLM await would otherwise
+    # let a concurrent turn interleave counters, FSM writes and the callback.
+    lock = session_locks.get_session_lock(session_id)
+    ledger_token = ledger.current_session.set(session_id)
+    with tracing.trace("message", session_id=session_id):
+        with tracing.span("session_lock.wait"):
+            await lock.acquire()
+        try:
+            # Admitted only once the session lock is held: turns queued behind
+            # another turn of their session must not hold admission slots
+            async with admission.admit():
+                turn_start = time.perf_counter_ns()
+                try:
+                    yield
+                finally:
+                    # Every turn may touch session, counter, intelligence or callback state
+                    snapshot.mark_dirty(session_id)
+                    prometheus.observe_stage("turn", turn_start)
+        finally:
+            lock.release()
+            ledger.current_session.reset(ledger_token)
+
+
 @router.post(
     "/message",
     response_model=APIResponse,
     dependencies=[Depends(verify_api_key)],
+    openapi_extra=MESSAGE_OPENAPI_EXTRA,
 )
-async def handle_message(request: IncomingRequest) -> APIResponse:
+async def message_endpoint(
+    raw_request: Request,
+    response: Response,
+    x_session_token: Optional[str] = Header(None),
+    x_history_seq: Optional[int] = Header(None),
+    x_history_hash: Optional[str] = Header(None),
+    idempotency_key: Optional[str] = Header(None),
+) -> Response:
+    request = await read_incoming(raw_request)
+    prometheus.observe_validation()
+    result = await process_incoming(
+        request, response, x_session_token, x_history_seq, x_history_hash, idempotency_key
+    )
+    return encode_reply(result, response)
+
+
+async def process_incoming(
+    request: IncomingRequest,
+    response: Response,
+    x_session_token: Optional[str] = None,
+    x_history_seq: Optional[int] = None,
+    x_history_hash: Optional[str] = None,
+    idempotency_key: Optional[str] = None,
+) -> APIResponse:
+    """Route a validated request through the mode-specific turn handling (admission control is in session_turn)."""
+    try:
+        return await _route_turn(
+            request, response, x_session_token, x_history_seq, x_history_hash, idempotency_key
+        )
+    except admission.Overloaded as e:
+        return _shed_reply(request, str(e))
+
+
+def _shed_reply(request: IncomingRequest, reason: str) -> APIResponse:
+    """
+    Answer a turn turned away by admission control. Nothing is recorded for
+    the session: the canned reply (or 503) costs no detection, state or LLM.
+    """
+    logger.debug("[%s] Turn shed by admission control (%s)", request.sessionId, reason)
+    if admission.ADMISSION_SHED_MODE == "reject":
+        raise HTTPException(
+            status_code=503,
+            detail="Server overloaded, retry later",
+            headers={"Retry-After": str(admission.ADMISSION_RETRY_AFTER_SECONDS)},
+        )
+    reply = llm_client.deterministic_fallback(
+        response_policy.ResponseCategory.DELAY_TACTIC,
+        f"{request.sessionId}:{request.message.timestamp}",
+    )
+    return APIResponse(status="success", reply=reply)
+
+
+async def _route_turn(
+    request: IncomingRequest,
+    response: Response,
+    x_session_token: Optional[str],
+    x_history_seq: Optional[int],
+    x_history_hash: Optional[str],
+    idempotency_key: Optional[str],
+) -> APIResponse:
+    _claim_session(request.sessionId)
+    if history_store.SERVER_HISTORY and not session_token.STATELESS_MODE:
+        return await _handle_with_server_history(
+            request, response, x_history_seq, x_history_hash, idempotency_key
+        )
+    if not session_token.STATELESS_MODE:
+        return await handle_message(request, idempotency_key)
+
+    # Stateless mode: state arrives in the token, lives in the stores for the
+    # duration of the turn only, and leaves in a freshly signed token.
+    session_id = request.sessionId
+    async with session_turn(session_id):
+        try:
+            session_token.restore_session(session_id, x_session_token)
+        except session_token.InvalidSessionToken as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        try:
+            return await _process_message(request)
+        finally:
+            response.headers[session_token.SESSION_TOKEN_HEADER] = session_token.issue_token(session_id)
+
+
+def _claim_session(session_id: str) -> None:
+    """Keep each session to the API key that opened it, within that key's session cap."""
+    tenant = tenants.current_tenant.get()
+    # Stateless sessions live in their tokens, not on this node
+    if tenant is None or session_token.STATELESS_MODE:
+        return
+    if not tenants.owns_session(tenant, session_id):
+        tenants.record_request(tenant, "foreign_session")
+        raise HTTPException(status_code=403, detail="Session belongs to another API key")
+    if not tenants.claim_session(tenant, session_id):
+        tenants.record_request(tenant, "session_cap")
+        raise HTTPException(status_code=429, detail="Concurrent session limit reached for this API key")
+
+
+async def handle_message(request: IncomingRequest, idempotency_key: Optional[str] = None) -> APIResponse:
+    session_id = request.sessionId
+    key = _turn_key(request, idempotency_key)
+    async with session_turn(session_id):
+        result = _replayed(session_id, key)
+        if result is None:
+            result = await _process_message(request)
+            _remember(session_id, key, result)
+        return result
+
+
+def _turn_key(request: IncomingRequest, idempotency_key: Optional[str]) -> bytes:
+    return idempotency_store.request_key(request.message.timestamp, request.message.text, idempotency_key)
+
+
+def _replayed(session_id: str, key: bytes) -> Optional[APIResponse]:
+    """
+    The reply already given to an earlier attempt of this turn (an upstream
+    retry), or None. Checked under the session lock, so a retry racing the
+    original waits for it and then gets its reply.
+    """
+    cached = idempotency_store.lookup(session_id, key)
+    if cached is None:
+        return None
+    prometheus.inc("honeypot_idempotent_replays_total")
+    logger.info("[%s] Replaying reply for a retried request", session_id)
+    return APIResponse(status=cached[0], reply=cached[1])
+
+
+def _remember(session_id: str, key: bytes, result: APIResponse) -> None:
+    # A terminated session has been cleaned up; retries get the terminal no-op reply
+    if not session_store.is_session_terminated(session_id):
+        idempotency_store.remember(session_id, key, result.status, result.reply)
+
+
+async def _handle_with_server_history(
+    request: IncomingRequest,
+    response: Response,
+    history_seq: Optional[int],
+    history_hash: Optional[str],
+    idempotency_key: Optional[str] = None,
+) -> APIResponse:
+    """
+    Delta-only turns: the server keeps the conversation history, the client
+    sends the new message and the x-history-seq (optionally x-history-hash)
+    it last received. A mismatch answers 409 with the server's position so
+    the client can resend its full conversationHistory, which re-seeds the store.
+    """
+    session_id = request.sessionId
+    key = _turn_key(request, idempotency_key)
+    async with session_turn(session_id):
+        # A retry carries the position from before its first attempt: replay
+        # it before the position check would reject it as out of sync
+        result = _replayed(session_id, key)
+        if result is None:
+            if (
+                not request.conversationHistory
+                and history_seq is not None
+                and not history_store.matches(session_id, history_seq, history_hash)
+            ):
+                seq, digest = history_store.get_position(session_id)
+                raise HTTPException(
+                    status_code=409,
+                    detail="History out of sync; resend the full conversationHistory",
+                    headers={
+                        history_store.HISTORY_SEQ_HEADER: str(seq),
+                        history_store.HISTORY_HASH_HEADER: digest,
+                    },
+                )
+            result = await _history_turn(request)
+            _remember(session_id, key, result)
+        seq, digest = history_store.get_position(session_id)
+        response.headers[history_store.HISTORY_SEQ_HEADER] = str(seq)
+        response.headers[history_store.HISTORY_HASH_HEADER] = digest
+        return result
+
+
+async def handle_message_with_history(request: IncomingRequest) -> APIResponse:
+    """handle_message for channels that always keep the history server-side (WebSocket)."""
+    session_id = request.sessionId
+    key = _turn_key(request, None)
+    _claim_session(session_id)
+    try:
+        async with session_turn(session_id):
+            result = _replayed(session_id, key)
+            if result is None:
+                result = await _history_turn(request)
+                _remember(session_id, key, result)
+            return result
+    except admission.Overloaded as e:
+        return _shed_reply(request, str(e))
+
+
+async def _history_turn(request: IncomingRequest) -> APIResponse:
+    """Run a turn against the stored history window and extend it. Caller holds the session lock."""
+    session_id = request.sessionId
+    if request.conversationHistory:
+        history_store.replace(
+            session_id, [(msg.sender, msg.text) for msg in request.conversationHistory]
+        )
+
+    result = await _process_message(request, history_store.get_history(session_id))
+
+    # A terminated session has been cleaned up; don't resurrect its history
+    if not session_store.is_session_terminated(session_id):
+        history_store.append(session_id, request.message.sender, request.message.text)
+        history_store.append(session_id, "user", result.reply)
+    return result
+
+
+async def _process_message(
+    request: IncomingRequest,
+    history: Optional[List[Dict[str, str]]] = None,
+) -> APIResponse:
+    """
+    One conversation turn. `history` overrides request.conversationHistory
+    (server-side history mode passes the stored window).
+    """
     session_id = request.sessionId
     incoming_text = request.message.text
 
@@ -146,11 +549,11 @@ async def handle_message(request: IncomingRequest) -> APIResponse:
     session_store.create_session(session_id)
     current_state = session_store.get_session_state(session_id)
     
-    logger.info(f"[{session_id}] Message received, state={current_state.value}")
+    logger.info("[%s] Message received, state=%s", session_id, current_state.value)
 
     # 2. Terminal guard (hard stop, prevents double callback)
     if orchestrator.is_terminal_state(current_state):
-        logger.debug(f"[{session_id}] Terminal state, returning no-op")
+        logger.debug("[%s] Terminal state, returning no-op", session_id)
         return APIResponse(status="success", reply="Thank you.")
 
     # 3. Increment metrics
@@ -158,16 +561,22 @@ async def handle_message(request: IncomingRequest) -> APIResponse:
     turn_count = counters.get_message_count(session_id)
 
     # 4. Detection (pure analysis with conversation history context)
-    history_dicts = [
-        {"text": msg.text, "sender": msg.sender}
-        for msg in request.conversationHistory
-    ]
-    detection_result = detection.analyze_with_history(
-        current_message=incoming_text,
-        conversation_history=history_dicts,
-    )
+    stage_start = time.perf_counter_ns()
+    with tracing.span("detection"):
+        history_dicts = history if history is not None else [
+            {"text": msg.text, "sender": msg.sender}
+            for msg in request.conversationHistory
+        ]
+        if degradation.is_degraded():
+            history_dicts = history_dicts[max(len(history_dicts) - degradation.DEGRADE_HISTORY_DEPTH, 0):]
+        detection_result = detection.analyze_with_history(
+            current_message=incoming_text,
+            conversation_history=history_dicts,
+        )
+    prometheus.observe_stage("detection", stage_start)
 
     # 5. FSM transition decision
+    stage_start = time.perf_counter_ns()
     next_state = orchestrator.next_state(
         current_state=current_state,
         detection_result=detection_result,
@@ -175,17 +584,18 @@ async def handle_message(request: IncomingRequest) -> APIResponse:
     )
 
     if next_state != current_state:
-        logger.info(f"[{session_id}] State transition: {current_state.value} -> {next_state.value}")
+        logger.info("[%s] State transition: %s -> %s", session_id, current_state.value, next_state.value)
         session_store.set_session_state(session_id, next_state)
         current_state = next_state
+    prometheus.observe_stage("fsm_transition", stage_start)
 
     # 6. Agent engaged behavior
     if current_state == FSMState.AGENT_ENGAGED:
+        stage_start = time.perf_counter_ns()
         extractor.extract_intelligence_from_message(session_id, incoming_text)
 
         # ---- Finalization gate (routes-level) ----
-        intel = extraction_store.get_all_intelligence(session_id)
-        intel_type_count = sum(1 for v in intel.values() if v)
+        intel_type_count = extraction_store.count_intelligence_types(session_id)
 
         if (
             turn_count >= MIN_TURNS_FOR_FINALIZATION
@@ -193,12 +603,14 @@ async def handle_message(request: IncomingRequest) -> APIResponse:
         ):
             new_state = finalize_intelligence(current_state)
             if new_state != current_state:
-                logger.info(f"[{session_id}] Intelligence finalized, types={intel_type_count}")
+                logger.info("[%s] Intelligence finalized, types=%s", session_id, intel_type_count)
                 session_store.set_session_state(session_id, new_state)
                 current_state = new_state
+        prometheus.observe_stage("extraction", stage_start)
 
     # 7. Callback (exactly once)
     if current_state == FSMState.INTEL_READY:
+        stage_start = time.perf_counter_ns()
         intelligence = extraction_store.get_all_intelligence(session_id)
 
         agent_notes = build_agent_notes(
@@ -219,17 +631,22 @@ async def handle_message(request: IncomingRequest) -> APIResponse:
             agent_notes=agent_notes,
         )
 
-        if send_callback(payload):
-            logger.info(f"[{session_id}] Callback sent successfully")
+        with tracing.span("callback"):
+            callback_sent = send_callback(payload)
+
+        if callback_sent:
+            logger.info("[%s] Callback sent successfully", session_id)
             new_state = mark_callback_sent(current_state)
             session_store.set_session_state(session_id, new_state)
             new_state = terminate_session(new_state)
             session_store.set_session_state(session_id, new_state)
+            logger.info("[%s] %s", session_id, ledger.format_for_notes(session_id))
             # Clean up session data to prevent memory leaks
             cleanup_session(session_id)
-            logger.info(f"[{session_id}] Session terminated and cleaned up")
+            logger.info("[%s] Session terminated and cleaned up", session_id)
         else:
-            logger.warning(f"[{session_id}] Callback failed")
+            logger.warning("[%s] Callback failed", session_id)
+        prometheus.observe_stage("callback", stage_start)
 
         return APIResponse(status="success", reply="Thank you.")
 
@@ -259,10 +676,13 @@ async def handle_message(request: IncomingRequest) -> APIResponse:
             scammer_showing_urgency=scammer_showing_urgency,
         )
 
-        reply_text = await llm_client.generate_response_async(
-            category=category,
-            persona_traits={**persona.PERSONA_TRAITS, **drift_traits},
-        )
+        stage_start = time.perf_counter_ns()
+        with tracing.span("llm", category=category.name):
+            reply_text = await llm_client.generate_response_async(
+                category=category,
+                persona_traits={**persona.PERSONA_TRAITS, **drift_traits},
+            )
+        prometheus.observe_stage("llm", stage_start)
 
         return APIResponse(status="success", reply=reply_text)
 
@@ -0,0 +1,113 @@
+import asyncio
+import json
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.agent import llm_client
+from app.api.auth import verify_api_key
+from app.api.routes import MESSAGE_OPENAPI_EXTRA, process_incoming, read_incoming
+from app.metrics import prometheus
+from app.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+router = APIRouter()
+
+EVENT_STREAM = "text/event-stream"
+
+
+def _event(name: str, data: Any) -> bytes:
+    payload = data if isinstance(data, str) else json.dumps(data, separators=(",", ":"))
+    return f"event: {name}\ndata: {payload}\n\n".encode()
+
+
+async def _next_chunk(chunks: "asyncio.Queue[str]", turn: asyncio.Task) -> Optional[str]:
+    """Next reply fragment, or None once the turn is over and every fragment has been taken."""
+    while chunks.empty():
+        if turn.done():
+            return None
+        get = asyncio.ensure_future(chunks.get())
+        await asyncio.wait({turn, get}, return_when=asyncio.FIRST_COMPLETED)
+        if get.done():
+            return get.result()
+        get.cancel()
+    return chunks.get_nowait()
+
+
+@router.post(
+    "/message/stream",
+    dependencies=[Depends(verify_api_key)],
+    openapi_extra=MESSAGE_OPENAPI_EXTRA,
+    summary="Process a message, streaming the reply as server-sent events",
+)
+async def stream_endpoint(
+    raw_request: Request,
+    x_session_token: Optional[str] = Header(None),
+    x_history_seq: Optional[int] = Header(None),
+    x_history_hash: Optional[str] = Header(None),
+    idempotency_key: Optional[str] = Header(None),
+) -> Response:
+    """
+    Same turn as POST /message, answered as text/event-stream:
+    - "chunk" events ({"text"}) carry the persona reply as Gemini produces it;
+      fallback and fixed replies arrive as a single chunk
+    - "headers" ({name: value}) carries the headers /message would have set
+      (session token, history position), which are only known at turn end
+    - "reply" is the final APIResponse envelope; its reply field is
+      authoritative (chunks are not whitespace-trimmed)
+    - "error" ({"code", "detail"}) if the turn fails after streaming started
+    Errors raised before the first chunk (409 history mismatch, 400 bad
+    token) are answered as normal HTTP errors.
+    """
+    request = await read_incoming(raw_request)
+    prometheus.observe_validation()
+
+    chunks: "asyncio.Queue[str]" = asyncio.Queue()
+    turn_response = Response()
+    token = llm_client.reply_chunks.set(chunks.put_nowait)
+    try:
+        # The task copies the current context, callback included
+        turn = asyncio.create_task(
+            process_incoming(
+                request, turn_response, x_session_token, x_history_seq, x_history_hash, idempotency_key
+            )
+        )
+    finally:
+        llm_client.reply_chunks.reset(token)
+
+    first = await _next_chunk(chunks, turn)
+    if first is None:
+        turn.result()
+
+    async def events():
+        text = first
+        streamed = False
+        while text is not None:
+            yield _event("chunk", {"text": text})
+            streamed = True
+            text = await _next_chunk(chunks, turn)
+        try:
+            result = turn.result()
+        except HTTPException as e:
+            yield _event("error", {"code": e.status_code, "detail": e.detail})
+            return
+        except Exception:
+            logger.exception("[%s] Streaming turn failed", request.sessionId)
+            yield _event("error", {"code": 500, "detail": "Internal error"})
+            return
+        if not streamed:
+            yield _event("chunk", {"text": result.reply})
+        headers = {
+            name: value for name, value in turn_response.headers.items() if name != "content-length"
+        }
+        if headers:
+            yield _event("headers", headers)
+        yield _event("reply", result.model_dump_json())
+
+    return StreamingResponse(
+        events(),
+        media_type=EVENT_STREAM,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
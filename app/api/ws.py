@@ -0,0 +1,143 @@
+import asyncio
+import json
+import os
+from typing import Any, Dict
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+
+from app.api.auth import admit_request
+from app.api.routes import MAX_REQUEST_BYTES, handle_message_with_history
+from app.api.schemas import IncomingRequest, MAX_SESSION_ID_LENGTH
+from app.core import session_store, session_token, tenants
+from app.metrics import prometheus
+from app.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+router = APIRouter()
+
+WS_IDLE_TIMEOUT_SECONDS = float(os.getenv("WS_IDLE_TIMEOUT_SECONDS", "300"))
+WS_MAX_CONNECTIONS = int(os.getenv("WS_MAX_CONNECTIONS", "10000"))
+WS_MAX_FRAME_BYTES = int(os.getenv("WS_MAX_FRAME_BYTES", str(MAX_REQUEST_BYTES)))
+
+# Close codes (RFC 6455 section 7.4.1)
+CLOSE_NORMAL = 1000
+CLOSE_GOING_AWAY = 1001
+CLOSE_POLICY = 1008
+CLOSE_TOO_BIG = 1009
+CLOSE_TRY_AGAIN = 1013
+
+_open_connections = 0
+
+prometheus.register_gauge(
+    "honeypot_ws_connections",
+    lambda: {(): _open_connections},
+    "Open WebSocket conversation channels",
+)
+prometheus.describe("honeypot_ws_messages_total", "WebSocket frames handled by result")
+
+
+def open_connection_count() -> int:
+    return _open_connections
+
+
+def _error(code: int, detail: Any) -> str:
+    return json.dumps(jsonable_encoder({"status": "error", "error": {"code": code, "detail": detail}}))
+
+
+def _parse_frame(session_id: str, data: str) -> IncomingRequest:
+    """A frame is a /message body without (or with the same) sessionId."""
+    payload = json.loads(data)
+    if not isinstance(payload, dict):
+        raise ValueError("Frame must be a JSON object")
+    if payload.setdefault("sessionId", session_id) != session_id:
+        raise ValueError("sessionId does not match the one bound to this channel")
+    return IncomingRequest.model_validate(payload)
+
+
+async def _turn(websocket: WebSocket, tenant: tenants.Tenant, session_id: str, data: str) -> bool:
+    """Handle one frame; returns False once the session has terminated."""
+    try:
+        request = _parse_frame(session_id, data)
+    except ValidationError as e:
+        prometheus.inc("honeypot_ws_messages_total", result="invalid")
+        await websocket.send_text(_error(422, e.errors(include_url=False)))
+        return True
+    except ValueError as e:
+        prometheus.inc("honeypot_ws_messages_total", result="invalid")
+        await websocket.send_text(_error(422, str(e)))
+        return True
+
+    try:
+        # Each frame is a request for the key's rate limit
+        admit_request(tenant)
+        result = await handle_message_with_history(request)
+    except HTTPException as e:
+        prometheus.inc("honeypot_ws_messages_total", result="error")
+        await websocket.send_text(_error(e.status_code, e.detail))
+        return True
+
+    prometheus.inc("honeypot_ws_messages_total", result="ok")
+    await websocket.send_text(result.model_dump_json())
+    return not session_store.is_session_terminated(session_id)
+
+
+@router.websocket("/ws")
+async def conversation_channel(websocket: WebSocket, sessionId: str = ""):
+    """
+    Long-lived conversation channel: authenticate once with x-api-key, bind
+    to ?sessionId=, then one /message body per text frame and one APIResponse
+    per reply frame. History is kept server-side. Frames are handled one at
+    a time, so a client that sends faster than replies come back is slowed
+    down by the socket buffers rather than queued in memory.
+    """
+    global _open_connections
+
+    # Rejecting before accept() answers the handshake with 403
+    tenant = tenants.lookup(websocket.headers.get("x-api-key"))
+    if tenant is None:
+        await websocket.close(code=CLOSE_POLICY)
+        return
+    if session_token.STATELESS_MODE or not sessionId.strip() or len(sessionId) > MAX_SESSION_ID_LENGTH:
+        await websocket.close(code=CLOSE_POLICY)
+        return
+    if _open_connections >= WS_MAX_CONNECTIONS:
+        await websocket.close(code=CLOSE_TRY_AGAIN)
+        return
+
+    # Counted before the first await, so concurrent handshakes can't all pass the check
+    _open_connections += 1
+    try:
+        await websocket.accept()
+        tenants.current_tenant.set(tenant)
+        while True:
+            try:
+                message: Dict[str, Any] = await asyncio.wait_for(websocket.receive(), WS_IDLE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                logger.info("Closing idle WebSocket channel for %s", sessionId)
+                await websocket.close(code=CLOSE_GOING_AWAY, reason="idle timeout")
+                return
+            if message["type"] == "websocket.disconnect":
+                return
+
+            data = message.get("text")
+            if data is None:
+                raw = message.get("bytes") or b""
+                size = len(raw)
+                data = raw.decode("utf-8", errors="replace")
+            else:
+                # Encoded only when the frame could be over the limit (up to 4 bytes a character)
+                size = len(data) if len(data) * 4 <= WS_MAX_FRAME_BYTES else len(data.encode())
+            if size > WS_MAX_FRAME_BYTES:
+                await websocket.close(code=CLOSE_TOO_BIG)
+                return
+
+            if not await _turn(websocket, tenant, sessionId, data):
+                await websocket.close(code=CLOSE_NORMAL, reason="session terminated")
+                return
+    except WebSocketDisconnect:
+        pass
+    finally:
+        _open_connections -= 1
@@ -0,0 +1,6 @@
+"""
+Developer tooling: microbenchmarks and synthetic workloads.
+
+Run with `python -m app.bench --help`. Nothing in here is imported by the
+API at runtime.
+"""
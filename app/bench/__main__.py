@@ -0,0 +1,170 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+from app.bench import memory, micro
+
+
+def _micro(args: argparse.Namespace) -> int:
+    results = micro.run_benchmarks(number=args.number, repeat=args.repeat, only=args.only)
+    baseline = micro.load_baseline(args.baseline) if os.path.exists(args.baseline) else None
+    print(micro.format_results(results, baseline))
+
+    if args.write_baseline:
+        micro.save_baseline(results, args.baseline)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+    if args.check:
+        if baseline is None:
+            print(f"\nNo baseline at {args.baseline}", file=sys.stderr)
+            return 2
+        regressions = micro.find_regressions(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+def _load(args: argparse.Namespace) -> int:
+    from app.bench import load
+    from app.bench.fakes import FaultProfile
+
+    report = asyncio.run(load.run_harness(
+        rps=args.rps,
+        sessions=args.sessions,
+        turns=args.turns,
+        seed=args.seed,
+        gemini=FaultProfile(
+            latency_ms=args.gemini_latency_ms,
+            error_rate=args.gemini_error_rate,
+            rate_limit_rate=args.gemini_429_rate,
+            seed=args.seed,
+        ),
+        callback=FaultProfile(
+            latency_ms=args.callback_latency_ms,
+            error_rate=args.callback_error_rate,
+            seed=args.seed + 1,
+        ),
+        target=args.target,
+    ))
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def _memory(args: argparse.Namespace) -> int:
+    report = memory.measure_footprint(args.sessions)
+    print(memory.format_report(report))
+    results = memory.flatten(report)
+
+    if args.write_baseline:
+        micro.save_baseline(results, args.baseline, unit="bytes_per_session")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}", file=sys.stderr)
+            return 2
+        regressions = micro.find_regressions(results, micro.load_baseline(args.baseline), args.tolerance, unit="B")
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+def _replay(args: argparse.Namespace) -> int:
+    from app.bench import replay
+
+    records = replay.read_capture(args.capture)
+    if not records:
+        print(f"No captured requests match {args.capture}", file=sys.stderr)
+        return 2
+    report = asyncio.run(replay.replay(
+        args.target, records, speed=args.speed, api_key=args.api_key or os.getenv("API_KEY", ""),
+    ))
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def _corpus(args: argparse.Namespace) -> int:
+    from app.bench import corpus
+
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        corpus.write_jsonl(
+            out,
+            args.messages,
+            seed=args.seed,
+            active_sessions=args.active_sessions,
+            scam_ratio=args.scam_ratio,
+            noise_rate=args.noise_rate,
+            history=args.history,
+        )
+    finally:
+        if args.output:
+            out.close()
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.bench")
+    commands = parser.add_subparsers(dest="command")
+
+    micro_parser = commands.add_parser("micro", help="Microbenchmarks of the hot path (default)")
+    micro_parser.add_argument("--number", type=int, default=2000, help="calls per repeat")
+    micro_parser.add_argument("--repeat", type=int, default=5, help="repeats (best is kept)")
+    micro_parser.add_argument("--only", nargs="*", help="substring filter on benchmark names")
+    micro_parser.add_argument("--baseline", default=micro.BASELINE_PATH)
+    micro_parser.add_argument("--write-baseline", action="store_true", help="save results as the new baseline")
+    micro_parser.add_argument("--check", action="store_true", help="exit 1 on regression beyond tolerance")
+    micro_parser.add_argument("--tolerance", type=float, default=micro.DEFAULT_TOLERANCE)
+    micro_parser.set_defaults(handler=_micro)
+
+    load_parser = commands.add_parser("load", help="Load test against fake Gemini and callback servers")
+    load_parser.add_argument("--rps", type=float, default=50.0, help="target requests per second")
+    load_parser.add_argument("--sessions", type=int, default=100)
+    load_parser.add_argument("--turns", type=int, default=8, help="turns per conversation")
+    load_parser.add_argument("--seed", type=int, default=1337)
+    load_parser.add_argument("--gemini-latency-ms", type=float, default=300.0, help="median fake Gemini latency")
+    load_parser.add_argument("--gemini-error-rate", type=float, default=0.02)
+    load_parser.add_argument("--gemini-429-rate", type=float, default=0.05)
+    load_parser.add_argument("--callback-latency-ms", type=float, default=50.0)
+    load_parser.add_argument("--callback-error-rate", type=float, default=0.05)
+    load_parser.add_argument("--target", help="base URL of an already running API (default: start one)")
+    load_parser.set_defaults(handler=_load)
+
+    memory_parser = commands.add_parser("memory", help="Bytes per session for each store and FSM state")
+    memory_parser.add_argument("--sessions", type=int, default=20_000)
+    memory_parser.add_argument("--baseline", default=memory.MEMORY_BASELINE_PATH)
+    memory_parser.add_argument("--write-baseline", action="store_true")
+    memory_parser.add_argument("--check", action="store_true", help="exit 1 on growth beyond tolerance")
+    memory_parser.add_argument("--tolerance", type=float, default=0.2)
+    memory_parser.set_defaults(handler=_memory)
+
+    replay_parser = commands.add_parser("replay", help="Replay captured traffic (CAPTURE_PATH files)")
+    replay_parser.add_argument("capture", help="capture file or glob, e.g. 'capture.jsonl.gz*'")
+    replay_parser.add_argument("--target", default="http://127.0.0.1:8000")
+    replay_parser.add_argument("--speed", type=float, default=1.0, help="time compression, e.g. 1, 10, 100")
+    replay_parser.add_argument("--api-key", help="x-api-key to send (default: $API_KEY)")
+    replay_parser.set_defaults(handler=_replay)
+
+    corpus_parser = commands.add_parser("corpus", help="Stream a synthetic scam-conversation corpus as JSONL")
+    corpus_parser.add_argument("--messages", type=int, default=1_000_000)
+    corpus_parser.add_argument("--seed", type=int, default=1337)
+    corpus_parser.add_argument("--active-sessions", type=int, default=1000, help="conversations interleaved at once")
+    corpus_parser.add_argument("--scam-ratio", type=float, default=0.8)
+    corpus_parser.add_argument("--noise-rate", type=float, default=0.15, help="fraction of messages with adversarial noise")
+    corpus_parser.add_argument("--history", type=int, default=0, help="previous turns carried per line")
+    corpus_parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    corpus_parser.set_defaults(handler=_corpus)
+
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0].startswith("-") and argv[0] not in ("-h", "--help"):
+        argv.insert(0, "micro")
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+import json
+import random
+import string
+from typing import IO, Dict, Iterator, List
+
+from app.api.schemas import IncomingRequest
+from app.core import detection
+
+
+# Fixed seed so every benchmark run times the same inputs
+DEFAULT_SEED = 1337
+
+_SCAM_TEMPLATES = [
+    "URGENT: your bank account will be blocked today. Share OTP immediately.",
+    "This is SBI customer care. Verify now at {url} or your account expire.",
+    "Send payment to {upi} within 2 hours to avoid legal action.",
+    "Police officer here. Pay now or we arrest you. Call {phone}.",
+    "Refund of Rs 4999 pending. Share account {account} and IFSC {ifsc} for transfer.",
+    "Income tax department: last chance to deposit penalty via {upi}.",
+    "Click here {url} to update KYC, limited time offer. Helpline {phone}.",
+    "Your card number and CVV are needed for verification, act now.",
+]
+
+_BENIGN_TEMPLATES = [
+    "Hi, are we still meeting for lunch tomorrow?",
+    "Thanks for the photos from the trip!",
+    "Can you pick up milk on your way home?",
+    "The meeting moved to 4pm, see you there.",
+    "Happy birthday! Hope you have a great day.",
+]
+
+_UPI_HANDLES = ["okaxis", "ybl", "paytm", "oksbi", "ibl"]
+_IFSC_BANKS = ["SBIN", "HDFC", "ICIC", "PUNB", "UTIB"]
+
+
+def _fill(template: str, rng: random.Random) -> str:
+    return template.format(
+        upi=f"refund.desk{rng.randint(1, 9999)}@{rng.choice(_UPI_HANDLES)}",
+        phone=f"{rng.choice('6789')}{rng.randint(0, 999_999_999):09d}",
+        url=f"https://secure-kyc{rng.randint(1, 999)}.example.com/login",
+        account=str(rng.randint(10**10, 10**14)),
+        ifsc=f"{rng.choice(_IFSC_BANKS)}0{rng.randint(0, 999_999):06d}",
+    )
+
+
+def build_messages(count: int, seed: int = DEFAULT_SEED, scam_ratio: float = 0.7) -> List[str]:
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        templates = _SCAM_TEMPLATES if rng.random() < scam_ratio else _BENIGN_TEMPLATES
+        messages.append(_fill(rng.choice(templates), rng))
+    return messages
+
+
+def build_history(messages: List[str], length: int) -> List[Dict[str, str]]:
+    history = []
+    for i, text in enumerate(messages[:length]):
+        history.append({"sender": "scammer" if i % 2 == 0 else "user", "text": text})
+    return history
+
+
+def build_requests(
+    sessions: int,
+    turns: int,
+    seed: int = DEFAULT_SEED,
+    prefix: str = "bench",
+) -> List[IncomingRequest]:
+    """Multi-turn conversations, interleaved turn by turn across sessions."""
+    rng = random.Random(seed)
+    scripts = [build_messages(turns, seed=rng.randint(0, 2**31)) for _ in range(sessions)]
+    requests = []
+    for turn in range(turns):
+        for s, script in enumerate(scripts):
+            history = [
+                {"sender": "scammer" if i % 2 == 0 else "user", "text": text, "timestamp": i}
+                for i, text in enumerate(script[:turn])
+            ]
+            requests.append(IncomingRequest(
+                sessionId=f"{prefix}-{s}",
+                message={"sender": "scammer", "text": script[turn], "timestamp": turn},
+                conversationHistory=history,
+            ))
+    return requests
+
+
+# -----------------------------
+# Streaming conversation generator
+# -----------------------------
+
+# Keyword families straight from detection so generated traffic exercises every signal.
+# Sorted: set iteration order changes with PYTHONHASHSEED.
+_URGENCY = sorted(detection.URGENCY_KEYWORDS)
+_CREDENTIAL = sorted(detection.CREDENTIAL_KEYWORDS)
+_FINANCIAL = sorted(detection.FINANCIAL_KEYWORDS)
+_IMPERSONATION = sorted(detection.IMPERSONATION_KEYWORDS)
+
+# Phrases matching detection's URGENCY_PATTERNS / FINANCIAL_REQUEST_PATTERNS
+_URGENCY_PHRASES = ["within {n} hours", "within 1 hour", "immediate action required"]
+_REQUEST_PHRASES = ["share upi", "share account", "share bank", "share card", "send money",
+                    "send payment", "send amount", "pay now", "pay immediately", "pay today"]
+
+_OPENERS = [
+    "Dear customer, this is your {imp}.", "Hello sir, calling from {imp}.",
+    "{imp} notice:", "Madam, {imp} here regarding your {fin}.", "ALERT from {imp}!",
+]
+_PRESSURE = [
+    "Your {fin} will be blocked {urg}.", "Act {urg} or your {fin} is suspended.",
+    "This is your last warning, respond {urg}.", "Legal case will be filed, {phrase}.",
+    "KYC expired, {phrase} to avoid penalty.",
+]
+_ASKS = [
+    "Tell me the {cred} sent to your mobile.", "Share your {cred} for verification.",
+    "Please {phrase} to {upi}.", "Transfer the fee to account {account} IFSC {ifsc}.",
+    "Click {url} and enter your {cred}.", "Call our officer on {phone} {urg}.",
+    "Send the {fin} {cred} on WhatsApp {phone}.", "Pay the refund charge to {upi} {urg}.",
+]
+_VICTIM_REPLIES = [
+    "What happened to my account?", "I don't understand, who is this?",
+    "Which bank are you calling from?", "Okay, what should I do now?",
+    "My son handles these things, can you wait?", "Is this really urgent?",
+    "I am trying but the app is not opening.", "Why do you need my OTP?",
+]
+_BENIGN = [
+    "Hi, are we still meeting for lunch tomorrow?", "Thanks for the photos from the trip!",
+    "Can you pick up milk on your way home?", "The meeting moved to 4pm, see you there.",
+    "Happy birthday! Hope you have a great day.", "Did you watch the match last night?",
+    "Mom says dinner is at 8.", "Please send me the notes from class.",
+]
+
+_UPI_NAMES = ["refund.desk", "kyc.update", "sbi.care", "helpdesk", "rbi.verify", "cashback", "support_team"]
+_UPI_HANDLES = ["okaxis", "ybl", "paytm", "oksbi", "ibl", "okhdfcbank", "upi", "apl"]
+_IFSC_PREFIXES = ["SBIN", "HDFC", "ICIC", "PUNB", "UTIB", "KKBK", "BARB", "CNRB"]
+_URL_HOSTS = ["secure-kyc", "sbi-rewards", "rbi-verify", "refund-portal", "netbanking-update", "bit.ly/"]
+_URL_TLDS = [".com", ".in", ".xyz", ".online", ".co"]
+
+_EMOJI = ["⚠️", "\U0001f6a8", "\U0001f64f", "✅", "\U0001f4b0"]
+_HOMOGLYPHS = {"a": "а", "e": "е", "o": "о", "c": "с", "p": "р"}
+_LEET = str.maketrans({"o": "0", "i": "1", "e": "3", "a": "4", "s": "5"})
+_ZERO_WIDTH = "​"
+
+
+def _upi(rng: random.Random) -> str:
+    return f"{rng.choice(_UPI_NAMES)}{rng.randrange(10000)}@{rng.choice(_UPI_HANDLES)}"
+
+
+def _phone(rng: random.Random) -> str:
+    # Formats accepted by patterns.PHONE_NUMBER_PATTERN
+    digits = f"{rng.choice('6789')}{rng.randrange(10**9):09d}"
+    style = rng.randrange(5)
+    if style == 0:
+        return digits
+    if style == 1:
+        return f"+91 {digits}"
+    if style == 2:
+        return f"{digits[:5]} {digits[5:]}"
+    if style == 3:
+        return f"+91-{digits[:5]}-{digits[5:]}"
+    return f"{digits[:3]}-{digits[3:6]}-{digits[6:]}"
+
+
+def _account(rng: random.Random) -> str:
+    # patterns.BANK_ACCOUNT_PATTERN: 9-18 digits
+    length = rng.randrange(9, 19)
+    return str(rng.randrange(10 ** (length - 1), 10 ** length))
+
+
+_IFSC_BRANCH_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+
+def _ifsc(rng: random.Random) -> str:
+    # patterns.IFSC_CODE_PATTERN: 4 letters, "0", 6 alphanumerics
+    return f"{rng.choice(_IFSC_PREFIXES)}0" + "".join(rng.choices(_IFSC_BRANCH_CHARS, k=6))
+
+
+def _url(rng: random.Random) -> str:
+    host = rng.choice(_URL_HOSTS)
+    if host.endswith("/"):
+        return f"https://{host}{rng.randrange(36**5):x}"
+    return f"{rng.choice(('http', 'https'))}://{host}{rng.randrange(1000)}{rng.choice(_URL_TLDS)}/login"
+
+
+def _noise(text: str, rng: random.Random) -> str:
+    """Adversarial rewrites seen in real scam traffic (evasion of keyword matching)."""
+    kind = rng.randrange(7)
+    if kind == 0:
+        return text.upper()
+    if kind == 1:
+        # Zero-width space inside a word
+        i = rng.randrange(1, max(len(text) - 1, 2))
+        return text[:i] + _ZERO_WIDTH + text[i:]
+    if kind == 2:
+        words = text.split(" ")
+        j = rng.randrange(len(words))
+        words[j] = words[j].translate(_LEET)
+        return " ".join(words)
+    if kind == 3:
+        return "".join(_HOMOGLYPHS.get(ch, ch) if rng.random() < 0.15 else ch for ch in text)
+    if kind == 4:
+        return text.replace(" ", "  ").replace(".", "!!!")
+    if kind == 5:
+        return f"{rng.choice(_EMOJI)} {text} {rng.choice(_EMOJI)}"
+    return text.replace(" ", " \n ", 1)
+
+
+_FIELD_MAKERS = {
+    "imp": lambda rng: rng.choice(_IMPERSONATION),
+    "urg": lambda rng: rng.choice(_URGENCY),
+    "cred": lambda rng: rng.choice(_CREDENTIAL),
+    "fin": lambda rng: rng.choice(_FINANCIAL),
+    "phrase": lambda rng: rng.choice(_REQUEST_PHRASES),
+    "upi": _upi,
+    "phone": _phone,
+    "account": _account,
+    "ifsc": _ifsc,
+    "url": _url,
+}
+
+# template -> fields it uses, so only those values are generated
+_TEMPLATE_FIELDS = {
+    template: tuple(field for _, field, _, _ in string.Formatter().parse(template) if field)
+    for template in _OPENERS + _PRESSURE + _ASKS
+}
+
+
+def _fill_scam(template: str, rng: random.Random) -> str:
+    return template.format(**{field: _FIELD_MAKERS[field](rng) for field in _TEMPLATE_FIELDS[template]})
+
+
+def _scam_message(turn: int, rng: random.Random, noise_rate: float) -> str:
+    # Early turns set the scene; later turns push for credentials and payment
+    parts = []
+    if turn == 0 or rng.random() < 0.3:
+        parts.append(_fill_scam(rng.choice(_OPENERS), rng))
+    if rng.random() < 0.7:
+        parts.append(_fill_scam(rng.choice(_PRESSURE), rng))
+    if turn > 0 or rng.random() < 0.5:
+        parts.append(_fill_scam(rng.choice(_ASKS), rng))
+    if rng.random() < 0.2:
+        parts.append(rng.choice(_URGENCY_PHRASES).replace("{n}", str(rng.randrange(2, 49))))
+    text = " ".join(parts) or _fill_scam(rng.choice(_ASKS), rng)
+    if rng.random() < noise_rate:
+        text = _noise(text, rng)
+    return text
+
+
+class _Conversation:
+    __slots__ = ("session_id", "scam", "turns", "turn", "timestamp", "history")
+
+    def __init__(self, session_id: str, scam: bool, turns: int, timestamp: int) -> None:
+        self.session_id = session_id
+        self.scam = scam
+        self.turns = turns
+        self.turn = 0
+        self.timestamp = timestamp
+        self.history: List[str] = []
+
+
+def stream_conversations(
+    messages: int,
+    seed: int = DEFAULT_SEED,
+    active_sessions: int = 1000,
+    scam_ratio: float = 0.8,
+    noise_rate: float = 0.15,
+    history: int = 0,
+    start_timestamp: int = 1_700_000_000_000,
+) -> Iterator[str]:
+    """
+    Yield `messages` JSON lines shaped like IncomingRequest bodies.
+
+    Conversations (3-12 scammer turns) interleave across `active_sessions`;
+    the same seed always yields the same stream. With `history` > 0 each
+    line carries up to that many previous turns (scammer and user replies).
+    Lines are built with string formatting rather than pydantic so the
+    generator sustains millions of lines per minute.
+    """
+    rng = random.Random(seed)
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    run = f"{seed:x}"
+    counter = 0
+    timestamp = start_timestamp
+    active: List[_Conversation] = []
+
+    def new_conversation() -> _Conversation:
+        nonlocal counter
+        counter += 1
+        return _Conversation(f"syn-{run}-{counter}", rng.random() < scam_ratio, rng.randrange(3, 13), timestamp)
+
+    for _ in range(messages):
+        if len(active) < active_sessions:
+            active.append(new_conversation())
+        idx = rng.randrange(len(active))
+        conv = active[idx]
+        timestamp += rng.randrange(1, 50)
+        if conv.scam:
+            text = _scam_message(conv.turn, rng, noise_rate)
+        else:
+            text = rng.choice(_BENIGN)
+            if rng.random() < noise_rate:
+                text = _noise(text, rng)
+
+        if history and conv.history:
+            items = []
+            base = len(conv.history) - min(len(conv.history), history)
+            for i in range(base, len(conv.history)):
+                sender = "scammer" if i % 2 == 0 else "user"
+                items.append(f'{{"sender":"{sender}","text":{dumps(conv.history[i])},"timestamp":{conv.timestamp + i}}}')
+            history_json = ",".join(items)
+        else:
+            history_json = ""
+        yield (
+            f'{{"sessionId":"{conv.session_id}",'
+            f'"message":{{"sender":"scammer","text":{dumps(text)},"timestamp":{timestamp}}},'
+            f'"conversationHistory":[{history_json}],'
+            f'"metadata":{{"channel":"SMS","language":"English","locale":"IN"}}}}\n'
+        )
+
+        conv.turn += 1
+        if history:
+            conv.history.append(text)
+            conv.history.append(rng.choice(_VICTIM_REPLIES))
+            if len(conv.history) > 2 * history:
+                del conv.history[: len(conv.history) - 2 * history]
+        if conv.turn >= conv.turns:
+            active[idx] = active[-1]
+            active.pop()
+
+
+def write_jsonl(out: IO[bytes], messages: int, chunk_lines: int = 4096, **options) -> int:
+    """Stream generated lines to a binary file object in large writes; returns bytes written."""
+    written = 0
+    buffer: List[str] = []
+    for line in stream_conversations(messages, **options):
+        buffer.append(line)
+        if len(buffer) >= chunk_lines:
+            data = "".join(buffer).encode()
+            out.write(data)
+            written += len(data)
+            buffer.clear()
+    if buffer:
+        data = "".join(buffer).encode()
+        out.write(data)
+        written += len(data)
+    return written
@@ -0,0 +1,106 @@
+import asyncio
+import random
+from collections import Counter
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+class FaultProfile:
+    """Latency distribution (log-normal around a median) plus injected failures."""
+
+    def __init__(
+        self,
+        latency_ms: float = 200.0,
+        sigma: float = 0.5,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rng = random.Random(seed)
+
+    def delay(self) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        return self.rng.lognormvariate(0.0, self.sigma) * self.latency_ms / 1000.0
+
+    def outcome(self) -> int:
+        roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500
+        return 200
+
+
+_FAKE_REPLIES = [
+    "Oh no, which account do you mean? I have two with different banks.",
+    "I am not good with phones, can you tell me slowly what to press?",
+    "My son usually helps me with this, is it really that urgent?",
+    "Okay I am trying, but the app shows some error message now.",
+]
+
+
+def create_fake_gemini(profile: FaultProfile) -> FastAPI:
+    """
+    Stand-in for the Gemini REST API (POST /{version}/models/{model}:generateContent),
+    answering in the generateContent response shape the google-genai SDK parses.
+    """
+    app = FastAPI()
+    app.state.statuses = Counter()
+
+    @app.post("/{version}/models/{target}")
+    async def generate_content(version: str, target: str, request: Request):
+        await request.body()
+        await asyncio.sleep(profile.delay())
+        status = profile.outcome()
+        app.state.statuses[status] += 1
+        if status == 429:
+            return JSONResponse(status_code=429, content={"error": {
+                "code": 429, "message": "Resource has been exhausted", "status": "RESOURCE_EXHAUSTED",
+            }})
+        if status != 200:
+            return JSONResponse(status_code=status, content={"error": {
+                "code": status, "message": "Internal error", "status": "INTERNAL",
+            }})
+        text = profile.rng.choice(_FAKE_REPLIES)
+        return {
+            "candidates": [{
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": {
+                "promptTokenCount": 40,
+                "candidatesTokenCount": len(text.split()),
+                "totalTokenCount": 40 + len(text.split()),
+            },
+            "modelVersion": target.split(":", 1)[0],
+        }
+
+    return app
+
+
+def create_fake_callback(profile: FaultProfile) -> FastAPI:
+    """Stand-in for the GUVI result endpoint; records deliveries per session."""
+    app = FastAPI()
+    app.state.statuses = Counter()
+    app.state.sessions = Counter()
+
+    @app.post("/callback")
+    async def receive_callback(request: Request):
+        payload = await request.json()
+        await asyncio.sleep(profile.delay())
+        status = 500 if profile.rng.random() < profile.error_rate else 200
+        app.state.statuses[status] += 1
+        if status != 200:
+            return JSONResponse(status_code=status, content={"status": "error"})
+        app.state.sessions[payload.get("sessionId")] += 1
+        return {"status": "success"}
+
+    return app
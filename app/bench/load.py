@@ -0,0 +1,236 @@
+import asyncio
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import httpx
+import uvicorn
+
+from app.agent.llm_client import FALLBACK_RESPONSES
+from app.bench import corpus
+from app.bench.fakes import FaultProfile, create_fake_callback, create_fake_gemini
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+LOAD_API_KEY = "load-test-key"
+
+_FALLBACK_REPLIES = frozenset(
+    reply for replies in FALLBACK_RESPONSES.values() for reply in replies
+) | {"Okay."}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class Pacer:
+    """Open-loop schedule: hands out send slots 1/rps apart regardless of replies."""
+
+    def __init__(self, rps: float) -> None:
+        self.interval = 1.0 / rps
+        self.next_slot = time.perf_counter()
+
+    async def wait(self) -> None:
+        slot = self.next_slot
+        self.next_slot += self.interval
+        delay = slot - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# -----------------------------
+# Servers
+# -----------------------------
+
+async def serve_in_loop(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(
+        app, host="127.0.0.1", port=port, log_level="warning", access_log=False, lifespan="off",
+    ))
+    asyncio.get_running_loop().create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server
+
+
+def start_honeypot(port: int, env: Dict[str, str]) -> subprocess.Popen:
+    """Run the API in its own process so the load generator does not share its CPU."""
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--no-access-log", "--log-level", "warning"],
+        cwd=REPO_ROOT,
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_healthy(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{base_url}/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"{base_url} did not become healthy within {timeout}s")
+
+
+# -----------------------------
+# Load generation
+# -----------------------------
+
+def build_conversations(sessions: int, turns: int, seed: int) -> List[List[Dict[str, Any]]]:
+    """One list of /message bodies per session, each carrying the history so far."""
+    rng = random.Random(seed)
+    run_id = rng.randrange(1 << 32)
+    conversations = []
+    for s in range(sessions):
+        script = corpus.build_messages(turns, seed=rng.randrange(1 << 31))
+        session_id = f"load-{run_id:08x}-{s}"
+        bodies = []
+        for turn, text in enumerate(script):
+            bodies.append({
+                "sessionId": session_id,
+                "message": {"sender": "scammer", "text": text, "timestamp": turn},
+                "conversationHistory": [
+                    {"sender": "scammer" if i % 2 == 0 else "user", "text": t, "timestamp": i}
+                    for i, t in enumerate(script[:turn])
+                ],
+            })
+        conversations.append(bodies)
+    return conversations
+
+
+async def run_load(
+    base_url: str,
+    conversations: List[List[Dict[str, Any]]],
+    rps: float,
+    api_key: str = LOAD_API_KEY,
+    path: str = "/message",
+    timeout: float = 30.0,
+) -> Dict[str, Any]:
+    """
+    Replay conversations at a target request rate. Turns of one session are
+    sent strictly in order (next turn after the previous reply); sessions
+    interleave freely.
+    """
+    pacer = Pacer(rps)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    fallback_replies = 0
+
+    async def run_session(client: httpx.AsyncClient, bodies: List[Dict[str, Any]]) -> None:
+        nonlocal fallback_replies
+        for body in bodies:
+            await pacer.wait()
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, json=body)
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            statuses[response.status_code] += 1
+            if response.status_code == 200 and response.json().get("reply") in _FALLBACK_REPLIES:
+                fallback_replies += 1
+
+    limits = httpx.Limits(max_connections=max(len(conversations), 1), max_keepalive_connections=100)
+    async with httpx.AsyncClient(
+        base_url=base_url, headers={"x-api-key": api_key}, timeout=timeout, limits=limits,
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(run_session(client, bodies) for bodies in conversations))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    sent = sum(statuses.values())
+    ok = statuses.get(200, 0)
+    return {
+        "durationSeconds": round(elapsed, 3),
+        "targetRps": rps,
+        "requests": sent,
+        "throughputRps": round(sent / elapsed, 2) if elapsed else 0.0,
+        "statuses": {str(k): v for k, v in sorted(statuses.items(), key=lambda kv: str(kv[0]))},
+        "errorRate": round((sent - ok) / sent, 4) if sent else 0.0,
+        "latencyMs": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2) if latencies else 0.0,
+        },
+        "fallbackRate": round(fallback_replies / ok, 4) if ok else 0.0,
+    }
+
+
+async def run_harness(
+    rps: float,
+    sessions: int,
+    turns: int,
+    seed: int,
+    gemini: FaultProfile,
+    callback: FaultProfile,
+    target: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Start the fakes (and the API unless `target` is given), replay load, collect the report."""
+    gemini_port, callback_port = free_port(), free_port()
+    gemini_app = create_fake_gemini(gemini)
+    callback_app = create_fake_callback(callback)
+    fakes = [
+        await serve_in_loop(gemini_app, gemini_port),
+        await serve_in_loop(callback_app, callback_port),
+    ]
+    env = {
+        "API_KEY": LOAD_API_KEY,
+        "GEMINI_API_KEY": "fake-gemini-key",
+        "GEMINI_BASE_URL": f"http://127.0.0.1:{gemini_port}",
+        "CALLBACK_URL": f"http://127.0.0.1:{callback_port}/callback",
+    }
+    process = None
+    try:
+        if target is None:
+            port = free_port()
+            process = start_honeypot(port, env)
+            target = f"http://127.0.0.1:{port}"
+        else:
+            print(f"Point {target} at: " + " ".join(f"{k}={v}" for k, v in env.items()), file=sys.stderr)
+        await wait_healthy(target)
+
+        report = await run_load(target, build_conversations(sessions, turns, seed), rps)
+        # Callbacks are sent synchronously inside the final turn, so they are in by now
+        delivered = callback_app.state.sessions
+        report["gemini"] = {str(k): v for k, v in sorted(gemini_app.state.statuses.items())}
+        report["callback"] = {
+            "attempts": sum(callback_app.state.statuses.values()),
+            "statuses": {str(k): v for k, v in sorted(callback_app.state.statuses.items())},
+            "sessionsDelivered": len(delivered),
+            "duplicateDeliveries": sum(count - 1 for count in delivered.values()),
+            "successRate": round(
+                callback_app.state.statuses.get(200, 0) / sum(callback_app.state.statuses.values()), 4
+            ) if callback_app.state.statuses else 0.0,
+        }
+        return report
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+        for server in fakes:
+            server.should_exit = True
+        await asyncio.sleep(0.1)
@@ -0,0 +1,182 @@
+import gc
+import os
+import resource
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from app.agent import llm_client
+from app.callback import sender
+from app.core import history_store, idempotency_store, session_store, snapshot
+from app.core.state_machine import FSMState
+from app.core.termination import cleanup_session
+from app.extraction import store as extraction_store
+from app.metrics import counters, ledger
+
+
+MEMORY_BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "benchmarks",
+    "memory_baselines.json",
+)
+
+# Turns a session has typically seen when it reaches each state
+_TURNS_BY_STATE = {
+    FSMState.INIT: 0,
+    FSMState.NORMAL: 1,
+    FSMState.SUSPICIOUS: 2,
+    FSMState.AGENT_ENGAGED: 4,
+    FSMState.INTEL_READY: 6,
+    FSMState.CALLBACK_SENT: 6,
+    FSMState.TERMINATED: 7,
+}
+
+
+def rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _add_intel(session_id: str, i: int, items: int) -> None:
+    for n in range(items):
+        extraction_store.add_upi_id(session_id, f"refund.desk{i}x{n}@okaxis")
+        extraction_store.add_phone_number(session_id, f"98{(i * 7 + n) % 10**8:08d}")
+        extraction_store.add_url(session_id, f"https://secure-kyc{i}-{n}.example.com/login")
+        extraction_store.add_bank_account(session_id, f"5010{(i * 13 + n) % 10**8:08d}")
+    for keyword in ("urgent", "otp", "bank", "account"):
+        extraction_store.add_suspicious_keyword(session_id, keyword)
+
+
+# -----------------------------
+# Synthetic population
+# -----------------------------
+
+def populate_session(session_id: str, i: int, state: FSMState) -> None:
+    """Leave one session in the stores the way the pipeline would in `state`."""
+    session_store.create_session(session_id)
+    for _ in range(_TURNS_BY_STATE[state]):
+        counters.increment_message_counter(session_id)
+    if state in (FSMState.AGENT_ENGAGED, FSMState.INTEL_READY, FSMState.CALLBACK_SENT, FSMState.TERMINATED):
+        _add_intel(session_id, i, 1 if state == FSMState.AGENT_ENGAGED else 2)
+    if state in (FSMState.AGENT_ENGAGED, FSMState.INTEL_READY, FSMState.CALLBACK_SENT, FSMState.TERMINATED):
+        ledger.record_fallback(session_id=session_id)
+    if state in (FSMState.CALLBACK_SENT, FSMState.TERMINATED):
+        sender._record_sent(session_id)
+    session_store.set_session_state(session_id, state)
+    if state == FSMState.TERMINATED:
+        cleanup_session(session_id)
+
+
+# Store name -> function adding one session's worth of data to that store only
+STORE_WRITERS: Dict[str, Callable[[str, int], None]] = {
+    "session_store": lambda sid, i: session_store.set_session_state(sid, FSMState.AGENT_ENGAGED),
+    "counters": lambda sid, i: [counters.increment_message_counter(sid) for _ in range(4)],
+    "extraction.store": lambda sid, i: _add_intel(sid, i, 2),
+    "callback.sender": lambda sid, i: sender._record_sent(sid),
+    "metrics.ledger": lambda sid, i: [
+        ledger.record_llm_call("gemini-2.5-flash-lite", 250_000_000, True, 40, 18, session_id=sid),
+        ledger.record_fallback(session_id=sid),
+    ],
+    # Only populated with SERVER_HISTORY=1: two turns (scammer message + reply each)
+    "history_store": lambda sid, i: [
+        history_store.append(sid, sender, f"{sender} message {n} in conversation {i}")
+        for n, sender in enumerate(("scammer", "user", "scammer", "user"))
+    ],
+    "idempotency_store": lambda sid, i: [
+        idempotency_store.remember(sid, idempotency_store.request_key(n, f"message {n}"), "success", "Okay.")
+        for n in range(4)
+    ],
+    # Keyed by prompt rather than session: measured per cached reply
+    "llm_client._response_cache": lambda sid, i: llm_client._response_cache.__setitem__(
+        llm_client._cache_key(f"prompt for {sid}", "cached"),
+        (f"Oh no, what should I do about my account {i}? Please tell me slowly.", time.time()),
+    ),
+}
+
+
+def _reset_stores() -> None:
+    """
+    Empty every store. clear() releases dict/set tables, so each measurement
+    starts from empty containers instead of reusing capacity grown by the last one.
+    """
+    snapshot.apply_state(snapshot.collect_state(session_ids=[]))
+    sender._sent_ledger.clear()
+    ledger._ledger.clear()
+    llm_client._response_cache.clear()
+
+
+def _measure(session_ids: List[str], write: Callable[[str, int], None]) -> Dict[str, float]:
+    gc.collect()
+    traced_before = tracemalloc.get_traced_memory()[0]
+    rss_before = rss_bytes()
+    for i, sid in enumerate(session_ids):
+        write(sid, i)
+    gc.collect()
+    traced = tracemalloc.get_traced_memory()[0] - traced_before
+    rss = rss_bytes() - rss_before
+    return {
+        "bytesPerSession": round(traced / len(session_ids), 1),
+        "rssBytesPerSession": round(max(rss, 0) / len(session_ids), 1),
+    }
+
+
+def measure_footprint(sessions: int = 20_000, prefix: str = "mem") -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Bytes per session for each store and for a whole session in each FSM state.
+    Session ID strings are allocated up front, so they are not attributed to
+    any store (ids are shared by every store that keys on them).
+    Existing store contents are set aside and put back afterwards.
+    """
+    session_ids = [f"{prefix}-{i:08d}" for i in range(sessions)]
+    saved_state = snapshot.collect_state()
+    saved_ledger = list(sender._sent_ledger)
+    saved_cache = dict(llm_client._response_cache)
+    saved_costs = dict(ledger._ledger)
+    _reset_stores()
+    started = tracemalloc.is_tracing()
+    if not started:
+        tracemalloc.start()
+    try:
+        by_store = {}
+        for name, write in STORE_WRITERS.items():
+            by_store[name] = _measure(session_ids, write)
+            _reset_stores()
+
+        by_state = {}
+        for state in FSMState:
+            by_state[state.value] = _measure(
+                session_ids, lambda sid, i, state=state: populate_session(sid, i, state)
+            )
+            _reset_stores()
+    finally:
+        if not started:
+            tracemalloc.stop()
+        _reset_stores()
+        snapshot.apply_state(saved_state)
+        sender._sent_ledger.update(dict.fromkeys(saved_ledger))
+        llm_client._response_cache.update(saved_cache)
+        ledger._ledger.update(saved_costs)
+    return {"byStore": by_store, "byState": by_state}
+
+
+def flatten(report: Dict[str, Dict[str, Dict[str, float]]]) -> Dict[str, float]:
+    """Traced bytes per session keyed "byStore.<name>" / "byState.<state>" (for baselines)."""
+    return {
+        f"{group}.{name}": values["bytesPerSession"]
+        for group, entries in report.items()
+        for name, values in entries.items()
+    }
+
+
+def format_report(report: Dict[str, Dict[str, Dict[str, float]]]) -> str:
+    lines = []
+    for group, title in (("byStore", "store"), ("byState", "FSM state")):
+        lines.append(f"{title:<30} {'traced B/session':>18} {'RSS B/session':>15}")
+        for name, values in report[group].items():
+            lines.append(f"{name:<30} {values['bytesPerSession']:>18.1f} {values['rssBytesPerSession']:>15.1f}")
+        lines.append("")
+    return "\n".join(lines)
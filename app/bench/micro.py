@@ -0,0 +1,201 @@
+import asyncio
+import json
+import logging
+import os
+import platform
+import time
+from itertools import cycle
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.bench import corpus
+from app.core import detection, orchestrator, session_store
+from app.core.state_machine import FSMState
+from app.core.termination import cleanup_session
+from app.extraction import extractor, validators
+from app.callback.payload_builder import build_callback_payload
+
+
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "benchmarks",
+    "baselines.json",
+)
+
+# Allowed slowdown vs baseline before a benchmark counts as a regression
+DEFAULT_TOLERANCE = float(os.getenv("BENCH_TOLERANCE", "0.5"))
+
+CORPUS_SIZE = 512
+
+
+# -----------------------------
+# Benchmark definitions
+# -----------------------------
+
+def _sync_benchmarks() -> Dict[str, Tuple[Callable[[Any], Any], List[Any]]]:
+    """name -> (function of one input, inputs cycled through)."""
+    messages = corpus.build_messages(CORPUS_SIZE)
+    history = corpus.build_history(messages, 10)
+    detections = [detection.analyze_message(m) for m in messages]
+    states = [s for s in FSMState if not orchestrator.is_terminal_state(s)]
+    fsm_inputs = [(states[i % len(states)], d, i % 12) for i, d in enumerate(detections)]
+    extractor_ids = [f"bench-extract-{i % 64}" for i in range(len(messages))]
+
+    def extract(item: Tuple[str, str]) -> None:
+        session_id, text = item
+        extractor.extract_intelligence_from_message(session_id, text)
+        cleanup_session(session_id)
+
+    validator_inputs = {
+        "validators.is_valid_upi_id": ["refund.desk12@okaxis", "user@x", "a@b@c", "kyc_team@paytm"],
+        "validators.is_valid_phone_number": ["+91 98765 43210", "9876543210", "0123456789", "09876543210"],
+        "validators.normalize_phone_number": ["+91 98765 43210", "098765-43210", "9876543210"],
+        "validators.is_valid_url": ["https://secure-kyc.example.com/login", "http://x", "ftp://files"],
+        "validators.is_valid_bank_account_number": ["501001234567", "12345", "000000000000"],
+        "validators.is_valid_ifsc_code": ["SBIN0001234", "HDFC0ABC123", "sbin0001234"],
+    }
+
+    benchmarks: Dict[str, Tuple[Callable[[Any], Any], List[Any]]] = {
+        "detection.analyze_message": (detection.analyze_message, messages),
+        "detection.analyze_with_history": (
+            lambda m: detection.analyze_with_history(m, history), messages,
+        ),
+        "extractor.extract_intelligence_from_message": (
+            extract, list(zip(extractor_ids, messages)),
+        ),
+        "orchestrator.next_state": (lambda args: orchestrator.next_state(*args), fsm_inputs),
+        "payload_builder.build_callback_payload": (
+            lambda sid: build_callback_payload(
+                session_id=sid,
+                scam_detected=True,
+                total_messages_exchanged=8,
+                bank_accounts=["501001234567"],
+                upi_ids=["refund.desk12@okaxis"],
+                phishing_links=["https://secure-kyc.example.com/login"],
+                phone_numbers=["9876543210"],
+                suspicious_keywords=["urgent", "otp", "bank"],
+                agent_notes="Urgency and credential requests observed",
+            ),
+            [f"bench-payload-{i}" for i in range(16)],
+        ),
+    }
+    for name, inputs in validator_inputs.items():
+        benchmarks[name] = (getattr(validators, name.split(".", 1)[1]), inputs)
+    return benchmarks
+
+
+def _time_sync(func: Callable[[Any], Any], inputs: List[Any], number: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        items = cycle(inputs)
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            func(next(items))
+        best = min(best, (time.perf_counter_ns() - start) / number)
+    return best
+
+
+async def _time_handle_message(number: int, repeat: int) -> float:
+    """
+    In-process pipeline turns (no HTTP, no Gemini, no callback).
+    Conversations stop short of the finalization gate so no callback is sent.
+    """
+    from app.api import routes
+
+    sessions = 32
+    turns = routes.MIN_TURNS_FOR_FINALIZATION - 1
+    requests = corpus.build_requests(sessions, turns, prefix="bench-turn")
+    session_ids = {r.sessionId for r in requests}
+    best = float("inf")
+    for _ in range(repeat):
+        done = 0
+        elapsed = 0
+        while done < number:
+            for sid in session_ids:
+                cleanup_session(sid)
+                session_store.evict_session(sid)
+            batch = requests[: number - done]
+            start = time.perf_counter_ns()
+            for request in batch:
+                await routes.handle_message(request)
+            elapsed += time.perf_counter_ns() - start
+            done += len(batch)
+        best = min(best, elapsed / number)
+    for sid in session_ids:
+        cleanup_session(sid)
+        session_store.evict_session(sid)
+    return best
+
+
+# -----------------------------
+# Running and comparing
+# -----------------------------
+
+def run_benchmarks(
+    number: int = 2000,
+    repeat: int = 5,
+    only: Optional[List[str]] = None,
+) -> Dict[str, float]:
+    """Best-of-`repeat` nanoseconds per call for each benchmark."""
+    results: Dict[str, float] = {}
+    # Gemini is never called and pipeline INFO logs are not part of the measurement
+    saved_key = os.environ.pop("GEMINI_API_KEY", None)
+    logging.disable(logging.INFO)
+    try:
+        for name, (func, inputs) in _sync_benchmarks().items():
+            if only and not any(pattern in name for pattern in only):
+                continue
+            results[name] = _time_sync(func, inputs, number, repeat)
+        if not only or any(pattern in "routes.handle_message" for pattern in only):
+            results["routes.handle_message"] = asyncio.run(
+                _time_handle_message(max(number // 10, 1), repeat)
+            )
+    finally:
+        logging.disable(logging.NOTSET)
+        if saved_key is not None:
+            os.environ["GEMINI_API_KEY"] = saved_key
+    return results
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, float]:
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def save_baseline(results: Dict[str, float], path: str = BASELINE_PATH, unit: str = "ns_per_call") -> None:
+    data = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "unit": unit,
+        "results": {name: round(value, 1) for name, value in sorted(results.items())},
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def find_regressions(
+    results: Dict[str, float],
+    baseline: Dict[str, float],
+    tolerance: float = DEFAULT_TOLERANCE,
+    unit: str = "ns",
+) -> List[str]:
+    regressions = []
+    for name, value in sorted(results.items()):
+        reference = baseline.get(name)
+        if reference and value > reference * (1 + tolerance):
+            regressions.append(
+                f"{name}: {value:.0f}{unit} vs baseline {reference:.0f}{unit} "
+                f"(+{(value / reference - 1) * 100:.0f}%, tolerance {tolerance * 100:.0f}%)"
+            )
+    return regressions
+
+
+def format_results(results: Dict[str, float], baseline: Optional[Dict[str, float]] = None) -> str:
+    lines = [f"{'benchmark':<46} {'ns/call':>12} {'baseline':>12} {'change':>8}"]
+    for name, value in sorted(results.items()):
+        reference = (baseline or {}).get(name)
+        if reference:
+            lines.append(f"{name:<46} {value:>12.0f} {reference:>12.0f} {(value / reference - 1) * 100:>+7.0f}%")
+        else:
+            lines.append(f"{name:<46} {value:>12.0f} {'-':>12} {'':>8}")
+    return "\n".join(lines)
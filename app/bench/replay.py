@@ -0,0 +1,90 @@
+import asyncio
+import glob
+import gzip
+import json
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List
+
+import httpx
+
+from app.bench.load import percentile
+
+
+def read_capture(pattern: str) -> List[Dict[str, Any]]:
+    """Load records from one or more capture files (rotated ones included), oldest first."""
+    records = []
+    for path in sorted(glob.glob(pattern)):
+        with gzip.open(path, "rt") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    records.append(json.loads(line))
+    records.sort(key=lambda r: r["t"])
+    return records
+
+
+async def replay(
+    base_url: str,
+    records: List[Dict[str, Any]],
+    speed: float = 1.0,
+    api_key: str = "",
+    timeout: float = 30.0,
+) -> Dict[str, Any]:
+    """
+    Re-send captured requests with their original spacing divided by `speed`.
+    Requests of one session go out strictly in captured order: a turn waits
+    for both its scheduled time and the previous turn's reply.
+    """
+    by_session: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for r in records:
+        by_session[r["sessionId"]].append(r)
+
+    origin = records[0]["t"] if records else 0.0
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    late_ms: List[float] = []
+
+    async def run_session(client: httpx.AsyncClient, session_records: List[Dict[str, Any]]) -> None:
+        for r in session_records:
+            due = started + (r["t"] - origin) / speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                late_ms.append(-delay * 1000.0)
+            start = time.perf_counter()
+            try:
+                response = await client.post(r["path"], json=r["body"])
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            statuses[response.status_code] += 1
+
+    headers = {"x-api-key": api_key} if api_key else {}
+    limits = httpx.Limits(max_connections=max(len(by_session), 1), max_keepalive_connections=100)
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(run_session(client, rs) for rs in by_session.values()))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    late_ms.sort()
+    captured_span = records[-1]["t"] - origin if records else 0.0
+    return {
+        "speed": speed,
+        "requests": len(records),
+        "sessions": len(by_session),
+        "capturedSeconds": round(captured_span, 3),
+        "durationSeconds": round(elapsed, 3),
+        "statuses": {str(k): v for k, v in sorted(statuses.items(), key=lambda kv: str(kv[0]))},
+        "latencyMs": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+        },
+        # Requests sent behind schedule because the previous turn was still in flight
+        "lateRequests": len(late_ms),
+        "lateP95Ms": round(percentile(late_ms, 95), 2),
+    }
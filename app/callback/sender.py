@@ -1,8 +1,12 @@
 import os
 import time
-from typing import Dict, Any, Set
+from collections import OrderedDict
+from typing import Any, Collection, Dict, List, Optional, Set
 import httpx
 from app.utils.logging import get_logger
+from app.core import degradation
+from app.metrics import ledger
+from app.utils import tracing
 
 
 logger = get_logger(__name__)
@@ -17,6 +21,20 @@ RETRY_BACKOFF_BASE = 2
 # In-memory idempotency guard (session-level)
 _sent_sessions: Set[str] = set()
 
+# Bounded ledger of recently delivered sessions. Unlike _sent_sessions it
+# survives session cleanup, so a replayed stateless token cannot trigger a
+# second callback for a session this node already reported.
+SENT_LEDGER_SIZE = int(os.getenv("CALLBACK_LEDGER_SIZE", "10000"))
+_sent_ledger: "OrderedDict[str, None]" = OrderedDict()
+
+
+def _record_sent(session_id: str) -> None:
+    _sent_sessions.add(session_id)
+    _sent_ledger[session_id] = None
+    _sent_ledger.move_to_end(session_id)
+    while len(_sent_ledger) > SENT_LEDGER_SIZE:
+        _sent_ledger.popitem(last=False)
+
 
 def send_callback(payload: Dict[str, Any]) -> bool:
     session_id = payload.get("sessionId")
@@ -24,17 +42,26 @@ def send_callback(payload: Dict[str, Any]) -> bool:
         logger.warning("Callback payload missing sessionId")
         return False
 
-    if session_id in _sent_sessions:
-        logger.debug(f"[{session_id}] Callback already sent (idempotency guard)")
+    if session_id in _sent_sessions or session_id in _sent_ledger:
+        logger.debug("[%s] Callback already sent (idempotency guard)", session_id)
         return True
 
+    start_ns = time.perf_counter_ns()
     success = _attempt_send_with_retry(payload, session_id)
+    duration_ns = time.perf_counter_ns() - start_ns
+    ledger.record_callback_duration(duration_ns, session_id)
+    degradation.observe("callback", duration_ns)
     if success:
-        _sent_sessions.add(session_id)
+        _record_sent(session_id)
 
     return success
 
 
+def _backoff(attempt: int) -> None:
+    with tracing.span("callback.backoff", seconds=RETRY_BACKOFF_BASE ** attempt):
+        time.sleep(RETRY_BACKOFF_BASE ** attempt)
+
+
 def _attempt_send_with_retry(payload: Dict[str, Any], session_id: str) -> bool:
     if not CALLBACK_URL:
         logger.error("CALLBACK_URL not configured")
@@ -42,44 +69,63 @@ def _attempt_send_with_retry(payload: Dict[str, Any], session_id: str) -> bool:
 
     for attempt in range(MAX_RETRIES):
         try:
-            logger.debug(f"[{session_id}] Callback attempt {attempt + 1}/{MAX_RETRIES}")
-            response = httpx.post(
-                CALLBACK_URL,
-                json=payload,
-                timeout=CALLBACK_TIMEOUT,
-                headers={"Content-Type": "application/json"},
-            )
+            logger.debug("[%s] Callback attempt %s/%s", session_id, attempt + 1, MAX_RETRIES)
+            with tracing.span("callback.attempt", attempt=attempt + 1) as attempt_span:
+                response = httpx.post(
+                    CALLBACK_URL,
+                    json=payload,
+                    timeout=CALLBACK_TIMEOUT,
+                    headers={"Content-Type": "application/json"},
+                )
+                if attempt_span:
+                    attempt_span.set(status=response.status_code)
+            ledger.record_callback_attempt(response.status_code in (200, 201, 202), session_id)
 
             if response.status_code in (200, 201, 202):
                 return True
 
             if response.status_code >= 500 and attempt < MAX_RETRIES - 1:
-                logger.warning(f"[{session_id}] Server error {response.status_code}, retrying...")
-                time.sleep(RETRY_BACKOFF_BASE ** attempt)
+                logger.warning("[%s] Server error %s, retrying...", session_id, response.status_code)
+                _backoff(attempt)
                 continue
 
-            logger.error(f"[{session_id}] Callback failed with status {response.status_code}")
+            logger.error("[%s] Callback failed with status %s", session_id, response.status_code)
             return False
 
         except (httpx.TimeoutException, httpx.RequestError) as e:
+            ledger.record_callback_attempt(False, session_id)
             if attempt < MAX_RETRIES - 1:
-                logger.warning(f"[{session_id}] Request error: {e}, retrying...")
-                time.sleep(RETRY_BACKOFF_BASE ** attempt)
+                logger.warning("[%s] Request error: %s, retrying...", session_id, e)
+                _backoff(attempt)
                 continue
-            logger.error(f"[{session_id}] Callback failed after {MAX_RETRIES} attempts: {e}")
+            logger.error("[%s] Callback failed after %s attempts: %s", session_id, MAX_RETRIES, e)
             return False
 
         except Exception as e:
-            logger.error(f"[{session_id}] Unexpected error in callback: {e}")
+            logger.error("[%s] Unexpected error in callback: %s", session_id, e)
             return False
 
     return False
 
 
 def has_callback_been_sent(session_id: str) -> bool:
-    return session_id in _sent_sessions
+    return session_id in _sent_sessions or session_id in _sent_ledger
 
 
 def clear_sent_session(session_id: str) -> None:
     """Remove session from sent registry (for cleanup)."""
     _sent_sessions.discard(session_id)
+
+
+def dump_state(session_ids: Optional[Collection[str]] = None) -> List[str]:
+    if session_ids is None:
+        return list(_sent_sessions)
+    return [sid for sid in session_ids if sid in _sent_sessions]
+
+
+def load_state(data: List[str], session_ids: Optional[Collection[str]] = None) -> None:
+    if session_ids is None:
+        _sent_sessions.clear()
+    else:
+        _sent_sessions.difference_update(session_ids)
+    _sent_sessions.update(data)
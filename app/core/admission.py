@@ -0,0 +1,110 @@
+import asyncio
+import os
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque
+
+from app.metrics import prometheus
+
+
+# Turns processed at the same time; 0 disables admission control.
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "64"))
+# Turns allowed to wait for a slot, and for how long
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "64"))
+ADMISSION_QUEUE_TIMEOUT_MS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "250"))
+# "fallback": answer shed turns with a canned reply; "reject": 503 + Retry-After
+ADMISSION_SHED_MODE = os.getenv("ADMISSION_SHED_MODE", "fallback").lower()
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+
+
+class Overloaded(Exception):
+    """Raised by admit() when a turn is shed; the message is the reason."""
+    pass
+
+
+_active = 0
+# One future per queued turn, resolved when a finishing turn hands over its slot
+_waiters: Deque[asyncio.Future] = deque()
+
+prometheus.register_gauge(
+    "honeypot_admission_in_flight", lambda: {(): _active}, "Turns currently holding an admission slot"
+)
+prometheus.register_gauge(
+    "honeypot_admission_queue_depth", lambda: {(): len(_waiters)}, "Turns waiting for an admission slot"
+)
+prometheus.describe("honeypot_admission_shed_total", "Turns shed by admission control by reason and action")
+
+
+def in_flight() -> int:
+    return _active
+
+
+def queue_depth() -> int:
+    return len(_waiters)
+
+
+def _release() -> None:
+    global _active
+    while _waiters:
+        waiter = _waiters.popleft()
+        if not waiter.done():
+            # Hand the slot straight to the oldest waiter; _active is unchanged
+            waiter.set_result(None)
+            return
+    _active -= 1
+
+
+def _discard(waiter: asyncio.Future) -> None:
+    try:
+        _waiters.remove(waiter)
+    except ValueError:
+        pass
+
+
+def _shed(reason: str) -> Overloaded:
+    action = "reject" if ADMISSION_SHED_MODE == "reject" else "fallback"
+    prometheus.inc("honeypot_admission_shed_total", reason=reason, action=action)
+    return Overloaded(reason)
+
+
+@asynccontextmanager
+async def admit():
+    """
+    Hold one of ADMISSION_MAX_CONCURRENT slots for the duration of a turn.
+    When all are taken, wait in a FIFO queue of at most ADMISSION_QUEUE_SIZE
+    for up to ADMISSION_QUEUE_TIMEOUT_MS; otherwise raise Overloaded at once.
+    Plain futures rather than an asyncio.Semaphore, so the controller is not
+    tied to the first event loop that uses it.
+    """
+    global _active
+    if ADMISSION_MAX_CONCURRENT <= 0:
+        yield
+        return
+
+    if _active < ADMISSION_MAX_CONCURRENT and not _waiters:
+        _active += 1
+    else:
+        if len(_waiters) >= ADMISSION_QUEUE_SIZE:
+            raise _shed("queue_full")
+        waiter = asyncio.get_running_loop().create_future()
+        _waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, ADMISSION_QUEUE_TIMEOUT_MS / 1000)
+        except asyncio.TimeoutError:
+            # On 3.12+ wait_for can time out after _release() already handed
+            # this waiter the slot (same loop iteration): keep the slot then
+            if not waiter.done() or waiter.cancelled():
+                _discard(waiter)
+                raise _shed("queue_timeout")
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # Cancelled right after being handed a slot: pass it on
+                _release()
+            else:
+                _discard(waiter)
+            raise
+
+    try:
+        yield
+    finally:
+        _release()
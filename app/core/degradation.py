@@ -0,0 +1,194 @@
+import math
+import os
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from app.metrics import prometheus
+from app.utils.logging import get_logger, get_sample_rate, set_sample_rate
+
+
+logger = get_logger(__name__)
+
+# Automatic degraded mode: entered when the rolling p95 of Gemini replies or
+# callback delivery breaches its SLO, left once it is back under
+# SLO * DEGRADE_RECOVER_RATIO and the mode has been held DEGRADE_MIN_SECONDS.
+DEGRADE_ENABLED = os.getenv("DEGRADE_ENABLED", "1").lower() not in ("0", "false", "no")
+SLO_LLM_P95_MS = float(os.getenv("SLO_LLM_P95_MS", "2500"))
+SLO_CALLBACK_P95_MS = float(os.getenv("SLO_CALLBACK_P95_MS", "3000"))
+DEGRADE_WINDOW_SECONDS = float(os.getenv("DEGRADE_WINDOW_SECONDS", "60"))
+DEGRADE_WINDOW_SAMPLES = int(os.getenv("DEGRADE_WINDOW_SAMPLES", "200"))
+DEGRADE_MIN_SAMPLES = int(os.getenv("DEGRADE_MIN_SAMPLES", "20"))
+DEGRADE_RECOVER_RATIO = float(os.getenv("DEGRADE_RECOVER_RATIO", "0.7"))
+DEGRADE_MIN_SECONDS = float(os.getenv("DEGRADE_MIN_SECONDS", "30"))
+# Share of degraded turns still sent to Gemini, so recovery can be measured
+DEGRADE_PROBE_RATE = float(os.getenv("DEGRADE_PROBE_RATE", "0.05"))
+# Conversation history messages detection looks at while degraded (normally 10)
+DEGRADE_HISTORY_DEPTH = int(os.getenv("DEGRADE_HISTORY_DEPTH", "4"))
+# Loggers sampled down while degraded (warnings and errors always pass)
+DEGRADE_LOG_SAMPLE_RATE = float(os.getenv("DEGRADE_LOG_SAMPLE_RATE", "0.1"))
+DEGRADE_LOGGERS = [
+    name.strip()
+    for name in os.getenv("DEGRADE_LOGGERS", "app.access,app.api.routes,app.callback.sender").split(",")
+    if name.strip()
+]
+
+# Re-check for recovery at most this often when no new samples arrive
+_EVALUATE_INTERVAL = 1.0
+
+
+class _Signal:
+    """Rolling latency window of one operation plus its breach state."""
+    __slots__ = ("slo_ns", "samples", "breached", "since")
+
+    def __init__(self, slo_ms: float) -> None:
+        self.slo_ns = slo_ms * 1e6
+        self.samples: Deque[Tuple[float, int]] = deque(maxlen=DEGRADE_WINDOW_SAMPLES)
+        self.breached = False
+        self.since = 0.0
+
+    def p95(self, now: float, last: Optional[int] = None) -> Optional[int]:
+        """
+        p95 of the window, or of its `last` newest samples; None below
+        DEGRADE_MIN_SAMPLES. Reads a copy and never mutates (the deque's
+        maxlen bounds it), so it is safe from the metrics scrape too.
+        While breached the time cutoff is not applied: the only new samples
+        are sparse probes, and they are kept until there are enough.
+        """
+        samples = list(self.samples)
+        if not self.breached:
+            cutoff = now - DEGRADE_WINDOW_SECONDS
+            samples = [sample for sample in samples if sample[0] >= cutoff]
+        if last is not None:
+            samples = samples[-last:]
+        if len(samples) < DEGRADE_MIN_SAMPLES:
+            return None
+        values = sorted(ns for _, ns in samples)
+        return values[math.ceil(0.95 * len(values)) - 1]
+
+
+_signals: Dict[str, _Signal] = {
+    "llm": _Signal(SLO_LLM_P95_MS),
+    "callback": _Signal(SLO_CALLBACK_P95_MS),
+}
+_degraded = False
+_next_evaluation = 0.0
+# Sample rates in force before degraded mode lowered them
+_saved_log_rates: Dict[str, float] = {}
+
+
+# -----------------------------
+# Mode transitions
+# -----------------------------
+
+def _enter() -> None:
+    for name in DEGRADE_LOGGERS:
+        _saved_log_rates[name] = get_sample_rate(name)
+        set_sample_rate(name, min(_saved_log_rates[name], DEGRADE_LOG_SAMPLE_RATE))
+
+
+def _leave() -> None:
+    for name, rate in _saved_log_rates.items():
+        set_sample_rate(name, rate)
+    _saved_log_rates.clear()
+
+
+def _evaluate(now: float) -> None:
+    global _degraded, _next_evaluation
+    _next_evaluation = now + _EVALUATE_INTERVAL
+    for name, signal in _signals.items():
+        if not signal.breached:
+            p95 = signal.p95(now)
+            if p95 is not None and p95 > signal.slo_ns:
+                signal.breached = True
+                signal.since = now
+                # Recovery is judged on probe samples taken from here on
+                signal.samples.clear()
+                logger.warning("%s p95 %.0fms breaches its %.0fms SLO", name, p95 / 1e6, signal.slo_ns / 1e6)
+        elif now - signal.since >= DEGRADE_MIN_SECONDS:
+            # Too few probes yet (p95 None) means still breached, not recovered
+            p95 = signal.p95(now, last=DEGRADE_MIN_SAMPLES)
+            if p95 is not None and p95 <= signal.slo_ns * DEGRADE_RECOVER_RATIO:
+                signal.breached = False
+                logger.warning("%s latency back within its SLO", name)
+
+    degraded = any(signal.breached for signal in _signals.values())
+    if degraded != _degraded:
+        _degraded = degraded
+        prometheus.inc("honeypot_degraded_transitions_total", direction="enter" if degraded else "leave")
+        if degraded:
+            logger.warning("Entering degraded mode: %s", ", ".join(reasons()))
+            _enter()
+        else:
+            _leave()
+            logger.warning("Leaving degraded mode")
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+
+def observe(signal: str, duration_ns: int) -> None:
+    """Record one latency sample for "llm" or "callback"."""
+    if not DEGRADE_ENABLED:
+        return
+    now = time.monotonic()
+    _signals[signal].samples.append((now, duration_ns))
+    _evaluate(now)
+
+
+def is_degraded() -> bool:
+    if not DEGRADE_ENABLED:
+        return False
+    now = time.monotonic()
+    if _degraded and now >= _next_evaluation:
+        _evaluate(now)
+    return _degraded
+
+
+def allow_llm() -> bool:
+    """False for degraded turns, except a DEGRADE_PROBE_RATE share kept to measure recovery."""
+    return not is_degraded() or random.random() < DEGRADE_PROBE_RATE
+
+
+def reasons() -> List[str]:
+    return [name for name, signal in _signals.items() if signal.breached]
+
+
+def status() -> Dict[str, object]:
+    degraded = is_degraded()
+    return {"mode": "degraded" if degraded else "normal", "degradedReasons": reasons()}
+
+
+def reset() -> None:
+    """Forget all samples and return to normal mode."""
+    global _degraded, _next_evaluation
+    for signal in _signals.values():
+        signal.samples.clear()
+        signal.breached = False
+    if _degraded:
+        _leave()
+    _degraded = False
+    _next_evaluation = 0.0
+
+
+def _p95_gauge() -> Dict[Tuple[Tuple[str, str], ...], float]:
+    now = time.monotonic()
+    values = {}
+    for name, signal in _signals.items():
+        p95 = signal.p95(now)
+        if p95 is not None:
+            values[(("signal", name),)] = p95 / 1e9
+    return values
+
+
+prometheus.register_gauge(
+    "honeypot_degraded",
+    lambda: {(("reason", name),): int(signal.breached) for name, signal in _signals.items()},
+    "1 while the signal's latency SLO is breached (degraded mode)",
+)
+prometheus.register_gauge(
+    "honeypot_latency_p95_seconds", _p95_gauge, "Rolling p95 latency watched by degraded mode"
+)
+prometheus.describe("honeypot_degraded_transitions_total", "Degraded mode entries and exits")
@@ -0,0 +1,108 @@
+import hashlib
+import os
+from collections import deque
+from typing import Collection, Deque, Dict, Iterable, List, Optional, Tuple
+
+
+# Server-side conversation history (opt-in): clients send only the new
+# message plus the history sequence number they last saw.
+SERVER_HISTORY = os.getenv("SERVER_HISTORY", "").lower() in ("1", "true", "yes")
+# Messages kept per session (detection reads the last 10)
+HISTORY_MAX_MESSAGES = int(os.getenv("HISTORY_MAX_MESSAGES", "20"))
+
+HISTORY_SEQ_HEADER = "x-history-seq"
+HISTORY_HASH_HEADER = "x-history-hash"
+
+_EMPTY_DIGEST = b"\0" * 8
+
+
+class _History:
+    """
+    Bounded message window plus a sequence number and rolling digest.
+    seq counts every message ever appended (not just the retained window),
+    so it keeps identifying the conversation position after old messages drop.
+    """
+    __slots__ = ("messages", "seq", "digest")
+
+    def __init__(self) -> None:
+        self.messages: Deque[Tuple[str, str]] = deque(maxlen=HISTORY_MAX_MESSAGES)
+        self.seq = 0
+        self.digest = _EMPTY_DIGEST
+
+
+_histories: Dict[str, _History] = {}
+
+
+def _chain(digest: bytes, sender: str, text: str) -> bytes:
+    """digest_n = blake2b-64(digest_{n-1} || sender || 0x00 || text)"""
+    return hashlib.blake2b(digest + sender.encode() + b"\0" + text.encode(), digest_size=8).digest()
+
+
+def append(session_id: str, sender: str, text: str) -> None:
+    history = _histories.get(session_id)
+    if history is None:
+        history = _histories[session_id] = _History()
+    history.messages.append((sender, text))
+    history.seq += 1
+    history.digest = _chain(history.digest, sender, text)
+
+
+def replace(session_id: str, messages: Iterable[Tuple[str, str]]) -> None:
+    """Re-seed a session's history from a full client-supplied history."""
+    history = _histories[session_id] = _History()
+    for sender, text in messages:
+        history.messages.append((sender, text))
+        history.seq += 1
+        history.digest = _chain(history.digest, sender, text)
+
+
+def get_history(session_id: str) -> List[Dict[str, str]]:
+    """Retained messages in the conversationHistory dict shape detection expects."""
+    history = _histories.get(session_id)
+    if history is None:
+        return []
+    return [{"sender": sender, "text": text} for sender, text in history.messages]
+
+
+def get_position(session_id: str) -> Tuple[int, str]:
+    history = _histories.get(session_id)
+    if history is None:
+        return 0, _EMPTY_DIGEST.hex()
+    return history.seq, history.digest.hex()
+
+
+def matches(session_id: str, seq: int, digest: Optional[str] = None) -> bool:
+    """True when the client's view (seq, optional hash) equals the server's."""
+    current_seq, current_digest = get_position(session_id)
+    if seq != current_seq:
+        return False
+    return digest is None or digest.lower() == current_digest
+
+
+def delete_history(session_id: str) -> None:
+    _histories.pop(session_id, None)
+
+
+def session_count() -> int:
+    return len(_histories)
+
+
+def dump_state(session_ids: Optional[Collection[str]] = None) -> Dict[str, Tuple]:
+    ids = _histories.keys() if session_ids is None else [sid for sid in session_ids if sid in _histories]
+    return {
+        sid: (_histories[sid].seq, _histories[sid].digest, list(_histories[sid].messages))
+        for sid in ids
+    }
+
+
+def load_state(data: Dict[str, Tuple], session_ids: Optional[Collection[str]] = None) -> None:
+    if session_ids is None:
+        _histories.clear()
+    else:
+        for sid in session_ids:
+            _histories.pop(sid, None)
+    for sid, (seq, digest, messages) in data.items():
+        history = _histories[sid] = _History()
+        history.messages.extend(messages)
+        history.seq = seq
+        history.digest = digest
@@ -0,0 +1,66 @@
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Collection, Dict, Optional, Tuple
+
+
+# Replies remembered per session for retried requests; 0 disables replay.
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "8"))
+
+IDEMPOTENCY_KEY_HEADER = "idempotency-key"
+
+# session_id -> {request key: (status, reply)}, oldest first
+_replies: Dict[str, "OrderedDict[bytes, Tuple[str, str]]"] = {}
+
+
+def request_key(timestamp: int, text: str, idempotency_key: Optional[str] = None) -> bytes:
+    """
+    8-byte key for a turn: the client's Idempotency-Key when given,
+    otherwise (message.timestamp, message.text).
+    """
+    if idempotency_key:
+        material = b"k\0" + idempotency_key.encode()
+    else:
+        material = b"m\0" + str(timestamp).encode() + b"\0" + text.encode()
+    return hashlib.blake2b(material, digest_size=8).digest()
+
+
+def lookup(session_id: str, key: bytes) -> Optional[Tuple[str, str]]:
+    replies = _replies.get(session_id)
+    if replies is None:
+        return None
+    return replies.get(key)
+
+
+def remember(session_id: str, key: bytes, status: str, reply: str) -> None:
+    if IDEMPOTENCY_MAX_ENTRIES <= 0:
+        return
+    replies = _replies.get(session_id)
+    if replies is None:
+        replies = _replies[session_id] = OrderedDict()
+    replies[key] = (status, reply)
+    while len(replies) > IDEMPOTENCY_MAX_ENTRIES:
+        replies.popitem(last=False)
+
+
+def delete_replies(session_id: str) -> None:
+    _replies.pop(session_id, None)
+
+
+def session_count() -> int:
+    return len(_replies)
+
+
+def dump_state(session_ids: Optional[Collection[str]] = None) -> Dict[str, list]:
+    ids = _replies.keys() if session_ids is None else [sid for sid in session_ids if sid in _replies]
+    return {sid: list(_replies[sid].items()) for sid in ids}
+
+
+def load_state(data: Dict[str, list], session_ids: Optional[Collection[str]] = None) -> None:
+    if session_ids is None:
+        _replies.clear()
+    else:
+        for sid in session_ids:
+            _replies.pop(sid, None)
+    for sid, items in data.items():
+        _replies[sid] = OrderedDict(items)
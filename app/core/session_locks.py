@@ -0,0 +1,24 @@
+import asyncio
+import weakref
+
+
+# Per-session turn locks. Values are weakly held: a lock lives only while a
+# turn for that session holds or awaits it, so idle sessions cost nothing.
+_session_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def get_session_lock(session_id: str) -> asyncio.Lock:
+    """
+    Return the lock serializing turns for one session.
+    Turns for different sessions never contend with each other.
+    Must be called from the event loop thread.
+    """
+    lock = _session_locks.get(session_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _session_locks[session_id] = lock
+    return lock
+
+
+def active_lock_count() -> int:
+    return len(_session_locks)
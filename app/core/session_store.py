@@ -1,5 +1,9 @@
-from typing import Dict, Set
+import bisect
+import itertools
+from typing import Collection, Dict, List, Optional, Set, Tuple
 from app.core.state_machine import FSMState
+from app.metrics import prometheus
+from app.utils import tracing
 
 
 # In-memory session state store (opaque)
@@ -8,12 +12,49 @@ _sessions: Dict[str, FSMState] = {}
 # Lightweight set of terminated session IDs (prevents re-creation)
 _terminated_sessions: Set[str] = set()
 
+# Secondary index: state -> {session_id: entry sequence}.
+# Sequences only grow, so a sequence number works as a stable pagination cursor.
+_state_index: Dict[FSMState, Dict[str, int]] = {state: {} for state in FSMState}
+_index_sequence = itertools.count(1)
+
+# Per state, every sequence handed out in ascending order (bisected by
+# list_sessions). Removed entries stay behind until they outnumber live
+# ones; _index_owners maps only live sequences back to their session.
+_state_sequences: Dict[FSMState, List[int]] = {state: [] for state in FSMState}
+_index_owners: Dict[int, str] = {}
+
+
+def _index_add(session_id: str, state: FSMState) -> None:
+    seq = next(_index_sequence)
+    _state_index[state][session_id] = seq
+    _state_sequences[state].append(seq)
+    _index_owners[seq] = session_id
+
+
+def _index_remove(session_id: str, state: FSMState) -> None:
+    seq = _state_index[state].pop(session_id, None)
+    if seq is None:
+        return
+    del _index_owners[seq]
+    live = _state_index[state]
+    if len(_state_sequences[state]) > 2 * len(live) + 64:
+        # Dict order is sequence order: each add inserts a fresh, larger one
+        _state_sequences[state] = list(live.values())
+
+
+def _index_clear() -> None:
+    for state in FSMState:
+        _state_index[state].clear()
+        _state_sequences[state].clear()
+    _index_owners.clear()
+
 
 def create_session(session_id: str) -> None:
     if session_id in _terminated_sessions:
         return  # Don't recreate terminated sessions
     if session_id not in _sessions:
         _sessions[session_id] = FSMState.INIT
+        _index_add(session_id, FSMState.INIT)
 
 
 def session_exists(session_id: str) -> bool:
@@ -33,15 +74,108 @@ def set_session_state(session_id: str, state: FSMState) -> None:
         return  # Can't modify terminated sessions
     if session_id not in _sessions:
         create_session(session_id)
-    _sessions[session_id] = state
+    previous = _sessions[session_id]
+    if previous == state:
+        return
+    with tracing.span("store.set_session_state", state=state.value):
+        _sessions[session_id] = state
+        _index_remove(session_id, previous)
+        _index_add(session_id, state)
+    prometheus.inc(
+        "honeypot_fsm_transitions_total",
+        from_state=previous.value,
+        to_state=state.value,
+    )
 
 
 def delete_session(session_id: str) -> None:
     """Remove session from active store but mark as terminated."""
     if session_id in _sessions:
-        del _sessions[session_id]
+        _index_remove(session_id, _sessions.pop(session_id))
     _terminated_sessions.add(session_id)
 
 
+def evict_session(session_id: str) -> None:
+    """Forget a session entirely (active or terminated); it may be created again."""
+    if session_id in _sessions:
+        _index_remove(session_id, _sessions.pop(session_id))
+    _terminated_sessions.discard(session_id)
+
+
 def is_session_terminated(session_id: str) -> bool:
     return session_id in _terminated_sessions
+
+
+def session_ids() -> List[str]:
+    """Every known session, active or terminated (other stores only hold these)."""
+    return [*_sessions, *_terminated_sessions]
+
+
+def active_session_count() -> int:
+    return len(_sessions)
+
+
+def count_sessions_by_state() -> Dict[str, int]:
+    """Session count per FSM state, O(number of states)."""
+    counts = {state.value: len(ids) for state, ids in _state_index.items()}
+    counts[FSMState.TERMINATED.value] += len(_terminated_sessions)
+    return counts
+
+
+def list_sessions(
+    state: FSMState,
+    cursor: int = 0,
+    limit: int = 100,
+) -> Tuple[List[str], Optional[int]]:
+    """
+    Page through active sessions currently in `state`, oldest entry first.
+    Pass the returned cursor back to continue; None means no more pages.
+    Sessions already cleaned up (terminated set) are not listed.
+    Bisects to the cursor, so a page costs O(log N + limit).
+    """
+    sequences = _state_sequences[state]
+    page: List[Tuple[str, int]] = []
+    for i in range(bisect.bisect_right(sequences, cursor), len(sequences)):
+        sid = _index_owners.get(sequences[i])
+        if sid is None:
+            continue  # removed since it was indexed
+        page.append((sid, sequences[i]))
+        if len(page) > limit:
+            break
+    if len(page) > limit:
+        return [sid for sid, _ in page[:limit]], page[limit - 1][1]
+    return [sid for sid, _ in page], None
+
+
+def dump_state(session_ids: Optional[Collection[str]] = None) -> Dict[str, object]:
+    """Export session states as plain data (all sessions, or only session_ids)."""
+    if session_ids is None:
+        return {
+            "sessions": {sid: state.value for sid, state in _sessions.items()},
+            "terminated": list(_terminated_sessions),
+        }
+    return {
+        "sessions": {sid: _sessions[sid].value for sid in session_ids if sid in _sessions},
+        "terminated": [sid for sid in session_ids if sid in _terminated_sessions],
+    }
+
+
+def load_state(data: Dict[str, object], session_ids: Optional[Collection[str]] = None) -> None:
+    """
+    Import data produced by dump_state.
+    Replaces the whole store, or only the given session_ids when provided.
+    """
+    if session_ids is None:
+        _sessions.clear()
+        _terminated_sessions.clear()
+        _index_clear()
+    else:
+        for sid in session_ids:
+            evict_session(sid)
+
+    states = {state.value: state for state in FSMState}
+    for sid, value in data["sessions"].items():
+        state = states[value]
+        _sessions[sid] = state
+        _index_add(sid, state)
+    _terminated_sessions.update(data["terminated"])
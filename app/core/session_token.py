@@ -0,0 +1,164 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import zlib
+from typing import Any, Dict, Optional
+
+from app.core import session_store
+from app.extraction import store as extraction_store
+from app.metrics import counters, ledger
+from app.utils.time import now_unix
+
+
+# Stateless mode: all per-session state travels with the client in a signed token
+STATELESS_MODE = os.getenv("STATELESS_MODE", "").lower() in ("1", "true", "yes")
+SESSION_TOKEN_HEADER = "x-session-token"
+
+# 2: intelligence ("i") is the packed record tuple of extraction_store.dump_state
+TOKEN_VERSION = 2
+SIGNATURE_BYTES = 16
+# Upper bound on the decompressed payload (guards against zlib bombs)
+MAX_TOKEN_PAYLOAD_BYTES = 256 * 1024
+# Tokens are reissued every turn, so this bounds the idle time between turns (0 = no limit)
+SESSION_TOKEN_MAX_AGE_SECONDS = int(os.getenv("SESSION_TOKEN_MAX_AGE_SECONDS", "86400"))
+
+
+class InvalidSessionToken(Exception):
+    """Raised when a session token is malformed, forged or bound to another session."""
+    pass
+
+
+def _get_secret() -> bytes:
+    secret = os.getenv("SESSION_TOKEN_SECRET")
+    if not secret:
+        raise RuntimeError("SESSION_TOKEN_SECRET environment variable is not set")
+    return secret.encode()
+
+
+def check_config() -> None:
+    """Fail at startup, not on every request, when stateless mode has no secret."""
+    if STATELESS_MODE:
+        _get_secret()
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(body: bytes) -> bytes:
+    return hmac.new(_get_secret(), body, hashlib.sha256).digest()[:SIGNATURE_BYTES]
+
+
+def encode_token(payload: Dict[str, Any]) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    body = zlib.compress(raw, 6)
+    return f"{_b64encode(body)}.{_b64encode(_sign(body))}"
+
+
+def decode_token(token: str) -> Dict[str, Any]:
+    try:
+        body_part, signature_part = token.split(".", 1)
+        body = _b64decode(body_part)
+        signature = _b64decode(signature_part)
+    except (ValueError, TypeError) as e:
+        raise InvalidSessionToken("Malformed session token") from e
+
+    if not hmac.compare_digest(signature, _sign(body)):
+        raise InvalidSessionToken("Session token signature mismatch")
+
+    decompressor = zlib.decompressobj()
+    try:
+        raw = decompressor.decompress(body, MAX_TOKEN_PAYLOAD_BYTES)
+    except zlib.error as e:
+        raise InvalidSessionToken("Corrupt session token") from e
+    if decompressor.unconsumed_tail:
+        raise InvalidSessionToken("Session token payload too large")
+
+    payload = json.loads(raw)
+    if payload.get("v") != TOKEN_VERSION:
+        raise InvalidSessionToken("Unsupported session token version")
+    if SESSION_TOKEN_MAX_AGE_SECONDS > 0:
+        issued_at = payload.get("iat")
+        if not isinstance(issued_at, int) or now_unix() - issued_at > SESSION_TOKEN_MAX_AGE_SECONDS:
+            raise InvalidSessionToken("Session token expired")
+    return payload
+
+
+# -----------------------------
+# Store read/write-through
+# -----------------------------
+
+def export_session(session_id: str) -> Dict[str, Any]:
+    """Capture one session's FSM state, turn count, intelligence and cost totals as a token payload."""
+    ids = (session_id,)
+    sessions = session_store.dump_state(ids)
+    payload: Dict[str, Any] = {
+        "v": TOKEN_VERSION,
+        "sid": session_id,
+        "iat": now_unix(),
+    }
+    if sessions["terminated"]:
+        payload["x"] = 1
+    elif session_id in sessions["sessions"]:
+        payload["s"] = sessions["sessions"][session_id]
+
+    count = counters.dump_state(ids).get(session_id)
+    if count:
+        payload["n"] = count
+
+    intelligence = extraction_store.dump_state(ids).get(session_id)
+    if intelligence and any(intelligence):
+        payload["i"] = intelligence
+
+    cost = ledger.dump_state(ids).get(session_id)
+    if cost:
+        payload["c"] = cost
+    return payload
+
+
+def import_session(session_id: str, payload: Dict[str, Any]) -> None:
+    """Replace local state for session_id with the contents of a token payload."""
+    if payload.get("sid") != session_id:
+        raise InvalidSessionToken("Session token belongs to a different session")
+
+    ids = (session_id,)
+    sessions = {session_id: payload["s"]} if "s" in payload else {}
+    terminated = [session_id] if payload.get("x") else []
+    try:
+        session_store.load_state({"sessions": sessions, "terminated": terminated}, ids)
+        counters.load_state({session_id: payload["n"]} if "n" in payload else {}, ids)
+        extraction_store.load_state({session_id: payload["i"]} if "i" in payload else {}, ids)
+        ledger.load_state({session_id: payload["c"]} if "c" in payload else {}, ids)
+    except (KeyError, TypeError, ValueError) as e:
+        # Signed by us but not in the shape this version expects
+        evict_session(session_id)
+        raise InvalidSessionToken("Unreadable session token payload") from e
+
+
+def evict_session(session_id: str) -> None:
+    """Drop all local state for a session once its token has been issued."""
+    ids = (session_id,)
+    session_store.evict_session(session_id)
+    counters.load_state({}, ids)
+    extraction_store.load_state({}, ids)
+    ledger.load_state({}, ids)
+
+
+def restore_session(session_id: str, token: Optional[str]) -> None:
+    """Hydrate the local stores from the client's token (a missing token means a new session)."""
+    evict_session(session_id)
+    if token:
+        import_session(session_id, decode_token(token))
+
+
+def issue_token(session_id: str) -> str:
+    """Serialize the session into a fresh token and evict it from local memory."""
+    token = encode_token(export_session(session_id))
+    evict_session(session_id)
+    return token
@@ -0,0 +1,302 @@
+import asyncio
+import gc
+import os
+import pickle
+import struct
+import zlib
+from contextlib import contextmanager
+from typing import Any, Collection, Dict, List, Optional, Set
+
+from app.core import history_store, idempotency_store, session_store, tenants
+from app.extraction import store as extraction_store
+from app.metrics import counters, ledger
+from app.callback import sender
+from app.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+# Snapshot file location (empty = snapshots disabled)
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "")
+SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "5"))
+# Journal frames written before the journal is compacted into a full snapshot
+SNAPSHOT_COMPACT_EVERY = int(os.getenv("SNAPSHOT_COMPACT_EVERY", "120"))
+# Sessions exported per event loop slice while compacting
+SNAPSHOT_CHUNK_SESSIONS = int(os.getenv("SNAPSHOT_CHUNK_SESSIONS", "5000"))
+
+SNAPSHOT_MAGIC = b"HPSNAP2\n"
+JOURNAL_SUFFIX = ".journal"
+_FRAME_HEADER = struct.Struct(">I")
+
+# Sessions touched since the last snapshot or journal frame
+_dirty_sessions: Set[str] = set()
+_enabled = False
+_journal_frames = 0
+# Bumped by every full snapshot; journal frames carry the generation they
+# follow, so frames left behind by a crash mid-compaction are skipped
+_generation = 0
+_periodic_task: Optional[asyncio.Task] = None
+_stop_event: Optional[asyncio.Event] = None
+
+
+# -----------------------------
+# State collection
+# -----------------------------
+
+@contextmanager
+def _gc_paused():
+    # Bulk export/import allocates millions of containers; letting the cyclic
+    # GC run repeatedly in the middle roughly doubles the time taken.
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def collect_state(session_ids: Optional[Collection[str]] = None) -> Dict[str, Any]:
+    """
+    Export every in-memory store as plain data.
+    Must run on the event loop thread so the stores are read consistently.
+    """
+    with _gc_paused():
+        return {
+            "sessions": session_store.dump_state(session_ids),
+            "counters": counters.dump_state(session_ids),
+            "intelligence": extraction_store.dump_state(session_ids),
+            "callbacks": sender.dump_state(session_ids),
+            "history": history_store.dump_state(session_ids),
+            "idempotency": idempotency_store.dump_state(session_ids),
+            "ledger": ledger.dump_state(session_ids),
+            "tenants": tenants.dump_state(session_ids),
+        }
+
+
+def apply_state(data: Dict[str, Any], session_ids: Optional[Collection[str]] = None) -> None:
+    with _gc_paused():
+        session_store.load_state(data["sessions"], session_ids)
+        counters.load_state(data["counters"], session_ids)
+        extraction_store.load_state(data["intelligence"], session_ids)
+        sender.load_state(data["callbacks"], session_ids)
+        # Absent in snapshots written by older versions
+        history_store.load_state(data.get("history", {}), session_ids)
+        idempotency_store.load_state(data.get("idempotency", {}), session_ids)
+        ledger.load_state(data.get("ledger", {}), session_ids)
+        tenants.load_state(data.get("tenants", {}), session_ids)
+
+
+def _merge_into(merged: Dict[str, Any], part: Dict[str, Any]) -> None:
+    # Chunks hold disjoint session ids, so only the stores' own container
+    # keys ("sessions", "terminated", ...) ever collide.
+    for key, value in part.items():
+        if key not in merged:
+            merged[key] = value
+        elif isinstance(value, dict):
+            _merge_into(merged[key], value)
+        else:
+            merged[key].extend(value)
+
+
+def _merge_parts(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    merged = parts[0]
+    for part in parts[1:]:
+        _merge_into(merged, part)
+    return merged
+
+
+async def _collect_parts() -> List[Dict[str, Any]]:
+    """
+    collect_state() for every session, SNAPSHOT_CHUNK_SESSIONS at a time,
+    yielding to the event loop between chunks. A session changed after its
+    chunk was read is dirty again and lands in the next journal frame.
+    """
+    session_ids = session_store.session_ids()
+    parts = [collect_state(())]
+    for start in range(0, len(session_ids), SNAPSHOT_CHUNK_SESSIONS):
+        await asyncio.sleep(0)
+        parts.append(collect_state(session_ids[start:start + SNAPSHOT_CHUNK_SESSIONS]))
+    return parts
+
+
+def _encode(data: Dict[str, Any]) -> bytes:
+    return zlib.compress(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL), 1)
+
+
+def _decode(blob: bytes) -> Dict[str, Any]:
+    with _gc_paused():
+        return pickle.loads(zlib.decompress(blob))
+
+
+# -----------------------------
+# File I/O (safe to run off the event loop)
+# -----------------------------
+
+def _write_full(path: str, data: Dict[str, Any], generation: int) -> None:
+    data["generation"] = generation
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(_encode(data))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    # The full snapshot supersedes every journal frame (a crash before this
+    # leaves frames of an older generation, which restore() skips)
+    if os.path.exists(path + JOURNAL_SUFFIX):
+        os.remove(path + JOURNAL_SUFFIX)
+
+
+def _append_journal(path: str, frame: Dict[str, Any]) -> None:
+    blob = _encode(frame)
+    with open(path + JOURNAL_SUFFIX, "ab") as f:
+        f.write(_FRAME_HEADER.pack(len(blob)))
+        f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _read_journal(path: str):
+    journal_path = path + JOURNAL_SUFFIX
+    if not os.path.exists(journal_path):
+        return
+    with open(journal_path, "rb") as f:
+        while True:
+            header = f.read(_FRAME_HEADER.size)
+            if len(header) < _FRAME_HEADER.size:
+                return
+            (length,) = _FRAME_HEADER.unpack(header)
+            blob = f.read(length)
+            if len(blob) < length:
+                # Torn write from a crash mid-append; everything before it is valid
+                logger.warning("Ignoring truncated snapshot journal frame")
+                return
+            yield _decode(blob)
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+
+def mark_dirty(session_id: str) -> None:
+    """Record that a session changed and must be included in the next journal frame."""
+    if _enabled:
+        _dirty_sessions.add(session_id)
+
+
+def write_snapshot(path: str) -> None:
+    """Write a full snapshot synchronously and discard the journal."""
+    global _generation, _journal_frames
+    _dirty_sessions.clear()
+    _write_full(path, collect_state(), _generation + 1)
+    _generation += 1
+    _journal_frames = 0
+
+
+async def flush(path: str) -> int:
+    """
+    Persist sessions changed since the last flush.
+    Appends one journal frame, or compacts into a full snapshot when the
+    journal grows past SNAPSHOT_COMPACT_EVERY frames.
+    Returns the number of sessions written.
+    """
+    global _generation, _journal_frames
+    if not _dirty_sessions:
+        return 0
+
+    session_ids = list(_dirty_sessions)
+    _dirty_sessions.clear()
+
+    try:
+        if _journal_frames >= SNAPSHOT_COMPACT_EVERY:
+            parts = await _collect_parts()
+            data = await asyncio.to_thread(_merge_parts, parts)
+            await asyncio.to_thread(_write_full, path, data, _generation + 1)
+            _generation += 1
+            _journal_frames = 0
+            return len(data["sessions"]["sessions"])
+
+        frame = {"ids": session_ids, "generation": _generation, "state": collect_state(session_ids)}
+        await asyncio.to_thread(_append_journal, path, frame)
+    except BaseException:
+        # Not persisted: keep them for the next flush
+        _dirty_sessions.update(session_ids)
+        raise
+    _journal_frames += 1
+    return len(session_ids)
+
+
+def restore(path: str) -> int:
+    """
+    Load the full snapshot plus any journal frames written after it.
+    Returns the number of active sessions restored.
+    """
+    global _generation
+    generation = None
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            magic = f.read(len(SNAPSHOT_MAGIC))
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"Not a snapshot file: {path}")
+            data = _decode(f.read())
+        # Absent in snapshots written by older versions (their frames have none either)
+        generation = data.get("generation", 0)
+        apply_state(data)
+
+    for frame in _read_journal(path):
+        if generation is not None and frame.get("generation", 0) != generation:
+            # Written before the snapshot replaced it; would roll sessions back
+            continue
+        apply_state(frame["state"], frame["ids"])
+
+    _generation = generation or 0
+
+    return session_store.active_session_count()
+
+
+async def run_periodic(path: str, interval: float, stop_event: asyncio.Event) -> None:
+    # Not cancelled mid-write: stop() sets the event and waits for the
+    # in-flight flush so a stale journal frame can never follow the final snapshot.
+    while not stop_event.is_set():
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+        try:
+            await flush(path)
+        except Exception as e:
+            logger.error(f"Periodic snapshot failed: {e}")
+
+
+async def start(path: str = SNAPSHOT_PATH) -> None:
+    """Restore state at startup and begin periodic incremental snapshots."""
+    global _enabled, _periodic_task, _stop_event
+    if not path:
+        return
+    try:
+        restored = restore(path)
+        logger.info(f"Restored {restored} sessions from snapshot {path}")
+    except Exception as e:
+        # Drop whatever the snapshot or journal had applied before failing
+        apply_state(collect_state(()))
+        logger.error(f"Snapshot restore failed, starting empty: {e}")
+    _enabled = True
+    _stop_event = asyncio.Event()
+    _periodic_task = asyncio.create_task(
+        run_periodic(path, SNAPSHOT_INTERVAL_SECONDS, _stop_event)
+    )
+
+
+async def stop(path: str = SNAPSHOT_PATH) -> None:
+    """Cancel periodic snapshots and write a final full snapshot."""
+    global _enabled, _periodic_task
+    if not _enabled:
+        return
+    if _periodic_task is not None:
+        _stop_event.set()
+        await _periodic_task
+        _periodic_task = None
+    write_snapshot(path)
+    _enabled = False
+    logger.info(f"Snapshot written to {path}")
@@ -0,0 +1,256 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+from app.core import session_store
+from app.metrics import prometheus
+from app.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+# Defaults for keys that don't set their own limits; 0 means unlimited.
+TENANT_DEFAULT_RPS = float(os.getenv("TENANT_DEFAULT_RPS", "0"))
+TENANT_DEFAULT_BURST = float(os.getenv("TENANT_DEFAULT_BURST", "0"))
+TENANT_DEFAULT_LLM_SHARE = float(os.getenv("TENANT_DEFAULT_LLM_SHARE", "1.0"))
+TENANT_DEFAULT_MAX_SESSIONS = int(os.getenv("TENANT_DEFAULT_MAX_SESSIONS", "0"))
+# A session with no turn for this long stops counting against its key's cap
+# until its next turn (0 = count every session until it terminates)
+TENANT_SESSION_IDLE_SECONDS = float(os.getenv("TENANT_SESSION_IDLE_SECONDS", "1800"))
+
+
+class Tenant:
+    """
+    One integrator's API key settings plus its token bucket.
+    rps/burst: request rate limit (burst defaults to one second of rps).
+    llm_share: fraction of each Gemini model's RPM limit this key may use.
+    max_sessions: sessions active within TENANT_SESSION_IDLE_SECONDS this key may have.
+    """
+    __slots__ = ("name", "rps", "burst", "llm_share", "max_sessions", "_tokens", "_updated")
+
+    def __init__(
+        self,
+        name: str,
+        rps: float = TENANT_DEFAULT_RPS,
+        burst: float = TENANT_DEFAULT_BURST,
+        llm_share: float = TENANT_DEFAULT_LLM_SHARE,
+        max_sessions: int = TENANT_DEFAULT_MAX_SESSIONS,
+    ) -> None:
+        self.name = name
+        self.rps = rps
+        self.burst = burst or max(rps, 1.0)
+        self.llm_share = llm_share
+        self.max_sessions = max_sessions
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def try_acquire(self) -> bool:
+        """Take one request token; False when the bucket is empty."""
+        if self.rps <= 0:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rps)
+        self._updated = now
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+    def retry_after(self) -> int:
+        """Whole seconds until the bucket holds a token again."""
+        if self.rps <= 0:
+            return 0
+        return max(1, int((1.0 - self._tokens) / self.rps + 0.999))
+
+
+# The tenant of the request being processed (set by the auth dependency)
+current_tenant: ContextVar[Optional[Tenant]] = ContextVar("current_tenant", default=None)
+
+# sha256(key) -> Tenant. Lookups hash the presented key first, so the dict
+# probe compares digests and reveals nothing about how much of a key matched.
+_by_digest: Dict[bytes, Tenant] = {}
+_loaded_source: Optional[Tuple[Optional[str], ...]] = None
+
+# session_id -> name of the tenant that opened it, until the session is cleaned up
+_session_owner: Dict[str, str] = {}
+# Sessions counted against their owner's cap -> wall-clock time of their last
+# turn, least recently active first
+_session_seen: "OrderedDict[str, float]" = OrderedDict()
+_session_counts: Dict[str, int] = {}
+
+
+# -----------------------------
+# Registry
+# -----------------------------
+
+def _digest(key: str) -> bytes:
+    return hashlib.sha256(key.encode()).digest()
+
+
+def _config_source() -> Tuple[Optional[str], ...]:
+    return os.getenv("API_KEYS_FILE"), os.getenv("API_KEYS"), os.getenv("API_KEY")
+
+
+def _parse_entries(source: Tuple[Optional[str], ...]) -> List[Dict[str, Any]]:
+    """
+    API_KEYS_FILE: JSON list of {"name", "key", "rps", "burst", "llmShare", "maxSessions"}.
+    API_KEYS: "name:key,name:key" with the default limits.
+    API_KEY: the single legacy key, as tenant "default".
+    """
+    path, pairs, legacy = source
+    entries: List[Dict[str, Any]] = []
+    if path:
+        with open(path) as f:
+            entries.extend(json.load(f))
+    if pairs:
+        for item in pairs.split(","):
+            name, _, key = item.strip().partition(":")
+            if name and key:
+                entries.append({"name": name, "key": key})
+    if legacy:
+        entries.append({"name": "default", "key": legacy})
+    return entries
+
+
+def load_registry() -> int:
+    """(Re)build the key registry from the environment; returns the number of keys."""
+    global _by_digest, _loaded_source
+    source = _config_source()
+    registry: Dict[bytes, Tenant] = {}
+    for entry in _parse_entries(source):
+        registry[_digest(entry["key"])] = Tenant(
+            entry["name"],
+            rps=float(entry.get("rps", TENANT_DEFAULT_RPS)),
+            burst=float(entry.get("burst", TENANT_DEFAULT_BURST)),
+            llm_share=float(entry.get("llmShare", TENANT_DEFAULT_LLM_SHARE)),
+            max_sessions=int(entry.get("maxSessions", TENANT_DEFAULT_MAX_SESSIONS)),
+        )
+    _by_digest = registry
+    _loaded_source = source
+    logger.info("Loaded %s API keys", len(registry))
+    return len(registry)
+
+
+def lookup(key: Optional[str]) -> Optional[Tenant]:
+    """
+    Tenant for a presented API key, or None. Only a miss looks at the
+    environment again, reloading the registry if its configuration changed.
+    """
+    if key is None:
+        return None
+    tenant = _by_digest.get(_digest(key))
+    if tenant is None and _config_source() != _loaded_source:
+        load_registry()
+        tenant = _by_digest.get(_digest(key))
+    return tenant
+
+
+def has_keys() -> bool:
+    if _loaded_source is None:
+        load_registry()
+    return bool(_by_digest)
+
+
+# -----------------------------
+# Concurrent-session cap
+# -----------------------------
+
+def _uncount(session_id: str) -> None:
+    if _session_seen.pop(session_id, None) is not None:
+        _session_counts[_session_owner[session_id]] -= 1
+
+
+def _expire_idle(now: float) -> None:
+    if TENANT_SESSION_IDLE_SECONDS <= 0:
+        return
+    cutoff = now - TENANT_SESSION_IDLE_SECONDS
+    while _session_seen:
+        session_id, seen = next(iter(_session_seen.items()))
+        if seen >= cutoff:
+            return
+        _uncount(session_id)
+
+
+def owns_session(tenant: Tenant, session_id: str) -> bool:
+    """False when the session was opened with another API key."""
+    owner = _session_owner.get(session_id)
+    return owner is None or owner == tenant.name
+
+
+def claim_session(tenant: Tenant, session_id: str) -> bool:
+    """
+    Count a turn's session as active for the tenant; False when that would
+    exceed its cap. Check owns_session first. Terminated sessions pass.
+    """
+    now = time.time()
+    _expire_idle(now)
+    if session_id in _session_seen:
+        _session_seen[session_id] = now
+        _session_seen.move_to_end(session_id)
+        return True
+    if session_store.is_session_terminated(session_id):
+        return True
+    count = _session_counts.get(tenant.name, 0)
+    if tenant.max_sessions > 0 and count >= tenant.max_sessions:
+        return False
+    _session_owner[session_id] = tenant.name
+    _session_seen[session_id] = now
+    _session_counts[tenant.name] = count + 1
+    return True
+
+
+def release_session(session_id: str) -> None:
+    if session_id in _session_owner:
+        _uncount(session_id)
+        del _session_owner[session_id]
+
+
+def session_count(name: str) -> int:
+    """Sessions currently counted against the tenant's cap."""
+    _expire_idle(time.time())
+    return _session_counts.get(name, 0)
+
+
+def dump_state(session_ids: Optional[Collection[str]] = None) -> Dict[str, Tuple]:
+    """Export session owners as (tenant name, last turn time or None once idle)."""
+    ids = _session_owner.keys() if session_ids is None else [sid for sid in session_ids if sid in _session_owner]
+    return {sid: (_session_owner[sid], _session_seen.get(sid)) for sid in ids}
+
+
+def load_state(data: Dict[str, Tuple], session_ids: Optional[Collection[str]] = None) -> None:
+    if session_ids is None:
+        _session_owner.clear()
+        _session_seen.clear()
+        _session_counts.clear()
+        # Journal frames loaded after this are newer, so appending them keeps
+        # _session_seen (nearly) in activity order
+        data = dict(sorted(data.items(), key=lambda item: item[1][1] or 0.0))
+    else:
+        for sid in session_ids:
+            release_session(sid)
+    for sid, (name, seen) in data.items():
+        _session_owner[sid] = name
+        if seen is not None:
+            _session_seen[sid] = seen
+            _session_counts[name] = _session_counts.get(name, 0) + 1
+
+
+# -----------------------------
+# Usage metrics
+# -----------------------------
+
+def record_request(tenant: Tenant, result: str) -> None:
+    prometheus.inc("honeypot_tenant_requests_total", tenant=tenant.name, result=result)
+
+
+prometheus.describe("honeypot_tenant_requests_total", "Requests per API key by result")
+prometheus.describe("honeypot_tenant_llm_requests_total", "Gemini requests per API key and model")
+prometheus.register_gauge(
+    "honeypot_tenant_sessions",
+    lambda: {(("tenant", name),): count for name, count in _session_counts.items()},
+    "Sessions active within TENANT_SESSION_IDLE_SECONDS per API key",
+)
@@ -4,10 +4,11 @@ from app.core.orchestrator import (
     transition_to_callback_sent,
     transition_to_terminated,
 )
-from app.core import session_store
+from app.core import history_store, idempotency_store, session_store, tenants
 from app.extraction import store as extraction_store
-from app.metrics import counters
+from app.metrics import counters, ledger
 from app.callback import sender
+from app.utils import tracing
 
 
 def finalize_intelligence(current_state: FSMState) -> FSMState:
@@ -43,7 +44,12 @@ def cleanup_session(session_id: str) -> None:
     Clean up all in-memory data for a terminated session.
     Call this after termination to prevent memory leaks.
     """
-    session_store.delete_session(session_id)
-    extraction_store.delete_session_intelligence(session_id)
-    counters.delete_counter(session_id)
-    sender.clear_sent_session(session_id)
+    with tracing.span("store.cleanup_session"):
+        session_store.delete_session(session_id)
+        extraction_store.delete_session_intelligence(session_id)
+        counters.delete_counter(session_id)
+        sender.clear_sent_session(session_id)
+        ledger.delete_session_cost(session_id)
+        history_store.delete_history(session_id)
+        idempotency_store.delete_replies(session_id)
+        tenants.release_session(session_id)
@@ -1,29 +1,20 @@
 from app.extraction import patterns, validators, store
+from app.utils import tracing
 
 
-# Suspicious keywords to extract (for intelligence reporting)
-SUSPICIOUS_KEYWORDS = {
-    "urgent", "immediately", "verify", "blocked", "suspended",
-    "otp", "pin", "password", "cvv", "card number",
-    "transfer", "payment", "deposit", "refund",
-    "bank", "account", "upi",
-    "police", "arrest", "legal", "court",
-    "government", "income tax", "customs",
-    "last chance", "act now", "expire", "limited time",
-    "click here", "verify now", "account blocked",
-    "share", "send money", "pay now",
-}
+SUSPICIOUS_KEYWORDS = patterns.SUSPICIOUS_KEYWORDS
 
 
 def extract_intelligence_from_message(session_id: str, message_text: str) -> None:
     if not message_text:
         return
 
-    _extract_upi_ids(session_id, message_text)
-    _extract_phone_numbers(session_id, message_text)
-    _extract_urls(session_id, message_text)
-    _extract_bank_accounts(session_id, message_text)
-    _extract_suspicious_keywords(session_id, message_text)
+    with tracing.span("store.extract_intelligence"):
+        _extract_upi_ids(session_id, message_text)
+        _extract_phone_numbers(session_id, message_text)
+        _extract_urls(session_id, message_text)
+        _extract_bank_accounts(session_id, message_text)
+        _extract_suspicious_keywords(session_id, message_text)
 
 
 def _extract_suspicious_keywords(session_id: str, text: str) -> None:
@@ -25,3 +25,18 @@ URL_PATTERN = re.compile(
     r'https?://[^\s]+',
     re.IGNORECASE
 )
+
+
+# Suspicious keywords to extract (for intelligence reporting).
+# Fixed vocabulary: the store keeps these as a per-session bitmask.
+SUSPICIOUS_KEYWORDS = frozenset({
+    "urgent", "immediately", "verify", "blocked", "suspended",
+    "otp", "pin", "password", "cvv", "card number",
+    "transfer", "payment", "deposit", "refund",
+    "bank", "account", "upi",
+    "police", "arrest", "legal", "court",
+    "government", "income tax", "customs",
+    "last chance", "act now", "expire", "limited time",
+    "click here", "verify now", "account blocked",
+    "share", "send money", "pay now",
+})
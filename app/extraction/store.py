@@ -1,69 +1,283 @@
-from typing import Dict, Set, List
+import sys
+from array import array
+from typing import Collection, Dict, List, Optional, Sequence, Tuple
 
-_intelligence_store: Dict[str, Dict[str, Set[str]]] = {}
+from app.extraction.patterns import SUSPICIOUS_KEYWORDS
 
 
-def _ensure_session(session_id: str) -> None:
-    if session_id not in _intelligence_store:
-        _intelligence_store[session_id] = {
-            "upi_ids": set(),
-            "phone_numbers": set(),
-            "urls": set(),
-            "bank_accounts": set(),
-            "ifsc_codes": set(),
-            "suspicious_keywords": set(),
-        }
+# Fixed keyword vocabulary: each keyword owns one bit of a per-session mask
+KEYWORD_VOCABULARY: Tuple[str, ...] = tuple(sorted(SUSPICIOUS_KEYWORDS))
+_KEYWORD_BITS: Dict[str, int] = {kw: 1 << i for i, kw in enumerate(KEYWORD_VOCABULARY)}
+
+# Output field -> record slot (order of get_all_intelligence keys)
+_OUTPUT_FIELDS = (
+    ("upiIds", "upi_ids"),
+    ("phoneNumbers", "phone_numbers"),
+    ("phishingLinks", "urls"),
+    ("bankAccounts", "bank_accounts"),
+    ("ifscCodes", "ifsc_codes"),
+)
+
+
+class _IntelRecord:
+    """
+    Compact per-session intelligence.
+
+    - suspicious keywords: one bitmask over KEYWORD_VOCABULARY
+      (anything outside the vocabulary goes to extra_keywords)
+    - phone numbers, bank accounts, IFSC codes: packed uint64 arrays
+      (a phone/account value that doesn't pack exactly turns its slot
+      into a tuple of ints and strings)
+    - UPI IDs and URLs: tuples of interned strings
+    Every collection stays None until its first value arrives.
+    """
+    __slots__ = (
+        "keyword_mask",
+        "extra_keywords",
+        "phone_numbers",
+        "bank_accounts",
+        "ifsc_codes",
+        "upi_ids",
+        "urls",
+    )
+
+    def __init__(self) -> None:
+        self.keyword_mask = 0
+        self.extra_keywords: Optional[Tuple[str, ...]] = None
+        self.phone_numbers: Optional[array] = None
+        self.bank_accounts: Optional[array] = None
+        self.ifsc_codes: Optional[array] = None
+        self.upi_ids: Optional[Tuple[str, ...]] = None
+        self.urls: Optional[Tuple[str, ...]] = None
+
+
+_intelligence_store: Dict[str, _IntelRecord] = {}
+
+
+# -----------------------------
+# Packing helpers
+# -----------------------------
+
+def _packable_digits(value: str) -> bool:
+    # isdigit() and int() also accept non-ASCII digits (e.g. Devanagari),
+    # which would come back rewritten in ASCII
+    return value.isascii() and value.isdigit() and len(value) <= 18
+
+
+def _pack_digits(value: str) -> int:
+    # A leading "1" sentinel keeps leading zeros; 18 digits still fit in 63 bits
+    if not _packable_digits(value):
+        raise ValueError(f"Expected up to 18 ASCII digits, got {value!r}")
+    return int("1" + value)
+
+
+def _unpack_digits(packed) -> str:
+    # Values that could not be packed are kept as the original string
+    return packed if isinstance(packed, str) else str(packed)[1:]
+
+
+def _pack_ifsc(value: str) -> int:
+    if len(value) != 11 or not value.isalnum() or not value.isupper():
+        raise ValueError(f"Expected an 11-character IFSC code, got {value!r}")
+    return int(value, 36)
+
+
+_BASE36 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def _unpack_ifsc(packed: int) -> str:
+    chars = []
+    while packed:
+        packed, rem = divmod(packed, 36)
+        chars.append(_BASE36[rem])
+    return "".join(reversed(chars)).rjust(11, "0")
+
+
+def _get_record(session_id: str) -> _IntelRecord:
+    record = _intelligence_store.get(session_id)
+    if record is None:
+        record = _intelligence_store[session_id] = _IntelRecord()
+    return record
+
+
+def _add_packed(record: _IntelRecord, slot: str, packed: int) -> None:
+    values = getattr(record, slot)
+    if values is None:
+        setattr(record, slot, array("Q", (packed,)))
+    elif packed not in values:
+        if isinstance(values, tuple):
+            setattr(record, slot, values + (packed,))
+        else:
+            values.append(packed)
+
 
+def _add_digits(record: _IntelRecord, slot: str, value: str) -> None:
+    """Pack a digit string into the slot's array, or keep it as a string if it doesn't pack exactly."""
+    if _packable_digits(value):
+        _add_packed(record, slot, _pack_digits(value))
+        return
+    values = getattr(record, slot)
+    if values is None:
+        setattr(record, slot, (sys.intern(value),))
+    elif value not in values:
+        # A slot holding a string becomes a tuple of ints and strings
+        setattr(record, slot, tuple(values) + (sys.intern(value),))
+
+
+def _add_interned(record: _IntelRecord, slot: str, value: str) -> None:
+    values = getattr(record, slot)
+    if values is None:
+        setattr(record, slot, (sys.intern(value),))
+    elif value not in values:
+        setattr(record, slot, values + (sys.intern(value),))
+
+
+# -----------------------------
+# Writers
+# -----------------------------
 
 def add_upi_id(session_id: str, value: str) -> None:
-    _ensure_session(session_id)
-    _intelligence_store[session_id]["upi_ids"].add(value)
+    _add_interned(_get_record(session_id), "upi_ids", value)
 
 
 def add_phone_number(session_id: str, value: str) -> None:
-    _ensure_session(session_id)
-    _intelligence_store[session_id]["phone_numbers"].add(value)
+    _add_digits(_get_record(session_id), "phone_numbers", value)
 
 
 def add_url(session_id: str, value: str) -> None:
-    _ensure_session(session_id)
-    _intelligence_store[session_id]["urls"].add(value)
+    _add_interned(_get_record(session_id), "urls", value)
 
 
 def add_bank_account(session_id: str, value: str) -> None:
-    _ensure_session(session_id)
-    _intelligence_store[session_id]["bank_accounts"].add(value)
+    _add_digits(_get_record(session_id), "bank_accounts", value)
 
 
 def add_ifsc_code(session_id: str, value: str) -> None:
-    _ensure_session(session_id)
-    _intelligence_store[session_id]["ifsc_codes"].add(value)
+    _add_packed(_get_record(session_id), "ifsc_codes", _pack_ifsc(value))
 
 
 def add_suspicious_keyword(session_id: str, value: str) -> None:
-    _ensure_session(session_id)
-    _intelligence_store[session_id]["suspicious_keywords"].add(value.lower())
+    record = _get_record(session_id)
+    keyword = value.lower()
+    bit = _KEYWORD_BITS.get(keyword)
+    if bit is not None:
+        record.keyword_mask |= bit
+    else:
+        _add_interned(record, "extra_keywords", keyword)
+
+
+# -----------------------------
+# Readers (decode on demand)
+# -----------------------------
+
+def _decode_keywords(record: _IntelRecord) -> List[str]:
+    mask = record.keyword_mask
+    keywords = [kw for kw, bit in _KEYWORD_BITS.items() if mask & bit]
+    if record.extra_keywords:
+        keywords.extend(record.extra_keywords)
+    return keywords
 
 
 def get_all_intelligence(session_id: str) -> Dict[str, List[str]]:
-    _ensure_session(session_id)
-    data = _intelligence_store[session_id]
+    record = _intelligence_store.get(session_id)
+    if record is None:
+        return {
+            "upiIds": [],
+            "phoneNumbers": [],
+            "phishingLinks": [],
+            "bankAccounts": [],
+            "ifscCodes": [],
+            "suspiciousKeywords": [],
+        }
     return {
-        "upiIds": list(data["upi_ids"]),
-        "phoneNumbers": list(data["phone_numbers"]),
-        "phishingLinks": list(data["urls"]),
-        "bankAccounts": list(data["bank_accounts"]),
-        "ifscCodes": list(data["ifsc_codes"]),
-        "suspiciousKeywords": list(data["suspicious_keywords"]),
+        "upiIds": list(record.upi_ids or ()),
+        "phoneNumbers": [_unpack_digits(v) for v in record.phone_numbers or ()],
+        "phishingLinks": list(record.urls or ()),
+        "bankAccounts": [_unpack_digits(v) for v in record.bank_accounts or ()],
+        "ifscCodes": [_unpack_ifsc(v) for v in record.ifsc_codes or ()],
+        "suspiciousKeywords": _decode_keywords(record),
     }
 
 
+def count_intelligence_types(session_id: str) -> int:
+    """Number of non-empty intelligence fields, without decoding any values."""
+    record = _intelligence_store.get(session_id)
+    if record is None:
+        return 0
+    count = sum(1 for _, slot in _OUTPUT_FIELDS if getattr(record, slot))
+    if record.keyword_mask or record.extra_keywords:
+        count += 1
+    return count
+
+
 def has_any_intelligence(session_id: str) -> bool:
-    _ensure_session(session_id)
-    data = _intelligence_store[session_id]
-    return any(len(values) > 0 for values in data.values())
+    return count_intelligence_types(session_id) > 0
 
 
 def delete_session_intelligence(session_id: str) -> None:
     if session_id in _intelligence_store:
         del _intelligence_store[session_id]
+
+
+# -----------------------------
+# Snapshot / token export
+# -----------------------------
+
+def _dump_digits(values) -> Sequence:
+    if not values:
+        return ()
+    return values.tolist() if isinstance(values, array) else list(values)
+
+
+def _load_digits(values: Sequence):
+    if not values:
+        return None
+    if any(isinstance(v, str) for v in values):
+        return tuple(sys.intern(v) if isinstance(v, str) else v for v in values)
+    return array("Q", values)
+
+
+def _dump_record(record: _IntelRecord) -> Tuple:
+    return (
+        record.keyword_mask,
+        record.extra_keywords or (),
+        _dump_digits(record.phone_numbers),
+        _dump_digits(record.bank_accounts),
+        record.ifsc_codes.tolist() if record.ifsc_codes else (),
+        record.upi_ids or (),
+        record.urls or (),
+    )
+
+
+def _load_record(data: Sequence) -> _IntelRecord:
+    mask, extra, phones, banks, ifsc, upi_ids, urls = data
+    record = _IntelRecord()
+    record.keyword_mask = mask
+    record.extra_keywords = tuple(sys.intern(v) for v in extra) or None
+    record.phone_numbers = _load_digits(phones)
+    record.bank_accounts = _load_digits(banks)
+    record.ifsc_codes = array("Q", ifsc) if ifsc else None
+    record.upi_ids = tuple(sys.intern(v) for v in upi_ids) or None
+    record.urls = tuple(sys.intern(v) for v in urls) or None
+    return record
+
+
+def dump_state(session_ids: Optional[Collection[str]] = None) -> Dict[str, Tuple]:
+    """Export packed records (plain tuples of ints and strings)."""
+    if session_ids is None:
+        session_ids = _intelligence_store.keys()
+    return {
+        sid: _dump_record(_intelligence_store[sid])
+        for sid in session_ids
+        if sid in _intelligence_store
+    }
+
+
+def load_state(data: Dict[str, Sequence], session_ids: Optional[Collection[str]] = None) -> None:
+    if session_ids is None:
+        _intelligence_store.clear()
+    else:
+        for sid in session_ids:
+            _intelligence_store.pop(sid, None)
+    for sid, packed in data.items():
+        _intelligence_store[sid] = _load_record(packed)
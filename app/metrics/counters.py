@@ -1,4 +1,5 @@
-from typing import Dict
+from typing import Collection, Dict, Optional
+from app.utils import tracing
 
 
 # In-memory per-session message counters
@@ -6,9 +7,10 @@ _message_counters: Dict[str, int] = {}
 
 
 def increment_message_counter(session_id: str) -> None:
-    if session_id not in _message_counters:
-        _message_counters[session_id] = 0
-    _message_counters[session_id] += 1
+    with tracing.span("store.increment_message_counter"):
+        if session_id not in _message_counters:
+            _message_counters[session_id] = 0
+        _message_counters[session_id] += 1
 
 
 def get_message_count(session_id: str) -> int:
@@ -18,3 +20,18 @@ def get_message_count(session_id: str) -> int:
 def delete_counter(session_id: str) -> None:
     if session_id in _message_counters:
         del _message_counters[session_id]
+
+
+def dump_state(session_ids: Optional[Collection[str]] = None) -> Dict[str, int]:
+    if session_ids is None:
+        return dict(_message_counters)
+    return {sid: _message_counters[sid] for sid in session_ids if sid in _message_counters}
+
+
+def load_state(data: Dict[str, int], session_ids: Optional[Collection[str]] = None) -> None:
+    if session_ids is None:
+        _message_counters.clear()
+    else:
+        for sid in session_ids:
+            _message_counters.pop(sid, None)
+    _message_counters.update(data)
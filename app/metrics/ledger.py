@@ -0,0 +1,169 @@
+import os
+from contextvars import ContextVar
+from typing import Any, Collection, Dict, Optional, Sequence, Tuple
+
+from app.metrics import prometheus
+
+
+# Append a one-line cost summary to the callback agentNotes
+LEDGER_IN_AGENT_NOTES = os.getenv("LEDGER_IN_AGENT_NOTES", "0").lower() in ("1", "true", "yes")
+
+# Session whose turn is running; set by the route so the LLM client and
+# callback sender (including executor threads, via copied contexts) can
+# charge costs without a session_id parameter on every call.
+current_session: ContextVar[Optional[str]] = ContextVar("ledger_session", default=None)
+
+
+class _SessionCost:
+    """Per-session cost and latency totals (plain ints, one object per session)."""
+    __slots__ = (
+        "llm_calls", "llm_errors", "llm_ns", "tokens_in", "tokens_out", "last_model",
+        "fallbacks", "callback_attempts", "callback_ns",
+    )
+
+    def __init__(self) -> None:
+        self.llm_calls = 0
+        self.llm_errors = 0
+        self.llm_ns = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.last_model: Optional[str] = None
+        self.fallbacks = 0
+        self.callback_attempts = 0
+        self.callback_ns = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "llmCalls": self.llm_calls,
+            "llmErrors": self.llm_errors,
+            "llmMs": round(self.llm_ns / 1e6, 1),
+            "tokensIn": self.tokens_in,
+            "tokensOut": self.tokens_out,
+            "model": self.last_model,
+            "fallbacks": self.fallbacks,
+            "callbackAttempts": self.callback_attempts,
+            "callbackMs": round(self.callback_ns / 1e6, 1),
+        }
+
+
+_ledger: Dict[str, _SessionCost] = {}
+
+prometheus.describe("honeypot_llm_calls_total", "Gemini generate_content calls by model and outcome")
+prometheus.describe("honeypot_llm_tokens_total", "Gemini tokens by model and direction")
+prometheus.describe("honeypot_llm_call_seconds_total", "Time spent in Gemini calls by model")
+prometheus.describe("honeypot_callback_attempts_total", "Callback HTTP attempts by result")
+prometheus.describe("honeypot_callback_seconds_total", "Time spent delivering callbacks, retries included")
+
+
+def _entry(session_id: Optional[str]) -> Optional[_SessionCost]:
+    if session_id is None:
+        session_id = current_session.get()
+        if session_id is None:
+            return None
+    entry = _ledger.get(session_id)
+    if entry is None:
+        entry = _ledger[session_id] = _SessionCost()
+    return entry
+
+
+# -----------------------------
+# Recording
+# -----------------------------
+
+def record_llm_call(
+    model: str,
+    latency_ns: int,
+    ok: bool,
+    tokens_in: int = 0,
+    tokens_out: int = 0,
+    session_id: Optional[str] = None,
+) -> None:
+    prometheus.inc("honeypot_llm_calls_total", model=model, outcome="ok" if ok else "error")
+    prometheus.inc("honeypot_llm_call_seconds_total", latency_ns / 1e9, model=model)
+    if tokens_in:
+        prometheus.inc("honeypot_llm_tokens_total", tokens_in, model=model, direction="in")
+    if tokens_out:
+        prometheus.inc("honeypot_llm_tokens_total", tokens_out, model=model, direction="out")
+    entry = _entry(session_id)
+    if entry is not None:
+        entry.llm_calls += 1
+        entry.llm_errors += 0 if ok else 1
+        entry.llm_ns += latency_ns
+        entry.tokens_in += tokens_in
+        entry.tokens_out += tokens_out
+        entry.last_model = model
+
+
+def record_fallback(session_id: Optional[str] = None) -> None:
+    entry = _entry(session_id)
+    if entry is not None:
+        entry.fallbacks += 1
+
+
+def record_callback_attempt(ok: bool, session_id: Optional[str] = None) -> None:
+    prometheus.inc("honeypot_callback_attempts_total", result="ok" if ok else "error")
+    entry = _entry(session_id)
+    if entry is not None:
+        entry.callback_attempts += 1
+
+
+def record_callback_duration(duration_ns: int, session_id: Optional[str] = None) -> None:
+    prometheus.inc("honeypot_callback_seconds_total", duration_ns / 1e9)
+    entry = _entry(session_id)
+    if entry is not None:
+        entry.callback_ns += duration_ns
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+
+def get_session_cost(session_id: str) -> Optional[Dict[str, Any]]:
+    entry = _ledger.get(session_id)
+    return entry.to_dict() if entry is not None else None
+
+
+def format_for_notes(session_id: str) -> str:
+    entry = _ledger.get(session_id)
+    if entry is None:
+        return "Cost: no LLM calls."
+    return (
+        f"Cost: {entry.llm_calls} LLM calls ({entry.llm_errors} failed, "
+        f"{entry.tokens_in}/{entry.tokens_out} tokens in/out, {entry.llm_ns / 1e6:.0f}ms), "
+        f"{entry.fallbacks} fallback replies."
+    )
+
+
+def delete_session_cost(session_id: str) -> None:
+    _ledger.pop(session_id, None)
+
+
+def session_count() -> int:
+    return len(_ledger)
+
+
+# -----------------------------
+# Snapshot / session token support
+# -----------------------------
+
+def dump_state(session_ids: Optional[Collection[str]] = None) -> Dict[str, Tuple]:
+    """Export each session's totals as a tuple in _SessionCost.__slots__ order."""
+    ids = _ledger.keys() if session_ids is None else [sid for sid in session_ids if sid in _ledger]
+    return {
+        sid: tuple(getattr(_ledger[sid], name) for name in _SessionCost.__slots__)
+        for sid in ids
+    }
+
+
+def load_state(data: Dict[str, Sequence], session_ids: Optional[Collection[str]] = None) -> None:
+    if session_ids is None:
+        _ledger.clear()
+    else:
+        for sid in session_ids:
+            _ledger.pop(sid, None)
+    for sid, values in data.items():
+        if len(values) != len(_SessionCost.__slots__):
+            raise ValueError(f"Unexpected cost record for session {sid}")
+        entry = _ledger[sid] = _SessionCost()
+        for name, value in zip(_SessionCost.__slots__, values):
+            setattr(entry, name, value)
@@ -0,0 +1,155 @@
+import os
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Master switch: METRICS_ENABLED=0 turns every recording call into a no-op
+ENABLED = os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
+
+# handle_message stages timed with perf_counter_ns
+STAGES = ("validation", "detection", "fsm_transition", "extraction", "llm", "callback", "turn")
+
+# Bucket upper bounds in nanoseconds (50us .. 10s)
+LATENCY_BUCKETS_NS = tuple(
+    int(seconds * 1e9) for seconds in (
+        0.00005, 0.0001, 0.00025, 0.0005,
+        0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+        0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+    )
+)
+
+# Set when a request arrives so the handler can time body parsing + validation
+request_start_ns: ContextVar[Optional[int]] = ContextVar("request_start_ns", default=None)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (plain integer counters, no locking)."""
+    __slots__ = ("bounds", "bucket_counts", "total_ns", "count")
+
+    def __init__(self, bounds: Tuple[int, ...] = LATENCY_BUCKETS_NS) -> None:
+        self.bounds = bounds
+        self.bucket_counts = [0] * (len(bounds) + 1)
+        self.total_ns = 0
+        self.count = 0
+
+    def observe(self, value_ns: int) -> None:
+        self.bucket_counts[bisect_left(self.bounds, value_ns)] += 1
+        self.total_ns += value_ns
+        self.count += 1
+
+
+_stage_histograms: Dict[str, Histogram] = {stage: Histogram() for stage in STAGES}
+
+# (metric name, sorted label pairs) -> value
+_counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = defaultdict(int)
+
+# Gauges computed at scrape time: name -> callable returning {label tuple: value}
+_gauge_collectors: Dict[str, Callable[[], Dict[Tuple[Tuple[str, str], ...], float]]] = {}
+
+_HELP = {
+    "honeypot_stage_latency_seconds": "Latency of each handle_message stage",
+    "honeypot_fsm_transitions_total": "FSM state transitions",
+    "honeypot_llm_cache_total": "LLM response cache lookups by result",
+    "honeypot_llm_fallback_total": "Replies served from fallback pools",
+    "honeypot_idempotent_replays_total": "Retried requests answered with the original reply",
+}
+
+
+# -----------------------------
+# Recording
+# -----------------------------
+
+def observe_stage(stage: str, start_ns: int) -> None:
+    """Record time elapsed since start_ns (a perf_counter_ns reading) for a stage."""
+    if ENABLED:
+        _stage_histograms[stage].observe(time.perf_counter_ns() - start_ns)
+
+
+def observe_validation() -> None:
+    """Record request receipt -> handler entry (body read, parsing, validation, auth)."""
+    if ENABLED:
+        start_ns = request_start_ns.get()
+        if start_ns is not None:
+            _stage_histograms["validation"].observe(time.perf_counter_ns() - start_ns)
+
+
+def inc(name: str, amount: float = 1, **labels: str) -> None:
+    if ENABLED:
+        _counters[(name, tuple(sorted(labels.items())))] += amount
+
+
+def describe(name: str, help_text: str) -> None:
+    """HELP text for a counter recorded with inc()."""
+    _HELP[name] = help_text
+
+
+def register_gauge(
+    name: str,
+    collector: Callable[[], Dict[Tuple[Tuple[str, str], ...], float]],
+    help_text: str = "",
+) -> None:
+    _gauge_collectors[name] = collector
+    if help_text:
+        _HELP[name] = help_text
+
+
+def get_counter(name: str, **labels: str) -> float:
+    return _counters.get((name, tuple(sorted(labels.items()))), 0)
+
+
+def reset() -> None:
+    for stage in STAGES:
+        _stage_histograms[stage] = Histogram()
+    _counters.clear()
+
+
+# -----------------------------
+# Prometheus text exposition
+# -----------------------------
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _header(lines: List[str], name: str, metric_type: str) -> None:
+    if name in _HELP:
+        lines.append(f"# HELP {name} {_HELP[name]}")
+    lines.append(f"# TYPE {name} {metric_type}")
+
+
+def render() -> str:
+    lines: List[str] = []
+
+    name = "honeypot_stage_latency_seconds"
+    _header(lines, name, "histogram")
+    for stage, hist in _stage_histograms.items():
+        cumulative = 0
+        for bound, bucket_count in zip(hist.bounds, hist.bucket_counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{stage="{stage}",le="{bound / 1e9:g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {hist.count}')
+        lines.append(f'{name}_sum{{stage="{stage}"}} {hist.total_ns / 1e9:.9f}')
+        lines.append(f'{name}_count{{stage="{stage}"}} {hist.count}')
+
+    by_name: Dict[str, List[str]] = defaultdict(list)
+    for (counter_name, labels), value in sorted(_counters.items()):
+        by_name[counter_name].append(f"{counter_name}{_format_labels(labels)} {value}")
+    for counter_name, samples in by_name.items():
+        _header(lines, counter_name, "counter")
+        lines.extend(samples)
+
+    for gauge_name, collector in _gauge_collectors.items():
+        _header(lines, gauge_name, "gauge")
+        for labels, value in sorted(collector().items()):
+            lines.append(f"{gauge_name}{_format_labels(labels)} {value:g}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,181 @@
+import atexit
+import gzip
+import json
+import os
+import queue
+import re
+import threading
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+
+# Opt-in traffic capture of /message bodies (empty path = disabled)
+CAPTURE_PATH = os.getenv("CAPTURE_PATH", "")
+# Fraction of sessions captured; whole conversations are kept or skipped
+CAPTURE_SAMPLE_RATE = float(os.getenv("CAPTURE_SAMPLE_RATE", "1.0"))
+# Uncompressed bytes per file before rotation, and rotated files kept
+CAPTURE_MAX_BYTES = int(os.getenv("CAPTURE_MAX_BYTES", str(64 * 1024 * 1024)))
+CAPTURE_BACKUP_COUNT = int(os.getenv("CAPTURE_BACKUP_COUNT", "5"))
+CAPTURE_QUEUE_SIZE = int(os.getenv("CAPTURE_QUEUE_SIZE", "10000"))
+CAPTURE_MAX_BODY_BYTES = 64 * 1024
+
+ENABLED = bool(CAPTURE_PATH)
+
+REDACTED = "[REDACTED]"
+
+# Credentials typed into a message ("OTP is 482913", "pin: 1234", "password=hunter2")
+_CREDENTIAL_PATTERN = re.compile(
+    r"\b(otp|pin|cvv|password|passcode|mpin)(\s*(?:is|:|=|-)?\s*)([^\s,.;]+)",
+    re.IGNORECASE,
+)
+# Card numbers written in 4-digit groups
+_CARD_PATTERN = re.compile(r"\b\d{4}[ -]\d{4}[ -]\d{4}[ -]\d{1,7}\b")
+
+
+def redact_text(text: str) -> str:
+    text = _CREDENTIAL_PATTERN.sub(lambda m: f"{m.group(1)}{m.group(2)}{REDACTED}", text)
+    return _CARD_PATTERN.sub(REDACTED, text)
+
+
+def redact_body(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Redact credentials in message texts; UPI IDs, phones and URLs are kept for replay."""
+    message = body.get("message")
+    if isinstance(message, dict) and isinstance(message.get("text"), str):
+        message["text"] = redact_text(message["text"])
+    for item in body.get("conversationHistory") or []:
+        if isinstance(item, dict) and isinstance(item.get("text"), str):
+            item["text"] = redact_text(item["text"])
+    return body
+
+
+def is_sampled(session_id: str, rate: Optional[float] = None) -> bool:
+    rate = CAPTURE_SAMPLE_RATE if rate is None else rate
+    if rate >= 1.0:
+        return True
+    return zlib.crc32(session_id.encode()) % 10000 < rate * 10000
+
+
+def _rotate(path: str) -> None:
+    for i in range(CAPTURE_BACKUP_COUNT - 1, 0, -1):
+        if os.path.exists(f"{path}.{i}"):
+            os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+    if CAPTURE_BACKUP_COUNT > 0:
+        os.replace(path, f"{path}.1")
+    else:
+        os.remove(path)
+
+
+class _CaptureWriter:
+    """
+    Background thread that parses, samples, redacts and writes captured
+    requests as gzip-compressed JSON lines. Request handling only pays for a
+    queue put; a full queue drops the record.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.queue: "queue.Queue[Optional[Tuple]]" = queue.Queue(maxsize=CAPTURE_QUEUE_SIZE)
+        self.dropped = 0
+        self.written = 0
+        self._file = None
+        self._file_bytes = 0
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="capture-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, arrival: float, path: str, body: bytes, status: int, latency_ms: float) -> None:
+        try:
+            self.queue.put_nowait((arrival, path, body, status, latency_ms))
+        except queue.Full:
+            self.dropped += 1
+
+    def _open(self) -> None:
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            _rotate(self.path)
+        self._file = gzip.open(self.path, "ab", compresslevel=6)
+        self._file_bytes = 0
+
+    def _write(self, item: Tuple) -> None:
+        arrival, path, body, status, latency_ms = item
+        try:
+            parsed = json.loads(body)
+        except ValueError:
+            return
+        if not isinstance(parsed, dict):
+            return
+        session_id = str(parsed.get("sessionId", ""))
+        if not is_sampled(session_id):
+            return
+        line = json.dumps({
+            "t": round(arrival, 6),
+            "path": path,
+            "sessionId": session_id,
+            "status": status,
+            "latencyMs": round(latency_ms, 3),
+            "body": redact_body(parsed),
+        }, separators=(",", ":")).encode() + b"\n"
+        if self._file is None or self._file_bytes >= CAPTURE_MAX_BYTES:
+            if self._file is not None:
+                self._file.close()
+            self._open()
+        self._file.write(line)
+        self._file_bytes += len(line)
+        self.written += 1
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            try:
+                self._write(item)
+                # Flush when idle so a crash loses at most the current burst
+                if self.queue.empty() and self._file is not None:
+                    self._file.flush()
+            except Exception:
+                self.dropped += 1
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def stop(self, timeout: float = 5.0) -> None:
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+
+_writer: Optional[_CaptureWriter] = None
+
+
+def record(arrival: float, path: str, body: bytes, status: int, latency_ms: float) -> None:
+    """Queue one request for capture (called by CaptureMiddleware)."""
+    global _writer
+    if _writer is None:
+        _writer = _CaptureWriter(CAPTURE_PATH)
+        atexit.register(_writer.stop)
+    _writer.start()
+    _writer.submit(arrival, path, body, status, latency_ms)
+
+
+def stop() -> None:
+    """Flush and close the capture file (application shutdown)."""
+    global _writer
+    if _writer is not None:
+        _writer.stop()
+        _writer = None
+
+
+def stats() -> Dict[str, int]:
+    if _writer is None:
+        return {"written": 0, "dropped": 0}
+    return {"written": _writer.written, "dropped": _writer.dropped}
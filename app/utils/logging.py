@@ -1,11 +1,26 @@
+import atexit
 import logging
 import json
-from typing import Any, Dict, Optional
+import os
+import queue
+import random
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Records waiting for the writer thread. Bounded: when full, records are
+# dropped (and counted) rather than blocking the event loop.
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_BATCH_SIZE = 256
+
+# Per-logger sampling for records below WARNING, e.g. "app.api.routes=0.1,app.access=0.05"
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
 
 
 class StructuredFormatter(logging.Formatter):
     """JSON-based structured logging formatter."""
-    
+
     def format(self, record: logging.LogRecord) -> str:
         log_data = {
             "timestamp": self.formatTime(record, self.datefmt),
@@ -13,7 +28,7 @@ class StructuredFormatter(logging.Formatter):
             "logger": record.name,
             "message": record.getMessage(),
         }
-        
+
         # Add extra fields if present
         if hasattr(record, "session_id"):
             log_data["session_id"] = record.session_id
@@ -21,10 +36,147 @@ class StructuredFormatter(logging.Formatter):
             log_data["state"] = record.state
         if hasattr(record, "extra_data"):
             log_data["data"] = record.extra_data
-            
+
         return json.dumps(log_data)
 
 
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of records below WARNING; warnings and errors always pass."""
+
+    def __init__(self, rate: float = 1.0) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class _LogWriter:
+    """
+    Background thread that formats queued records and writes them to stderr
+    in batches (one write + flush per batch instead of per record).
+    """
+
+    def __init__(self) -> None:
+        self.queue: "queue.Queue[Optional[Tuple[logging.Formatter, logging.LogRecord]]]" = (
+            queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        )
+        self.dropped = 0
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, formatter: logging.Formatter, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait((formatter, record))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            batch = [item]
+            while len(batch) < LOG_BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines: List[str] = []
+            stop = False
+            for entry in batch:
+                if entry is None:
+                    stop = True
+                    continue
+                formatter, record = entry
+                try:
+                    lines.append(formatter.format(record))
+                except Exception:
+                    lines.append(f"Unformattable log record from {record.name}: {record.msg!r}")
+            if lines:
+                try:
+                    # Resolved per batch so redirected/captured stderr is honoured
+                    sys.stderr.write("\n".join(lines) + "\n")
+                    sys.stderr.flush()
+                except Exception:
+                    pass
+            if stop:
+                return
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Flush pending records and stop the thread (registered with atexit)."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+
+_writer = _LogWriter()
+atexit.register(_writer.stop)
+
+
+class QueuedHandler(logging.Handler):
+    """
+    Hands records to the writer thread. Like QueueHandler.prepare, %-style
+    args and exception tracebacks are rendered here, while the objects they
+    refer to are still in the state being logged. Timestamps, the line
+    format and JSON encoding happen off the calling thread.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info:
+                record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+                record.exc_info = None
+        except Exception:
+            self.handleError(record)
+            return
+        _writer.submit(self.formatter or logging.Formatter(), record)
+
+
+def _parse_sample_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for item in spec.split(","):
+        name, _, rate = item.strip().partition("=")
+        if name and rate:
+            try:
+                rates[name] = float(rate)
+            except ValueError:
+                pass
+    return rates
+
+
+_sample_rates = _parse_sample_rates(LOG_SAMPLE_RATES)
+_sampling_filters: Dict[str, SamplingFilter] = {}
+
+
+def set_sample_rate(name: str, rate: float) -> None:
+    """Change the sampling rate of a logger created by get_logger at runtime."""
+    _sample_rates[name] = rate
+    if name in _sampling_filters:
+        _sampling_filters[name].rate = rate
+
+
+def get_sample_rate(name: str) -> float:
+    return _sample_rates.get(name, 1.0)
+
+
+def dropped_record_count() -> int:
+    return _writer.dropped
+
+
 def get_logger(name: str, structured: bool = False) -> logging.Logger:
     logger = logging.getLogger(name)
 
@@ -33,17 +185,21 @@ def get_logger(name: str, structured: bool = False) -> logging.Logger:
 
     logger.setLevel(logging.INFO)
 
-    handler = logging.StreamHandler()
-    
+    handler = QueuedHandler()
+
     if structured:
         formatter = StructuredFormatter()
     else:
         formatter = logging.Formatter(
             "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
         )
-    
+
     handler.setFormatter(formatter)
+    sampling = SamplingFilter(_sample_rates.get(name, 1.0))
+    _sampling_filters[name] = sampling
+    handler.addFilter(sampling)
     logger.addHandler(handler)
+    _writer.start()
     return logger
 
 
@@ -63,5 +219,5 @@ def log_with_context(
         extra["state"] = state
     if extra_data:
         extra["extra_data"] = extra_data
-    
+
     logger.log(level, message, extra=extra)
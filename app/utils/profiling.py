@@ -0,0 +1,224 @@
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from app.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+# Continuous sampler (disabled unless CONTINUOUS_PROFILE_PATH is set)
+CONTINUOUS_PROFILE_PATH = os.getenv("CONTINUOUS_PROFILE_PATH", "")
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "50"))
+PROFILE_FLUSH_SECONDS = float(os.getenv("PROFILE_FLUSH_SECONDS", "60"))
+PROFILE_MAX_BYTES = int(os.getenv("PROFILE_MAX_BYTES", str(10 * 1024 * 1024)))
+PROFILE_BACKUP_COUNT = int(os.getenv("PROFILE_BACKUP_COUNT", "3"))
+
+MAX_PROFILE_SECONDS = 60
+MAX_STACK_DEPTH = 64
+
+
+class ProfilerBusy(Exception):
+    """Raised when an on-demand profile is requested while another one is running."""
+    pass
+
+
+_on_demand_lock = threading.Lock()
+
+
+# -----------------------------
+# Stack sampling
+# -----------------------------
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", os.path.basename(code.co_filename))
+    return f"{module}:{code.co_name}"
+
+
+def _collapse(frame, thread_name: str) -> str:
+    labels: List[str] = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """
+    Samples every thread's Python stack at a fixed interval and aggregates
+    them as collapsed stacks ("thread;module:func;... count"), the input
+    format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval_ms: float = PROFILE_SAMPLE_INTERVAL_MS) -> None:
+        self.interval = interval_ms / 1000.0
+        self.counts: Counter = Counter()
+        self._counts_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample_once(self) -> None:
+        own_id = threading.get_ident()
+        names: Dict[int, str] = {t.ident: t.name for t in threading.enumerate()}
+        stacks = [
+            _collapse(frame, names.get(thread_id, f"thread-{thread_id}"))
+            for thread_id, frame in sys._current_frames().items()
+            if thread_id != own_id
+        ]
+        with self._counts_lock:
+            self.counts.update(stacks)
+
+    def take(self) -> Counter:
+        """Return and reset the aggregated counts."""
+        with self._counts_lock:
+            counts, self.counts = self.counts, Counter()
+        return counts
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample_once()
+            except Exception:
+                pass
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def format_collapsed(counts: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+
+# -----------------------------
+# On-demand profiles
+# -----------------------------
+
+async def profile_cprofile(seconds: float, limit: int = 100) -> str:
+    """
+    Run cProfile on the event loop thread for `seconds` and return pstats text.
+    Every request handler, detection and store call runs on this thread;
+    Gemini calls show up as time spent waiting on the executor.
+    """
+    if not _on_demand_lock.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running")
+    try:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await asyncio.sleep(min(seconds, MAX_PROFILE_SECONDS))
+        finally:
+            profiler.disable()
+        out = io.StringIO()
+        stats = pstats.Stats(profiler, stream=out)
+        stats.sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+    finally:
+        _on_demand_lock.release()
+
+
+async def profile_collapsed(seconds: float, interval_ms: float = 5.0) -> str:
+    """Sample all threads (including executor threads) for `seconds`; return collapsed stacks."""
+    if not _on_demand_lock.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running")
+    try:
+        sampler = StackSampler(interval_ms)
+        sampler.start()
+        try:
+            await asyncio.sleep(min(seconds, MAX_PROFILE_SECONDS))
+        finally:
+            sampler.stop()
+        return format_collapsed(sampler.take())
+    finally:
+        _on_demand_lock.release()
+
+
+# -----------------------------
+# Continuous profiling
+# -----------------------------
+
+def _rotate(path: str) -> None:
+    for i in range(PROFILE_BACKUP_COUNT - 1, 0, -1):
+        if os.path.exists(f"{path}.{i}"):
+            os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+    if PROFILE_BACKUP_COUNT > 0:
+        os.replace(path, f"{path}.1")
+    else:
+        os.remove(path)
+
+
+def write_collapsed(path: str, counts: Counter) -> None:
+    """Append one flush window of collapsed stacks, rotating the file by size."""
+    if not counts:
+        return
+    if os.path.exists(path) and os.path.getsize(path) >= PROFILE_MAX_BYTES:
+        _rotate(path)
+    with open(path, "a") as f:
+        f.write(f"# window_end={int(time.time())} samples={sum(counts.values())}\n")
+        f.write(format_collapsed(counts))
+
+
+class ContinuousProfiler:
+    """Low-frequency always-on sampler flushing to a rotating collapsed-stack file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.sampler = StackSampler(PROFILE_SAMPLE_INTERVAL_MS)
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(PROFILE_FLUSH_SECONDS):
+            self.flush()
+
+    def flush(self) -> None:
+        try:
+            write_collapsed(self.path, self.sampler.take())
+        except Exception as e:
+            logger.error("Continuous profile flush failed: %s", e)
+
+    def start(self) -> None:
+        self.sampler.start()
+        self._flusher = threading.Thread(target=self._flush_loop, name="profile-flusher", daemon=True)
+        self._flusher.start()
+        logger.info("Continuous profiling to %s every %sms", self.path, PROFILE_SAMPLE_INTERVAL_MS)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.sampler.stop()
+        self.flush()
+
+
+_continuous: Optional[ContinuousProfiler] = None
+
+
+def start_continuous(path: str = CONTINUOUS_PROFILE_PATH) -> None:
+    global _continuous
+    if path and _continuous is None:
+        _continuous = ContinuousProfiler(path)
+        _continuous.start()
+
+
+def stop_continuous() -> None:
+    global _continuous
+    if _continuous is not None:
+        _continuous.stop()
+        _continuous = None
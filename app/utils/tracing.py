@@ -0,0 +1,153 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+
+# Fraction of requests that record a span tree (0 disables tracing)
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+# Completed traces kept in memory (oldest dropped first)
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "256"))
+
+
+class Span:
+    __slots__ = ("name", "attributes", "start_ns", "end_ns", "thread_id", "children")
+
+    def __init__(self, name: str, attributes: Dict[str, Any]) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.thread_id = threading.get_ident()
+        self.children: List["Span"] = []
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def finish(self) -> None:
+        self.end_ns = time.perf_counter_ns()
+
+    def to_dict(self, origin_ns: int) -> Dict[str, Any]:
+        end_ns = self.end_ns if self.end_ns is not None else self.start_ns
+        return {
+            "name": self.name,
+            "startMs": round((self.start_ns - origin_ns) / 1e6, 3),
+            "durationMs": round((end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "children": [child.to_dict(origin_ns) for child in list(self.children)],
+        }
+
+
+class _Trace:
+    __slots__ = ("trace_id", "wall_time", "root")
+
+    def __init__(self, trace_id: int, root: Span) -> None:
+        self.trace_id = trace_id
+        self.wall_time = time.time()
+        self.root = root
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_traces: Deque[_Trace] = deque(maxlen=TRACE_BUFFER_SIZE)
+_trace_ids = iter(range(1, 1 << 62))
+
+
+# -----------------------------
+# Recording
+# -----------------------------
+
+@contextmanager
+def trace(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Start a root span for one request, subject to TRACE_SAMPLE_RATE."""
+    if TRACE_SAMPLE_RATE <= 0 or random.random() >= TRACE_SAMPLE_RATE:
+        yield None
+        return
+    root = Span(name, attributes)
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.set(error=type(e).__name__)
+        raise
+    finally:
+        root.finish()
+        _current_span.reset(token)
+        _traces.append(_Trace(next(_trace_ids), root))
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Child span of the current span; a no-op when the request is not sampled."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, attributes)
+    parent.children.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.set(error=type(e).__name__)
+        raise
+    finally:
+        child.finish()
+        _current_span.reset(token)
+
+
+def event(name: str, **attributes: Any) -> None:
+    """Zero-duration span (e.g. a model skipped by the rate limiter)."""
+    parent = _current_span.get()
+    if parent is not None:
+        marker = Span(name, attributes)
+        marker.end_ns = marker.start_ns
+        parent.children.append(marker)
+
+
+def clear() -> None:
+    _traces.clear()
+
+
+# -----------------------------
+# Export
+# -----------------------------
+
+def export_json(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    traces = list(_traces)[-limit:] if limit else list(_traces)
+    return [
+        {
+            "traceId": t.trace_id,
+            "timestamp": t.wall_time,
+            **t.root.to_dict(t.root.start_ns),
+        }
+        for t in traces
+    ]
+
+
+def _chrome_events(s: Span, trace_id: int, events: List[Dict[str, Any]]) -> None:
+    end_ns = s.end_ns if s.end_ns is not None else s.start_ns
+    events.append({
+        "name": s.name,
+        "ph": "X",
+        "ts": s.start_ns / 1e3,
+        "dur": (end_ns - s.start_ns) / 1e3,
+        "pid": 1,
+        # One row per request keeps concurrent requests from overlapping
+        "tid": trace_id,
+        "args": {**s.attributes, "thread": s.thread_id},
+    })
+    for child in list(s.children):
+        _chrome_events(child, trace_id, events)
+
+
+def export_chrome(limit: Optional[int] = None) -> Dict[str, Any]:
+    """Chrome trace-event format (load in chrome://tracing or Perfetto)."""
+    traces = list(_traces)[-limit:] if limit else list(_traces)
+    events: List[Dict[str, Any]] = []
+    for t in traces:
+        _chrome_events(t.root, t.trace_id, events)
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Compare full-history requests with delta-only requests (SERVER_HISTORY=1):
+request bytes and IncomingRequest parse time per turn.
+
+Usage:
+    python benchmarks/history_delta.py [turns] [iterations]
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.schemas import IncomingRequest, MAX_HISTORY_ITEMS
+from app.bench import corpus
+
+
+def build_bodies(turns: int):
+    script = corpus.build_messages(turns)
+    replies = corpus.build_messages(turns, seed=corpus.DEFAULT_SEED + 1, scam_ratio=0.0)
+    full, delta = [], []
+    history = []
+    for turn in range(turns):
+        message = {"sender": "scammer", "text": script[turn], "timestamp": turn}
+        full.append(json.dumps({
+            "sessionId": "bench-history",
+            "message": message,
+            "conversationHistory": history[-MAX_HISTORY_ITEMS:],
+        }).encode())
+        delta.append(json.dumps({
+            "sessionId": "bench-history",
+            "message": message,
+            "conversationHistory": [],
+        }).encode())
+        history = history + [message, {"sender": "user", "text": replies[turn], "timestamp": turn}]
+    return full, delta
+
+
+def parse_us(body: bytes, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        IncomingRequest.model_validate_json(body)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    full, delta = build_bodies(turns)
+
+    print(f"{'turn':>4} {'full B':>8} {'delta B':>8} {'full parse us':>14} {'delta parse us':>15}")
+    totals = [0, 0, 0.0, 0.0]
+    for turn in range(turns):
+        row = (len(full[turn]), len(delta[turn]), parse_us(full[turn], iterations), parse_us(delta[turn], iterations))
+        totals = [a + b for a, b in zip(totals, row)]
+        if turn in (0, 1, 4, 9) or turn == turns - 1:
+            print(f"{turn + 1:>4} {row[0]:>8} {row[1]:>8} {row[2]:>14.1f} {row[3]:>15.1f}")
+    print(f"{'avg':>4} {totals[0] / turns:>8.0f} {totals[1] / turns:>8.0f} "
+          f"{totals[2] / turns:>14.1f} {totals[3] / turns:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
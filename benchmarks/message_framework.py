@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Framework overhead of POST /message: routing, auth, body decode, validation
+and response encoding, with the conversation pipeline stubbed out.
+Requests are driven straight through the ASGI app (no sockets, no client).
+
+Usage:
+    python benchmarks/message_framework.py [iterations]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("API_KEY", "benchmark-key")
+os.environ["METRICS_ENABLED"] = "0"
+
+import logging
+
+from app.main import app
+from app.api import routes
+from app.api.schemas import APIResponse
+from app.bench import corpus
+
+
+async def _stub_handle_message(request):
+    return APIResponse(status="success", reply="Okay.")
+
+
+def build_body(history_items: int) -> bytes:
+    messages = corpus.build_messages(history_items + 1)
+    return json.dumps({
+        "sessionId": "bench-framework",
+        "message": {"sender": "scammer", "text": messages[-1], "timestamp": history_items},
+        "conversationHistory": [
+            {"sender": "scammer" if i % 2 == 0 else "user", "text": text, "timestamp": i}
+            for i, text in enumerate(messages[:-1])
+        ],
+    }).encode()
+
+
+async def call(body: bytes) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/message",
+        "raw_path": b"/message",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"x-api-key", os.environ["API_KEY"].encode()),
+        ],
+        "client": ("127.0.0.1", 1234),
+        "server": ("127.0.0.1", 8000),
+    }
+    status = 0
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run(iterations: int) -> None:
+    print(f"{'history':>8} {'bytes':>7} {'us/request':>11}")
+    for history_items in (0, 10, 50):
+        body = build_body(history_items)
+        assert await call(body) == 200
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await call(body)
+        elapsed = (time.perf_counter() - start) / iterations * 1e6
+        print(f"{history_items:>8} {len(body):>7} {elapsed:>11.1f}")
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    routes.handle_message = _stub_handle_message
+    logging.disable(logging.INFO)
+    asyncio.run(run(iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark stateless session token size and encode/decode latency.
+
+Usage:
+    python benchmarks/session_token.py [iterations]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SESSION_TOKEN_SECRET", "benchmark-secret")
+
+from app.core import session_store, session_token
+from app.core.state_machine import FSMState
+from app.extraction import store as extraction_store
+from app.metrics import counters
+
+
+def build_session(session_id: str, intel_items: int) -> None:
+    session_store.set_session_state(session_id, FSMState.AGENT_ENGAGED)
+    for _ in range(intel_items + 1):
+        counters.increment_message_counter(session_id)
+    for i in range(intel_items):
+        extraction_store.add_upi_id(session_id, f"refund.desk{i}@okaxis")
+        extraction_store.add_phone_number(session_id, f"98765{i:05d}")
+        extraction_store.add_url(session_id, f"https://secure-kyc-update{i}.example.com/login")
+        extraction_store.add_bank_account(session_id, f"50100{i:07d}")
+        extraction_store.add_suspicious_keyword(session_id, "urgent")
+        extraction_store.add_suspicious_keyword(session_id, "otp")
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    print(f"{'profile':<10} {'bytes':>6} {'encode us':>10} {'decode us':>10}")
+    for label, intel_items in (("new", 0), ("typical", 2), ("heavy", 10)):
+        session_id = f"bench-token-{label}"
+        build_session(session_id, intel_items)
+        payload = session_token.export_session(session_id)
+        token = session_token.encode_token(payload)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            session_token.encode_token(payload)
+        encode_us = (time.perf_counter() - start) / iterations * 1e6
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            session_token.decode_token(token)
+        decode_us = (time.perf_counter() - start) / iterations * 1e6
+
+        print(f"{label:<10} {len(token):>6} {encode_us:>10.1f} {decode_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark full snapshot write and restore time for N synthetic sessions.
+
+Usage:
+    python benchmarks/snapshot_restore.py [num_sessions]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import session_store, snapshot
+from app.core.state_machine import VALID_STATE_ORDER, FSMState
+from app.extraction import store as extraction_store
+from app.metrics import counters
+from app.callback import sender
+
+
+def populate(num_sessions: int) -> None:
+    active_states = [s for s in VALID_STATE_ORDER if s != FSMState.TERMINATED]
+    for i in range(num_sessions):
+        session_id = f"bench-session-{i}"
+        state = active_states[i % len(active_states)]
+        session_store.set_session_state(session_id, state)
+        for _ in range(i % 8 + 1):
+            counters.increment_message_counter(session_id)
+        if state in (FSMState.AGENT_ENGAGED, FSMState.INTEL_READY):
+            extraction_store.add_upi_id(session_id, f"user{i}@paytm")
+            extraction_store.add_phone_number(session_id, f"9{i:09d}")
+            extraction_store.add_suspicious_keyword(session_id, "urgent")
+        if state == FSMState.CALLBACK_SENT:
+            sender.load_state([session_id], [session_id])
+
+
+def main() -> None:
+    num_sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    start = time.perf_counter()
+    populate(num_sessions)
+    print(f"populate  {num_sessions:>9} sessions  {time.perf_counter() - start:7.2f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.snap")
+
+        start = time.perf_counter()
+        snapshot.write_snapshot(path)
+        elapsed = time.perf_counter() - start
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"snapshot  {size_mb:9.1f} MB        {elapsed:7.2f}s")
+
+        start = time.perf_counter()
+        restored = snapshot.restore(path)
+        print(f"restore   {restored:>9} sessions  {time.perf_counter() - start:7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
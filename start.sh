@@ -33,4 +33,4 @@ echo "   GEMINI_API_KEY: ✅ SET (${GEMINI_API_KEY:0:10}...)"
 echo "   CALLBACK_URL: ${CALLBACK_URL:-Not set}"
 
 # Start the server
-uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
\ No newline at end of file
+uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload --no-access-log
\ No newline at end of file
@@ -0,0 +1,88 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core import session_store
+from app.core.state_machine import FSMState
+
+SESSION_IDS = [f"test-admin-{i}" for i in range(5)]
+ADMIN_HEADERS = {"x-api-key": "test-admin-key"}
+
+
+@pytest.fixture(autouse=True)
+def admin_key(monkeypatch):
+    monkeypatch.setenv("ADMIN_API_KEY", "test-admin-key")
+    for sid in SESSION_IDS:
+        session_store.evict_session(sid)
+    yield
+    for sid in SESSION_IDS:
+        session_store.evict_session(sid)
+
+
+def test_state_index_counts_and_pages():
+    before = session_store.count_sessions_by_state()
+    for sid in SESSION_IDS:
+        session_store.set_session_state(sid, FSMState.SUSPICIOUS)
+    session_store.set_session_state(SESSION_IDS[0], FSMState.AGENT_ENGAGED)
+
+    counts = session_store.count_sessions_by_state()
+    assert counts["SUSPICIOUS"] - before["SUSPICIOUS"] == 4
+    assert counts["AGENT_ENGAGED"] - before["AGENT_ENGAGED"] == 1
+
+    listed, cursor = [], 0
+    while cursor is not None:
+        page, cursor = session_store.list_sessions(FSMState.SUSPICIOUS, cursor, limit=2)
+        listed.extend(page)
+    assert [sid for sid in listed if sid in SESSION_IDS] == SESSION_IDS[1:]
+
+
+def test_admin_endpoints_inspect_and_evict():
+    client = TestClient(app)
+    session_store.set_session_state(SESSION_IDS[0], FSMState.INTEL_READY)
+
+    stats = client.get("/admin/sessions/stats", headers=ADMIN_HEADERS)
+    assert stats.status_code == 200
+    assert stats.json()["byState"]["INTEL_READY"] >= 1
+
+    listing = client.get(
+        "/admin/sessions",
+        params={"state": "INTEL_READY", "limit": 1000},
+        headers=ADMIN_HEADERS,
+    )
+    assert SESSION_IDS[0] in listing.json()["sessions"]
+
+    detail = client.get(f"/admin/sessions/{SESSION_IDS[0]}", headers=ADMIN_HEADERS)
+    assert detail.json()["state"] == "INTEL_READY"
+
+    evicted = client.delete(f"/admin/sessions/{SESSION_IDS[0]}", headers=ADMIN_HEADERS)
+    assert evicted.json()["previousState"] == "INTEL_READY"
+    assert session_store.is_session_terminated(SESSION_IDS[0])
+
+
+def test_admin_api_requires_admin_key(monkeypatch):
+    client = TestClient(app)
+    assert client.get("/admin/sessions/stats", headers={"x-api-key": "wrong"}).status_code == 401
+    monkeypatch.delenv("ADMIN_API_KEY")
+    assert client.get("/admin/sessions/stats", headers=ADMIN_HEADERS).status_code == 403
+
+
+def test_paging_skips_moved_sessions_and_bounds_the_index(monkeypatch):
+    monkeypatch.setattr(session_store, "_index_owners", {})
+    monkeypatch.setattr(session_store, "_state_index", {state: {} for state in FSMState})
+    monkeypatch.setattr(session_store, "_state_sequences", {state: [] for state in FSMState})
+    churn = [f"test-admin-churn-{i}" for i in range(300)]
+    for sid in churn:
+        session_store._index_add(sid, FSMState.SUSPICIOUS)
+    # Move two in three sessions out after the first page was handed out
+    first, cursor = session_store.list_sessions(FSMState.SUSPICIOUS, 0, limit=10)
+    kept = churn[::3]
+    for sid in set(churn) - set(kept):
+        session_store._index_remove(sid, FSMState.SUSPICIOUS)
+
+    listed = list(first)
+    while cursor is not None:
+        page, cursor = session_store.list_sessions(FSMState.SUSPICIOUS, cursor, limit=10)
+        listed.extend(page)
+    assert listed == churn[:10] + kept[4:]
+    # Removed sequences were compacted away instead of piling up
+    assert len(session_store._state_sequences[FSMState.SUSPICIOUS]) < len(churn)
@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+from fastapi import Response
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api import routes
+from app.api.schemas import APIResponse, IncomingRequest
+from app.agent import llm_client
+from app.core import admission, session_store
+from app.core.termination import cleanup_session
+from app.metrics import counters, prometheus
+
+SESSION_ID = "test-admission-session"
+HEADERS = {"x-api-key": "test-api-key"}
+
+
+def setup_function():
+    cleanup_session(SESSION_ID)
+    session_store.evict_session(SESSION_ID)
+    prometheus.reset()
+
+
+def teardown_function():
+    setup_function()
+
+
+def test_admit_queues_then_sheds(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_MAX_CONCURRENT", 1)
+    monkeypatch.setattr(admission, "ADMISSION_QUEUE_SIZE", 1)
+    monkeypatch.setattr(admission, "ADMISSION_QUEUE_TIMEOUT_MS", 50)
+
+    async def scenario():
+        order = []
+        release = asyncio.Event()
+
+        async def turn(name, hold=None):
+            async with admission.admit():
+                order.append(name)
+                if hold is not None:
+                    await hold.wait()
+
+        first = asyncio.create_task(turn("first", release))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(turn("queued"))
+        await asyncio.sleep(0)
+        assert admission.queue_depth() == 1
+        with pytest.raises(admission.Overloaded, match="queue_full"):
+            await turn("shed")
+        release.set()
+        await asyncio.gather(first, queued)
+        assert order == ["first", "queued"]
+        assert admission.in_flight() == 0
+
+        blocker = asyncio.Event()
+        held = asyncio.create_task(turn("held", blocker))
+        await asyncio.sleep(0)
+        with pytest.raises(admission.Overloaded, match="queue_timeout"):
+            await turn("late")
+        blocker.set()
+        await held
+
+    asyncio.run(scenario())
+    assert admission.in_flight() == 0 and admission.queue_depth() == 0
+    assert prometheus.get_counter("honeypot_admission_shed_total", reason="queue_full", action="fallback") == 1
+
+
+def test_overloaded_turns_get_canned_reply_or_503(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-api-key")
+    monkeypatch.setattr(admission, "ADMISSION_MAX_CONCURRENT", 1)
+    monkeypatch.setattr(admission, "ADMISSION_QUEUE_SIZE", 0)
+    monkeypatch.setattr(admission, "_active", 1)
+    client = TestClient(app)
+    body = {"sessionId": SESSION_ID, "message": {"sender": "scammer", "text": "Hello", "timestamp": 7}}
+
+    first = client.post("/message", headers=HEADERS, json=body)
+    assert first.status_code == 200
+    assert first.json()["reply"] in llm_client.FALLBACK_RESPONSES[llm_client.ResponseCategory.DELAY_TACTIC]
+    assert client.post("/message", headers=HEADERS, json=body).json() == first.json()
+    assert counters.get_message_count(SESSION_ID) == 0
+
+    monkeypatch.setattr(admission, "ADMISSION_SHED_MODE", "reject")
+    rejected = client.post("/message", headers=HEADERS, json=body)
+    assert rejected.status_code == 503
+    assert rejected.headers["retry-after"] == "1"
+
+
+def test_slot_handed_over_at_the_deadline_is_not_leaked(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_MAX_CONCURRENT", 1)
+    monkeypatch.setattr(admission, "ADMISSION_QUEUE_SIZE", 1)
+
+    async def wait_for_then_time_out(waiter, timeout):
+        # Python 3.12+ behaviour when the handover and the deadline land in
+        # the same loop iteration: the result is set, TimeoutError is raised
+        await asyncio.shield(waiter)
+        raise asyncio.TimeoutError
+
+    monkeypatch.setattr(admission.asyncio, "wait_for", wait_for_then_time_out)
+
+    async def scenario():
+        release = asyncio.Event()
+        ran = []
+
+        async def holder():
+            async with admission.admit():
+                await release.wait()
+
+        async def queued():
+            async with admission.admit():
+                ran.append(admission.in_flight())
+
+        held = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(queued())
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(held, waiting)
+        return ran
+
+    assert asyncio.run(scenario()) == [1]
+    assert admission.in_flight() == 0 and admission.queue_depth() == 0
+
+
+def test_turns_waiting_on_their_session_hold_no_admission_slot(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_MAX_CONCURRENT", 2)
+    monkeypatch.setattr(admission, "ADMISSION_QUEUE_SIZE", 0)
+    other_session = SESSION_ID + "-other"
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow_turn(request, history=None):
+            if request.sessionId == SESSION_ID:
+                await release.wait()
+            return APIResponse(status="success", reply=f"ran {request.message.timestamp}")
+
+        monkeypatch.setattr(routes, "_process_message", slow_turn)
+
+        def incoming(session_id, timestamp):
+            return IncomingRequest(
+                sessionId=session_id,
+                message={"sender": "scammer", "text": "Hello", "timestamp": timestamp},
+            )
+
+        same_session = [
+            asyncio.create_task(routes.process_incoming(incoming(SESSION_ID, ts), Response()))
+            for ts in range(1, 5)
+        ]
+        await asyncio.sleep(0.01)
+        assert admission.in_flight() == 1
+        other = await routes.process_incoming(incoming(other_session, 1), Response())
+        release.set()
+        return other, await asyncio.gather(*same_session)
+
+    try:
+        other, same = asyncio.run(scenario())
+    finally:
+        cleanup_session(other_session)
+        session_store.evict_session(other_session)
+    assert other.reply == "ran 1"
+    assert [result.reply for result in same] == ["ran 1", "ran 2", "ran 3", "ran 4"]
+    assert prometheus.get_counter("honeypot_admission_shed_total", reason="queue_full", action="fallback") == 0
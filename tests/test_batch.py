@@ -0,0 +1,85 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api import batch
+from app.core import session_store, tenants
+from app.core.termination import cleanup_session
+from app.metrics import counters
+
+SESSIONS = ["test-batch-a", "test-batch-b"]
+HEADERS = {"x-api-key": "test-api-key"}
+
+
+def setup_function():
+    for sid in SESSIONS:
+        cleanup_session(sid)
+        session_store.evict_session(sid)
+
+
+def teardown_function():
+    setup_function()
+
+
+def _item(session_id, text, timestamp):
+    return json.dumps({
+        "sessionId": session_id,
+        "message": {"sender": "scammer", "text": text, "timestamp": timestamp},
+    })
+
+
+def test_batch_streams_ndjson_with_per_item_errors(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-api-key")
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    lines = [
+        _item("test-batch-a", "Hello, this is your bank", 1),
+        _item("test-batch-b", "Hi, how are you?", 1),
+        '{"sessionId": "test-batch-b"}',
+        _item("test-batch-a", "URGENT: share your OTP now or police will arrest you", 2),
+        _item("test-batch-b", "See you tomorrow", 2),
+    ]
+    response = TestClient(app).post("/messages/batch", content="\n".join(lines), headers=HEADERS)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    items = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(item["index"] for item in items) == [0, 1, 2, 3, 4]
+    by_index = {item["index"]: item for item in items}
+    assert by_index[2]["status"] == "error" and by_index[2]["error"]["code"] == 422
+    assert all(by_index[i]["status"] == "success" for i in (0, 1, 3, 4))
+
+    order_a = [item["index"] for item in items if item.get("sessionId") == "test-batch-a"]
+    assert order_a == [0, 3]
+    assert counters.get_message_count("test-batch-a") == 2
+    assert counters.get_message_count("test-batch-b") == 2
+
+
+def test_each_batch_item_is_charged_to_the_key_rate_limit(monkeypatch):
+    monkeypatch.delenv("API_KEY", raising=False)
+    monkeypatch.delenv("API_KEYS_FILE", raising=False)
+    monkeypatch.setenv("API_KEYS", "slow:slow-key")
+    monkeypatch.setattr(tenants, "TENANT_DEFAULT_RPS", 0.01)
+    monkeypatch.setattr(tenants, "TENANT_DEFAULT_BURST", 2)
+    tenants.load_registry()
+    lines = [_item(SESSIONS[i % 2], "Hello", i) for i in range(6)]
+
+    response = TestClient(app).post("/messages/batch", content="\n".join(lines), headers={"x-api-key": "slow-key"})
+    assert response.status_code == 200
+    items = [json.loads(line) for line in response.text.splitlines()]
+    assert len(items) == 6
+    assert sum(item["status"] == "success" for item in items) == 2
+    refused = [item for item in items if item["status"] == "error"]
+    assert len(refused) == 4 and all(item["error"]["code"] == 429 for item in refused)
+
+
+def test_oversized_batch_is_rejected_before_validation(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-api-key")
+    monkeypatch.setattr(batch, "MAX_BATCH_ITEMS", 3)
+    validated = []
+    monkeypatch.setattr(batch, "validate_incoming", lambda raw: validated.append(raw))
+    lines = [_item("test-batch-a", "Hello", i) for i in range(4)]
+
+    response = TestClient(app).post("/messages/batch", content="\n".join(lines), headers=HEADERS)
+    assert response.status_code == 413
+    assert validated == []
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from app.api.schemas import IncomingRequest
+from app.bench import corpus, memory, micro
+from app.core import detection
+from app.core import session_store
+from app.core.state_machine import FSMState
+
+
+def test_microbenchmarks_cover_hot_path():
+    results = micro.run_benchmarks(number=20, repeat=1)
+    assert set(results) == set(micro.load_baseline())
+    assert all(value > 0 for value in results.values())
+
+    regressions = micro.find_regressions({"a": 300.0, "b": 100.0}, {"a": 100.0, "b": 100.0}, tolerance=0.5)
+    assert len(regressions) == 1 and regressions[0].startswith("a:")
+
+
+@pytest.mark.skipif(not os.getenv("BENCH_CHECK"), reason="set BENCH_CHECK=1 to compare against benchmarks/baselines.json")
+def test_no_regression_against_baseline():
+    results = micro.run_benchmarks()
+    regressions = micro.find_regressions(results, micro.load_baseline())
+    assert not regressions, "\n".join(regressions)
+
+
+def test_memory_footprint_restores_existing_state():
+    session_store.set_session_state("test-bench-existing", FSMState.SUSPICIOUS)
+    try:
+        report = memory.measure_footprint(sessions=2000, prefix="test-bench-mem")
+        assert session_store.get_session_state("test-bench-existing") == FSMState.SUSPICIOUS
+        assert not session_store.session_exists("test-bench-mem-00000001")
+
+        by_state = report["byState"]
+        assert by_state["CALLBACK_SENT"]["bytesPerSession"] > by_state["SUSPICIOUS"]["bytesPerSession"]
+        assert by_state["TERMINATED"]["bytesPerSession"] < by_state["CALLBACK_SENT"]["bytesPerSession"]
+        assert set(report["byStore"]) == set(memory.STORE_WRITERS)
+    finally:
+        session_store.evict_session("test-bench-existing")
+
+
+@pytest.mark.skipif(not os.getenv("BENCH_CHECK"), reason="set BENCH_CHECK=1 to compare against benchmarks/memory_baselines.json")
+def test_no_memory_regression_against_baseline():
+    results = memory.flatten(memory.measure_footprint())
+    regressions = micro.find_regressions(
+        results, micro.load_baseline(memory.MEMORY_BASELINE_PATH), tolerance=0.2, unit="B",
+    )
+    assert not regressions, "\n".join(regressions)
+
+
+def test_corpus_stream_is_deterministic_and_valid():
+    first = list(corpus.stream_conversations(500, seed=7, history=3))
+    assert first == list(corpus.stream_conversations(500, seed=7, history=3))
+    assert first != list(corpus.stream_conversations(500, seed=8, history=3))
+
+    requests = [IncomingRequest.model_validate_json(line) for line in first]
+    sessions = {r.sessionId for r in requests}
+    assert 1 < len(sessions) < len(requests)
+    scores = [detection.analyze_message(r.message.text)["score"] for r in requests]
+    assert sum(score > 0 for score in scores) > len(scores) // 2
@@ -0,0 +1,52 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api.middleware import CaptureMiddleware
+from app.bench import replay
+from app.core import session_store
+from app.core.termination import cleanup_session
+from app.utils import capture
+
+SESSION_ID = "test-capture-session"
+
+
+def setup_function():
+    cleanup_session(SESSION_ID)
+    session_store.evict_session(SESSION_ID)
+
+
+def teardown_function():
+    setup_function()
+
+
+def test_captured_bodies_are_redacted_and_replayable(tmp_path, monkeypatch):
+    path = str(tmp_path / "capture.jsonl.gz")
+    monkeypatch.setenv("API_KEY", "test-key")
+    monkeypatch.setattr(capture, "CAPTURE_PATH", path)
+    monkeypatch.setattr(capture, "CAPTURE_SAMPLE_RATE", 1.0)
+    client = TestClient(CaptureMiddleware(app))
+
+    for turn, text in enumerate([
+        "Your account is blocked, share OTP is 482913 now",
+        "Pay with card 4111 1111 1111 1111 to refund.desk@okaxis",
+    ]):
+        response = client.post("/message", headers={"x-api-key": "test-key"}, json={
+            "sessionId": SESSION_ID,
+            "message": {"sender": "scammer", "text": text, "timestamp": turn},
+        })
+        assert response.status_code == 200
+    client.get("/health")
+    capture.stop()
+
+    records = replay.read_capture(path + "*")
+    assert [r["body"]["message"]["timestamp"] for r in records] == [0, 1]
+    assert all(r["sessionId"] == SESSION_ID and r["status"] == 200 for r in records)
+    assert "482913" not in records[0]["body"]["message"]["text"]
+    assert "4111" not in records[1]["body"]["message"]["text"]
+    assert "refund.desk@okaxis" in records[1]["body"]["message"]["text"]
+
+
+def test_session_sampling_is_stable():
+    assert capture.is_sampled("abc", 0.5) == capture.is_sampled("abc", 0.5)
+    assert not capture.is_sampled("abc", 0.0)
+    assert capture.redact_text("pin: 1234 please") == "pin: [REDACTED] please"
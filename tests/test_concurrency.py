@@ -0,0 +1,101 @@
+import asyncio
+import contextvars
+from collections import defaultdict
+from unittest.mock import patch
+
+from app.api import routes
+from app.api.schemas import IncomingRequest
+from app.core import session_store, session_locks
+from app.core.state_machine import STATE_ORDINAL_MAP
+from app.core.termination import cleanup_session
+from app.metrics import counters
+
+SCAM_TEXT = (
+    "URGENT: share your bank account and OTP now or police will arrest you. "
+    "Pay to scammer@paytm or call 9876543210"
+)
+SESSION_IDS = ["test-concurrent-a", "test-concurrent-b", "test-concurrent-c"]
+
+
+def _request(session_id: str, turn: int) -> IncomingRequest:
+    return IncomingRequest(
+        sessionId=session_id,
+        message={"sender": "scammer", "text": SCAM_TEXT, "timestamp": turn},
+    )
+
+
+def _reset():
+    for sid in SESSION_IDS:
+        cleanup_session(sid)
+        session_store.load_state({"sessions": {}, "terminated": []}, [sid])
+
+
+def setup_function():
+    _reset()
+
+
+def teardown_function():
+    _reset()
+
+
+def test_concurrent_same_session_turns_keep_fsm_invariants():
+    in_flight = defaultdict(int)
+    max_in_flight = defaultdict(int)
+    max_global_in_flight = 0
+    states_seen = defaultdict(list)
+    callbacks = []
+
+    async def fake_llm(category, persona_traits):
+        nonlocal max_global_in_flight
+        sid = current_session.get()
+        in_flight[sid] += 1
+        max_in_flight[sid] = max(max_in_flight[sid], in_flight[sid])
+        max_global_in_flight = max(max_global_in_flight, sum(in_flight.values()))
+        await asyncio.sleep(0.001)
+        in_flight[sid] -= 1
+        return "Sorry, I don't understand."
+
+    real_set_state = session_store.set_session_state
+
+    def recording_set_state(session_id, state):
+        states_seen[session_id].append(state)
+        real_set_state(session_id, state)
+
+    def fake_send_callback(payload):
+        callbacks.append(payload)
+        return True
+
+    current_session = contextvars.ContextVar("current_session")
+    real_process = routes._process_message
+
+    async def tracking_process(request):
+        current_session.set(request.sessionId)
+        return await real_process(request)
+
+    async def fire():
+        requests = [
+            _request(sid, turn) for turn in range(12) for sid in SESSION_IDS
+        ]
+        return await asyncio.gather(*(routes.handle_message(r) for r in requests))
+
+    with patch.object(routes.llm_client, "generate_response_async", fake_llm), \
+            patch.object(routes.session_store, "set_session_state", recording_set_state), \
+            patch.object(routes, "send_callback", fake_send_callback), \
+            patch.object(routes, "_process_message", tracking_process):
+        responses = asyncio.run(fire())
+
+    assert all(r.status == "success" for r in responses)
+    assert sorted(p["sessionId"] for p in callbacks) == sorted(SESSION_IDS)
+    for payload in callbacks:
+        assert payload["totalMessagesExchanged"] == routes.MIN_TURNS_FOR_FINALIZATION
+
+    for sid in SESSION_IDS:
+        assert max_in_flight[sid] == 1
+        ordinals = [STATE_ORDINAL_MAP[s] for s in states_seen[sid]]
+        assert ordinals == sorted(ordinals)
+        assert session_store.is_session_terminated(sid)
+        assert counters.get_message_count(sid) == 0
+
+    # Different sessions still overlap while waiting on the model
+    assert max_global_in_flight > 1
+    assert session_locks.active_lock_count() == 0
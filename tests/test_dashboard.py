@@ -0,0 +1,31 @@
+import gzip
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api import dashboard
+
+
+def test_dashboard_is_served_compressed_with_etag_revalidation():
+    client = TestClient(app)
+    with open(dashboard.DASHBOARD_PATH, "rb") as f:
+        html = f.read()
+
+    compressed = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert compressed.status_code == 200
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert compressed.headers["cache-control"].startswith("public, max-age=")
+    assert compressed.content == html
+    assert gzip.decompress(dashboard.load_dashboard().bodies["gzip"]) == html
+
+    plain = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["etag"] != compressed.headers["etag"]
+
+    # Either representation's tag revalidates
+    for etag in (compressed.headers["etag"], plain.headers["etag"]):
+        revalidated = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+    assert client.get("/", headers={"If-None-Match": '"stale"'}).status_code == 200
@@ -0,0 +1,65 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.agent import llm_client
+from app.agent.response_policy import ResponseCategory
+from app.core import degradation
+from app.metrics import prometheus
+from app.utils.logging import get_sample_rate
+
+
+def setup_function():
+    degradation.reset()
+    prometheus.reset()
+
+
+def teardown_function():
+    degradation.reset()
+
+
+def test_slo_breach_degrades_and_recovers_with_hysteresis(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-gemini-key")
+    monkeypatch.setattr(degradation, "DEGRADE_PROBE_RATE", 0.0)
+    monkeypatch.setattr(degradation, "DEGRADE_MIN_SECONDS", 0.0)
+    slo_ns = degradation._signals["llm"].slo_ns
+    assert llm_client.should_use_gemini(ResponseCategory.CONFUSION)
+
+    for _ in range(degradation.DEGRADE_MIN_SAMPLES):
+        degradation.observe("llm", int(slo_ns * 2))
+    assert degradation.is_degraded()
+    assert not llm_client.should_use_gemini(ResponseCategory.CONFUSION)
+    assert get_sample_rate("app.access") == degradation.DEGRADE_LOG_SAMPLE_RATE
+    assert TestClient(app).get("/health").json()["mode"] == "degraded"
+    assert 'honeypot_degraded{reason="llm"} 1' in prometheus.render()
+
+    # Just under the SLO is not enough to recover: only below SLO * ratio
+    for _ in range(degradation.DEGRADE_WINDOW_SAMPLES):
+        degradation.observe("llm", int(slo_ns * 0.9))
+    assert degradation.is_degraded()
+    for _ in range(degradation.DEGRADE_WINDOW_SAMPLES):
+        degradation.observe("llm", int(slo_ns * 0.5))
+    assert not degradation.is_degraded()
+    assert get_sample_rate("app.access") == 1.0
+    assert TestClient(app).get("/health").json()["degradedReasons"] == []
+    assert prometheus.get_counter("honeypot_degraded_transitions_total", direction="leave") == 1
+
+
+def test_metrics_scrape_reads_the_window_without_mutating_it(monkeypatch):
+    monkeypatch.setattr(degradation, "DEGRADE_WINDOW_SECONDS", 0.0)
+    for _ in range(degradation.DEGRADE_MIN_SAMPLES):
+        degradation._signals["llm"].samples.append((0.0, 1))
+    degradation._p95_gauge()
+    assert len(degradation._signals["llm"].samples) == degradation.DEGRADE_MIN_SAMPLES
+
+
+def test_too_few_probes_do_not_count_as_recovery(monkeypatch):
+    monkeypatch.setattr(degradation, "DEGRADE_MIN_SECONDS", 0.0)
+    slo_ns = degradation._signals["llm"].slo_ns
+    for _ in range(degradation.DEGRADE_MIN_SAMPLES):
+        degradation.observe("llm", int(slo_ns * 2))
+    assert degradation.is_degraded()
+    for _ in range(degradation.DEGRADE_MIN_SAMPLES - 1):
+        degradation.observe("llm", int(slo_ns * 0.5))
+    assert degradation.is_degraded()
+    degradation.observe("llm", int(slo_ns * 0.5))
+    assert not degradation.is_degraded()
@@ -56,3 +56,40 @@ def test_no_hallucination_on_clean_text():
     assert intel["phoneNumbers"] == []
     assert intel["phishingLinks"] == []
     assert intel["bankAccounts"] == []
+
+
+def test_packed_values_round_trip_exactly():
+    store.add_bank_account(SESSION_ID, "000123456789")
+    store.add_ifsc_code(SESSION_ID, "SBIN0001234")
+    store.add_phone_number(SESSION_ID, "9876543210")
+    intel = store.get_all_intelligence(SESSION_ID)
+    assert intel["bankAccounts"] == ["000123456789"]
+    assert intel["ifscCodes"] == ["SBIN0001234"]
+    assert intel["phoneNumbers"] == ["9876543210"]
+
+
+def test_keywords_outside_vocabulary_are_kept():
+    store.add_suspicious_keyword(SESSION_ID, "URGENT")
+    store.add_suspicious_keyword(SESSION_ID, "gift card")
+    intel = store.get_all_intelligence(SESSION_ID)
+    assert sorted(intel["suspiciousKeywords"]) == ["gift card", "urgent"]
+    assert store.count_intelligence_types(SESSION_ID) == 1
+
+
+def test_reading_does_not_allocate_session():
+    store.get_all_intelligence(SESSION_ID)
+    assert store.dump_state([SESSION_ID]) == {}
+    assert store.has_any_intelligence(SESSION_ID) is False
+
+
+def test_non_ascii_digits_are_kept_verbatim():
+    store.add_phone_number(SESSION_ID, "9876543210")
+    store.add_phone_number(SESSION_ID, "९८७६५४३२१०")
+    store.add_bank_account(SESSION_ID, "١٢٣٤٥٦٧٨٩٠١٢")
+    intel = store.get_all_intelligence(SESSION_ID)
+    assert intel["phoneNumbers"] == ["9876543210", "९८७६५४३२१०"]
+    assert intel["bankAccounts"] == ["١٢٣٤٥٦٧٨٩٠١٢"]
+
+    dumped = store.dump_state([SESSION_ID])
+    store.load_state(dumped, [SESSION_ID])
+    assert store.get_all_intelligence(SESSION_ID) == intel
@@ -0,0 +1,58 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core import history_store, session_store
+from app.core.termination import cleanup_session
+
+SESSION_ID = "test-history-session"
+HEADERS = {"x-api-key": "test-api-key"}
+
+
+def setup_function():
+    cleanup_session(SESSION_ID)
+    session_store.evict_session(SESSION_ID)
+
+
+def teardown_function():
+    setup_function()
+
+
+def _body(text, timestamp, history=None):
+    return {
+        "sessionId": SESSION_ID,
+        "message": {"sender": "scammer", "text": text, "timestamp": timestamp},
+        "conversationHistory": history or [],
+    }
+
+
+def test_delta_turns_use_server_history_and_resync(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-api-key")
+    monkeypatch.setattr(history_store, "SERVER_HISTORY", True)
+    client = TestClient(app)
+
+    first = client.post("/message", headers=HEADERS, json=_body("Hello, is this Ravi?", 1))
+    assert first.status_code == 200
+    assert first.headers["x-history-seq"] == "2"
+
+    second = client.post(
+        "/message",
+        headers={**HEADERS, "x-history-seq": "2", "x-history-hash": first.headers["x-history-hash"]},
+        json=_body("Your bank account is blocked", 2),
+    )
+    assert second.status_code == 200
+    assert second.headers["x-history-seq"] == "4"
+    stored = history_store.get_history(SESSION_ID)
+    assert [m["text"] for m in stored[::2]] == ["Hello, is this Ravi?", "Your bank account is blocked"]
+
+    stale = client.post("/message", headers={**HEADERS, "x-history-seq": "2"}, json=_body("Hello?", 3))
+    assert stale.status_code == 409
+    assert stale.headers["x-history-seq"] == "4"
+
+    full = [
+        {"sender": "scammer", "text": "Hello, is this Ravi?", "timestamp": 1},
+        {"sender": "user", "text": "Yes, who is this?", "timestamp": 1},
+    ]
+    resync = client.post("/message", headers=HEADERS, json=_body("Share the OTP now", 4, full))
+    assert resync.status_code == 200
+    assert resync.headers["x-history-seq"] == "4"
+    assert history_store.get_history(SESSION_ID)[1]["text"] == "Yes, who is this?"
@@ -0,0 +1,67 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core import history_store, idempotency_store, session_store
+from app.core.termination import cleanup_session
+from app.metrics import counters, prometheus
+
+SESSION_ID = "test-idempotency-session"
+HEADERS = {"x-api-key": "test-api-key"}
+
+
+def setup_function():
+    cleanup_session(SESSION_ID)
+    session_store.evict_session(SESSION_ID)
+    prometheus.reset()
+
+
+def teardown_function():
+    setup_function()
+
+
+def _body(text, timestamp):
+    return {"sessionId": SESSION_ID, "message": {"sender": "scammer", "text": text, "timestamp": timestamp}}
+
+
+def test_retried_message_replays_original_reply(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-api-key")
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    client = TestClient(app)
+    scam = "URGENT: share your bank account and OTP now or police will arrest you"
+
+    first = client.post("/message", headers=HEADERS, json=_body(scam, 1))
+    retry = client.post("/message", headers=HEADERS, json=_body(scam, 1))
+    assert retry.json() == first.json()
+    assert counters.get_message_count(SESSION_ID) == 1
+
+    keyed = {**HEADERS, "Idempotency-Key": "turn-2"}
+    second = client.post("/message", headers=keyed, json=_body("Send it to this UPI id", 2))
+    # Same key, different timestamp: still the same turn
+    assert client.post("/message", headers=keyed, json=_body("Send it to this UPI id", 3)).json() == second.json()
+    assert counters.get_message_count(SESSION_ID) == 2
+    assert prometheus.get_counter("honeypot_idempotent_replays_total") == 2
+
+    cleanup_session(SESSION_ID)
+    assert idempotency_store.lookup(SESSION_ID, idempotency_store.request_key(1, scam)) is None
+
+
+def test_retry_with_stale_history_position_is_replayed(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-api-key")
+    monkeypatch.setattr(history_store, "SERVER_HISTORY", True)
+    client = TestClient(app)
+
+    first = client.post("/message", headers=HEADERS, json=_body("Hello, is this Ravi?", 1))
+    stale = {**HEADERS, "x-history-seq": "0"}
+    retry = client.post("/message", headers=stale, json=_body("Hello, is this Ravi?", 1))
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["x-history-seq"] == "2"
+
+
+def test_replies_are_bounded_per_session(monkeypatch):
+    monkeypatch.setattr(idempotency_store, "IDEMPOTENCY_MAX_ENTRIES", 2)
+    keys = [idempotency_store.request_key(n, "hello") for n in range(3)]
+    for key in keys:
+        idempotency_store.remember(SESSION_ID, key, "success", "Okay.")
+    assert idempotency_store.lookup(SESSION_ID, keys[0]) is None
+    assert idempotency_store.lookup(SESSION_ID, keys[2]) == ("success", "Okay.")
@@ -0,0 +1,28 @@
+from fastapi.testclient import TestClient
+
+from app.bench import load
+from app.bench.fakes import FaultProfile, create_fake_callback, create_fake_gemini
+
+
+def test_fake_gemini_shapes_and_injected_429s():
+    ok = TestClient(create_fake_gemini(FaultProfile(latency_ms=0, seed=1)))
+    response = ok.post("/v1beta/models/gemini-2.5-flash-lite:generateContent", json={})
+    assert response.status_code == 200
+    assert response.json()["candidates"][0]["content"]["parts"][0]["text"]
+
+    limited_app = create_fake_gemini(FaultProfile(latency_ms=0, rate_limit_rate=1.0, seed=1))
+    response = TestClient(limited_app).post("/v1beta/models/gemma-2-2b-it:generateContent", json={})
+    assert response.status_code == 429
+    assert limited_app.state.statuses[429] == 1
+
+
+def test_fake_callback_counts_deliveries_and_percentiles():
+    app = create_fake_callback(FaultProfile(latency_ms=0, seed=1))
+    client = TestClient(app)
+    client.post("/callback", json={"sessionId": "s1"})
+    client.post("/callback", json={"sessionId": "s1"})
+    assert app.state.sessions["s1"] == 2
+
+    values = sorted(float(v) for v in range(1, 101))
+    assert load.percentile(values, 50) == 50.0
+    assert load.percentile(values, 99) == 99.0
@@ -0,0 +1,59 @@
+import logging
+import time
+
+from app.utils import logging as app_logging
+
+
+def _wait_for_drain(timeout=2.0):
+    deadline = time.time() + timeout
+    while not app_logging._writer.queue.empty() and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+
+
+def test_queued_logger_writes_from_background_thread(capfd):
+    logger = app_logging.get_logger("test.queued")
+    logger.info("turn %s for %s", 3, "session-x")
+    _wait_for_drain()
+    assert "turn 3 for session-x" in capfd.readouterr().err
+
+
+def test_filtered_levels_are_never_formatted():
+    rendered = []
+
+    class Tracked:
+        def __str__(self):
+            rendered.append(self)
+            return "tracked"
+
+    logger = app_logging.get_logger("test.lazy")
+    logger.debug("value=%s", Tracked())
+    _wait_for_drain()
+    assert rendered == []
+
+    # Control: an emitted record is rendered once
+    logger.info("value=%s", Tracked())
+    _wait_for_drain()
+    assert len(rendered) == 1
+
+
+def test_args_are_rendered_before_the_record_is_queued(capfd):
+    logger = app_logging.get_logger("test.prepared")
+    state = ["before"]
+    logger.info("state=%s", state)
+    state[0] = "after"
+    _wait_for_drain()
+    err = capfd.readouterr().err
+    assert "state=['before']" in err
+    assert "state=['after']" not in err
+
+
+def test_sampling_drops_info_but_keeps_warnings(capfd):
+    logger = app_logging.get_logger("test.sampled")
+    app_logging.set_sample_rate("test.sampled", 0.0)
+    logger.info("sampled-out info")
+    logger.warning("always-kept warning")
+    _wait_for_drain()
+    err = capfd.readouterr().err
+    assert "sampled-out info" not in err
+    assert "always-kept warning" in err
@@ -0,0 +1,94 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api import routes
+from app.api.schemas import MAX_HISTORY_ITEMS, MAX_MESSAGE_LENGTH, MAX_SENDER_LENGTH
+from app.core import session_store
+from app.core.termination import cleanup_session
+
+SESSION_ID = "test-decode-session"
+HEADERS = {"x-api-key": "test-api-key", "content-type": "application/json"}
+
+
+def setup_function():
+    cleanup_session(SESSION_ID)
+    session_store.evict_session(SESSION_ID)
+
+
+def teardown_function():
+    setup_function()
+
+
+def test_raw_body_validation_matches_declared_body_errors(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-api-key")
+    client = TestClient(app)
+
+    missing = client.post("/message", content=b"", headers=HEADERS)
+    assert missing.status_code == 422
+    assert missing.json()["detail"][0]["loc"] == ["body"]
+
+    broken = client.post("/message", content=b"{bad", headers=HEADERS)
+    assert broken.json()["detail"][0]["type"] == "json_invalid"
+    assert broken.json()["detail"][0]["loc"] == ["body", 1]
+
+    invalid = client.post("/", headers=HEADERS, json={
+        "sessionId": SESSION_ID,
+        "message": {"sender": "scammer", "text": "  ", "timestamp": -1},
+    })
+    assert invalid.status_code == 422
+    assert [e["loc"] for e in invalid.json()["detail"]] == [
+        ["body", "message", "text"], ["body", "message", "timestamp"],
+    ]
+
+
+def test_oversized_body_rejected_and_constant_reply_bytes(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-api-key")
+    monkeypatch.setattr(routes, "MAX_REQUEST_BYTES", 1024)
+    client = TestClient(app)
+
+    assert client.post("/message", content=b"x" * 2048, headers=HEADERS).status_code == 413
+
+    ok = client.post("/message", headers=HEADERS, json={
+        "sessionId": SESSION_ID,
+        "message": {"sender": "scammer", "text": "Hi, how are you?", "timestamp": 1},
+    })
+    assert ok.status_code == 200
+    assert ok.content == b'{"status":"success","reply":"Okay."}'
+    assert ok.headers["content-type"] == "application/json"
+
+
+def test_escaped_non_ascii_body_at_the_schema_limits_is_accepted(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-api-key")
+
+    def message(timestamp):
+        # Astral characters: 12 bytes each once \uXXXX-escaped by json.dumps
+        return {"sender": "\U0001F600" * MAX_SENDER_LENGTH, "text": "\U0001F600" * MAX_MESSAGE_LENGTH, "timestamp": timestamp}
+
+    body = json.dumps({
+        "sessionId": SESSION_ID,
+        "message": message(MAX_HISTORY_ITEMS),
+        "conversationHistory": [message(i) for i in range(MAX_HISTORY_ITEMS)],
+    }).encode()
+    assert len(body) > 3_000_000
+    response = TestClient(app).post("/message", content=body, headers=HEADERS)
+    assert response.status_code == 200
+
+
+def test_non_json_content_type_is_rejected_like_a_declared_body(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-api-key")
+    client = TestClient(app)
+    body = json.dumps({
+        "sessionId": SESSION_ID,
+        "message": {"sender": "scammer", "text": "Hi, how are you?", "timestamp": 1},
+    })
+
+    plain = client.post("/message", content=body, headers={**HEADERS, "content-type": "text/plain"})
+    assert plain.status_code == 422
+    assert plain.json()["detail"][0]["type"] == "model_attributes_type"
+    assert plain.json()["detail"][0]["loc"] == ["body"]
+
+    for content_type in ("application/json; charset=utf-8", "application/vnd.api+json"):
+        ok = client.post("/message", content=body, headers={**HEADERS, "content-type": content_type})
+        assert ok.status_code == 200
@@ -0,0 +1,83 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api import routes
+from app.core.termination import cleanup_session
+from app.core import session_store
+from app.metrics import ledger, prometheus
+
+SESSION_ID = "test-metrics-session"
+
+
+def setup_function():
+    cleanup_session(SESSION_ID)
+    session_store.evict_session(SESSION_ID)
+    prometheus.reset()
+
+
+def teardown_function():
+    cleanup_session(SESSION_ID)
+    session_store.evict_session(SESSION_ID)
+
+
+def test_metrics_endpoint_exposes_stage_histograms_and_transitions(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-api-key")
+    client = TestClient(app)
+    response = client.post(
+        "/message",
+        json={
+            "sessionId": SESSION_ID,
+            "message": {"sender": "scammer", "text": "Hello there", "timestamp": 1},
+        },
+        headers={"x-api-key": "test-api-key"},
+    )
+    assert response.status_code == 200
+
+    body = client.get("/metrics").text
+    assert 'honeypot_stage_latency_seconds_count{stage="validation"} 1' in body
+    assert 'honeypot_stage_latency_seconds_count{stage="detection"} 1' in body
+    assert 'honeypot_fsm_transitions_total{from_state="INIT",to_state="NORMAL"} 1' in body
+    assert 'honeypot_sessions{state="NORMAL"}' in body
+
+
+def test_disabled_metrics_record_nothing(monkeypatch):
+    monkeypatch.setattr(prometheus, "ENABLED", False)
+    prometheus.inc("honeypot_llm_cache_total", result="hit")
+    assert prometheus.get_counter("honeypot_llm_cache_total", result="hit") == 0
+    assert TestClient(app).get("/metrics").status_code == 404
+
+
+def test_cost_ledger_charges_current_session(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-api-key")
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    client = TestClient(app)
+    response = client.post(
+        "/message",
+        json={
+            "sessionId": SESSION_ID,
+            "message": {
+                "sender": "scammer",
+                "text": "URGENT: share your bank account and OTP now or police will arrest you",
+                "timestamp": 1,
+            },
+        },
+        headers={"x-api-key": "test-api-key"},
+    )
+    assert response.status_code == 200
+    assert ledger.get_session_cost(SESSION_ID)["fallbacks"] == 1
+
+    token = ledger.current_session.set(SESSION_ID)
+    try:
+        ledger.record_llm_call("gemini-2.5-flash-lite", 120_000_000, True, tokens_in=40, tokens_out=12)
+    finally:
+        ledger.current_session.reset(token)
+    cost = ledger.get_session_cost(SESSION_ID)
+    assert (cost["llmCalls"], cost["tokensIn"], cost["tokensOut"], cost["llmMs"]) == (1, 40, 12, 120.0)
+    monkeypatch.setattr(ledger, "LEDGER_IN_AGENT_NOTES", True)
+    assert "Cost: 1 LLM calls" in routes.build_agent_notes(SESSION_ID, 2, [])
+
+    body = client.get("/metrics").text
+    assert 'honeypot_llm_tokens_total{direction="in",model="gemini-2.5-flash-lite"} 40' in body
+
+    cleanup_session(SESSION_ID)
+    assert ledger.get_session_cost(SESSION_ID) is None
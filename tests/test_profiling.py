@@ -0,0 +1,39 @@
+from collections import Counter
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils import profiling
+
+ADMIN_HEADERS = {"x-api-key": "test-admin-key"}
+
+
+def test_profile_endpoint_returns_pstats_and_collapsed(monkeypatch):
+    monkeypatch.setenv("ADMIN_API_KEY", "test-admin-key")
+    client = TestClient(app)
+
+    response = client.get("/debug/profile?seconds=0.2&format=pstats", headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    assert "function calls" in response.text
+
+    response = client.get("/debug/profile?seconds=0.2&format=collapsed", headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    stack, _, count = response.text.splitlines()[0].rpartition(" ")
+    assert ";" in stack and int(count) >= 1
+
+    assert client.get("/debug/profile?seconds=0.2").status_code == 422
+
+
+def test_collapsed_file_rotates(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_MAX_BYTES", 10)
+    monkeypatch.setattr(profiling, "PROFILE_BACKUP_COUNT", 2)
+    path = str(tmp_path / "profile.collapsed")
+
+    for _ in range(4):
+        profiling.write_collapsed(path, Counter({"MainThread;app.x:f": 3}))
+
+    assert (tmp_path / "profile.collapsed").exists()
+    assert (tmp_path / "profile.collapsed.1").exists()
+    assert (tmp_path / "profile.collapsed.2").exists()
+    assert not (tmp_path / "profile.collapsed.3").exists()
+    assert "MainThread;app.x:f 3" in (tmp_path / "profile.collapsed").read_text()
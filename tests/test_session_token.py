@@ -0,0 +1,139 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core import session_store, session_token
+from app.core.state_machine import FSMState
+from app.extraction import store as extraction_store
+from app.metrics import counters, ledger
+
+SESSION_ID = "test-token-session"
+SCAM_TEXT = "URGENT: share your bank account and OTP now. Pay to scammer@paytm"
+
+
+@pytest.fixture(autouse=True)
+def token_secret(monkeypatch):
+    monkeypatch.setenv("SESSION_TOKEN_SECRET", "test-secret")
+    monkeypatch.setenv("API_KEY", "test-api-key")
+    session_token.evict_session(SESSION_ID)
+    yield
+    session_token.evict_session(SESSION_ID)
+
+
+def test_token_round_trip_restores_session_state():
+    session_store.set_session_state(SESSION_ID, FSMState.AGENT_ENGAGED)
+    counters.increment_message_counter(SESSION_ID)
+    extraction_store.add_upi_id(SESSION_ID, "scammer@paytm")
+
+    token = session_token.issue_token(SESSION_ID)
+    assert not session_store.session_exists(SESSION_ID)
+
+    session_token.restore_session(SESSION_ID, token)
+    assert session_store.get_session_state(SESSION_ID) == FSMState.AGENT_ENGAGED
+    assert counters.get_message_count(SESSION_ID) == 1
+    assert extraction_store.get_all_intelligence(SESSION_ID)["upiIds"] == ["scammer@paytm"]
+
+
+def test_cost_ledger_travels_in_the_token_and_is_evicted():
+    session_store.set_session_state(SESSION_ID, FSMState.AGENT_ENGAGED)
+    ledger.record_llm_call("gemini-2.5-flash-lite", 120_000_000, True, 40, 12, session_id=SESSION_ID)
+    ledger.record_fallback(session_id=SESSION_ID)
+
+    token = session_token.issue_token(SESSION_ID)
+    assert ledger.get_session_cost(SESSION_ID) is None
+
+    session_token.restore_session(SESSION_ID, token)
+    cost = ledger.get_session_cost(SESSION_ID)
+    assert (cost["llmCalls"], cost["tokensOut"], cost["fallbacks"]) == (1, 12, 1)
+    assert cost["model"] == "gemini-2.5-flash-lite"
+
+
+def test_tampered_or_foreign_token_is_rejected():
+    session_store.set_session_state(SESSION_ID, FSMState.SUSPICIOUS)
+    token = session_token.issue_token(SESSION_ID)
+
+    body, signature = token.split(".")
+    forged = body[:-2] + ("AA" if body[-2:] != "AA" else "BB") + "." + signature
+    with pytest.raises(session_token.InvalidSessionToken):
+        session_token.restore_session(SESSION_ID, forged)
+
+    with pytest.raises(session_token.InvalidSessionToken):
+        session_token.restore_session("another-session", token)
+
+
+def test_stateless_endpoint_carries_state_in_header(monkeypatch):
+    monkeypatch.setattr(session_token, "STATELESS_MODE", True)
+    client = TestClient(app)
+    headers = {"x-api-key": "test-api-key"}
+    body = {
+        "sessionId": SESSION_ID,
+        "message": {"sender": "scammer", "text": SCAM_TEXT, "timestamp": 1},
+    }
+
+    first = client.post("/message", json=body, headers=headers)
+    token = first.headers[session_token.SESSION_TOKEN_HEADER]
+    assert first.status_code == 200
+    assert not session_store.session_exists(SESSION_ID)
+
+    second = client.post(
+        "/message",
+        json=body,
+        headers={**headers, session_token.SESSION_TOKEN_HEADER: token},
+    )
+    assert second.status_code == 200
+    payload = session_token.decode_token(second.headers[session_token.SESSION_TOKEN_HEADER])
+    assert payload["s"] == FSMState.AGENT_ENGAGED.value
+    assert payload["n"] == 2
+
+    bad = client.post(
+        "/message",
+        json=body,
+        headers={**headers, session_token.SESSION_TOKEN_HEADER: "garbage"},
+    )
+    assert bad.status_code == 400
+
+
+def test_token_from_an_older_payload_format_is_rejected(monkeypatch):
+    monkeypatch.setattr(session_token, "STATELESS_MODE", True)
+    old_token = session_token.encode_token({
+        "v": 1,
+        "sid": SESSION_ID,
+        "s": FSMState.AGENT_ENGAGED.value,
+        "i": {"upiIds": ["scammer@paytm"]},
+    })
+    with pytest.raises(session_token.InvalidSessionToken):
+        session_token.restore_session(SESSION_ID, old_token)
+
+    # Same shape under the current version number: still a 400, not a 500
+    mislabeled = session_token.encode_token({
+        "v": session_token.TOKEN_VERSION,
+        "sid": SESSION_ID,
+        "i": {"upiIds": ["scammer@paytm"]},
+    })
+    response = TestClient(app).post(
+        "/message",
+        json={"sessionId": SESSION_ID, "message": {"sender": "scammer", "text": "Hello", "timestamp": 1}},
+        headers={"x-api-key": "test-api-key", session_token.SESSION_TOKEN_HEADER: mislabeled},
+    )
+    assert response.status_code == 400
+    assert not session_store.session_exists(SESSION_ID)
+
+
+def test_expired_token_is_rejected(monkeypatch):
+    session_store.set_session_state(SESSION_ID, FSMState.SUSPICIOUS)
+    payload = session_token.export_session(SESSION_ID)
+    payload["iat"] -= session_token.SESSION_TOKEN_MAX_AGE_SECONDS + 1
+    with pytest.raises(session_token.InvalidSessionToken, match="expired"):
+        session_token.restore_session(SESSION_ID, session_token.encode_token(payload))
+
+    monkeypatch.setattr(session_token, "SESSION_TOKEN_MAX_AGE_SECONDS", 0)
+    session_token.restore_session(SESSION_ID, session_token.encode_token(payload))
+    assert session_store.get_session_state(SESSION_ID) == FSMState.SUSPICIOUS
+
+
+def test_stateless_startup_requires_a_secret(monkeypatch):
+    monkeypatch.setattr(session_token, "STATELESS_MODE", True)
+    monkeypatch.delenv("SESSION_TOKEN_SECRET")
+    with pytest.raises(RuntimeError):
+        with TestClient(app):
+            pass
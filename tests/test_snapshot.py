@@ -0,0 +1,191 @@
+import asyncio
+
+import pytest
+
+from app.core import session_store, snapshot
+from app.core.state_machine import FSMState
+from app.extraction import store as extraction_store
+from app.metrics import counters, ledger
+from app.callback import sender
+
+SESSION_ID = "test-snapshot-session"
+OTHER_SESSION_ID = "test-snapshot-other"
+
+
+def _reset():
+    for sid in (SESSION_ID, OTHER_SESSION_ID):
+        session_store.load_state({"sessions": {}, "terminated": []}, [sid])
+        extraction_store.delete_session_intelligence(sid)
+        counters.delete_counter(sid)
+        sender.clear_sent_session(sid)
+        ledger.delete_session_cost(sid)
+
+
+def setup_function():
+    _reset()
+
+
+def teardown_function():
+    _reset()
+
+
+def test_full_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "state.snap")
+    session_store.set_session_state(SESSION_ID, FSMState.INTEL_READY)
+    counters.increment_message_counter(SESSION_ID)
+    counters.increment_message_counter(SESSION_ID)
+    extraction_store.add_upi_id(SESSION_ID, "scammer@paytm")
+    ledger.record_llm_call("gemini-2.5-flash-lite", 120_000_000, True, 40, 12, session_id=SESSION_ID)
+    session_store.delete_session(OTHER_SESSION_ID)
+
+    snapshot.write_snapshot(path)
+    _reset()
+    snapshot.restore(path)
+
+    assert session_store.get_session_state(SESSION_ID) == FSMState.INTEL_READY
+    assert counters.get_message_count(SESSION_ID) == 2
+    assert extraction_store.get_all_intelligence(SESSION_ID)["upiIds"] == ["scammer@paytm"]
+    assert ledger.get_session_cost(SESSION_ID)["tokensIn"] == 40
+    assert session_store.is_session_terminated(OTHER_SESSION_ID)
+
+
+def test_journal_replays_changes_after_full_snapshot(tmp_path, monkeypatch):
+    path = str(tmp_path / "state.snap")
+    monkeypatch.setattr(snapshot, "_enabled", True)
+    session_store.set_session_state(SESSION_ID, FSMState.NORMAL)
+    snapshot.write_snapshot(path)
+
+    session_store.set_session_state(SESSION_ID, FSMState.AGENT_ENGAGED)
+    extraction_store.add_phone_number(SESSION_ID, "9876543210")
+    snapshot.mark_dirty(SESSION_ID)
+    assert asyncio.run(snapshot.flush(path)) == 1
+
+    # Cleanup after the frame must also be journaled (session removed on restore)
+    session_store.set_session_state(OTHER_SESSION_ID, FSMState.SUSPICIOUS)
+    snapshot.mark_dirty(OTHER_SESSION_ID)
+    asyncio.run(snapshot.flush(path))
+    session_store.delete_session(OTHER_SESSION_ID)
+    snapshot.mark_dirty(OTHER_SESSION_ID)
+    asyncio.run(snapshot.flush(path))
+
+    _reset()
+    snapshot.restore(path)
+
+    assert session_store.get_session_state(SESSION_ID) == FSMState.AGENT_ENGAGED
+    assert extraction_store.get_all_intelligence(SESSION_ID)["phoneNumbers"] == ["9876543210"]
+    assert session_store.is_session_terminated(OTHER_SESSION_ID)
+
+
+def test_truncated_journal_frame_is_ignored(tmp_path, monkeypatch):
+    path = str(tmp_path / "state.snap")
+    monkeypatch.setattr(snapshot, "_enabled", True)
+    session_store.set_session_state(SESSION_ID, FSMState.SUSPICIOUS)
+    snapshot.mark_dirty(SESSION_ID)
+    asyncio.run(snapshot.flush(path))
+
+    with open(path + snapshot.JOURNAL_SUFFIX, "ab") as f:
+        f.write(b"\x00\x00\x10\x00partial")
+
+    _reset()
+    snapshot.restore(path)
+    assert session_store.get_session_state(SESSION_ID) == FSMState.SUSPICIOUS
+
+
+def test_frames_older_than_the_snapshot_are_skipped(tmp_path, monkeypatch):
+    path = str(tmp_path / "state.snap")
+    monkeypatch.setattr(snapshot, "_enabled", True)
+    session_store.set_session_state(SESSION_ID, FSMState.SUSPICIOUS)
+    snapshot.mark_dirty(SESSION_ID)
+    asyncio.run(snapshot.flush(path))
+    with open(path + snapshot.JOURNAL_SUFFIX, "rb") as f:
+        stale_journal = f.read()
+
+    session_store.set_session_state(SESSION_ID, FSMState.AGENT_ENGAGED)
+    snapshot.write_snapshot(path)
+    # Crash between replacing the snapshot and removing the journal
+    with open(path + snapshot.JOURNAL_SUFFIX, "wb") as f:
+        f.write(stale_journal)
+
+    _reset()
+    snapshot.restore(path)
+    assert session_store.get_session_state(SESSION_ID) == FSMState.AGENT_ENGAGED
+
+    # Frames written after the restart follow the restored generation
+    session_store.set_session_state(SESSION_ID, FSMState.INTEL_READY)
+    snapshot.mark_dirty(SESSION_ID)
+    asyncio.run(snapshot.flush(path))
+    _reset()
+    snapshot.restore(path)
+    assert session_store.get_session_state(SESSION_ID) == FSMState.INTEL_READY
+
+
+def test_compaction_collects_in_chunks_between_loop_slices(tmp_path, monkeypatch):
+    path = str(tmp_path / "state.snap")
+    monkeypatch.setattr(snapshot, "_enabled", True)
+    monkeypatch.setattr(snapshot, "SNAPSHOT_COMPACT_EVERY", 0)
+    monkeypatch.setattr(snapshot, "SNAPSHOT_CHUNK_SESSIONS", 1)
+    session_store.set_session_state(SESSION_ID, FSMState.NORMAL)
+    counters.increment_message_counter(SESSION_ID)
+    session_store.delete_session(OTHER_SESSION_ID)
+    snapshot.mark_dirty(SESSION_ID)
+
+    chunks = []
+    collect_state = snapshot.collect_state
+    monkeypatch.setattr(
+        snapshot, "collect_state",
+        lambda session_ids=None: chunks.append(session_ids) or collect_state(session_ids),
+    )
+    asyncio.run(snapshot.flush(path))
+    assert None not in chunks
+    assert [SESSION_ID] in chunks and [OTHER_SESSION_ID] in chunks
+
+    _reset()
+    snapshot.restore(path)
+    assert session_store.get_session_state(SESSION_ID) == FSMState.NORMAL
+    assert counters.get_message_count(SESSION_ID) == 1
+    assert session_store.is_session_terminated(OTHER_SESSION_ID)
+
+
+def test_failed_journal_write_keeps_sessions_dirty(tmp_path, monkeypatch):
+    path = str(tmp_path / "state.snap")
+    monkeypatch.setattr(snapshot, "_enabled", True)
+    session_store.set_session_state(SESSION_ID, FSMState.SUSPICIOUS)
+    snapshot.mark_dirty(SESSION_ID)
+
+    def disk_error(path, frame):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(snapshot, "_append_journal", disk_error)
+    with pytest.raises(OSError):
+        asyncio.run(snapshot.flush(path))
+    monkeypatch.undo()
+
+    monkeypatch.setattr(snapshot, "_enabled", True)
+    assert asyncio.run(snapshot.flush(path)) == 1
+    _reset()
+    snapshot.restore(path)
+    assert session_store.get_session_state(SESSION_ID) == FSMState.SUSPICIOUS
+
+
+def test_failed_restore_starts_empty(tmp_path, monkeypatch):
+    path = str(tmp_path / "state.snap")
+    session_store.set_session_state(SESSION_ID, FSMState.SUSPICIOUS)
+    counters.increment_message_counter(SESSION_ID)
+    snapshot.write_snapshot(path)
+
+    def corrupt_journal(path):
+        raise ValueError("corrupt journal frame")
+        yield
+
+    monkeypatch.setattr(snapshot, "_read_journal", corrupt_journal)
+    monkeypatch.setattr(snapshot, "run_periodic", lambda *args: asyncio.sleep(0))
+
+    async def start():
+        await snapshot.start(path)
+        await snapshot._periodic_task
+
+    _reset()
+    asyncio.run(start())
+    monkeypatch.setattr(snapshot, "_enabled", False)
+    assert not session_store.session_exists(SESSION_ID)
+    assert counters.get_message_count(SESSION_ID) == 0
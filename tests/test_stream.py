@@ -0,0 +1,66 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.agent import llm_client
+from app.core import session_store
+from app.core.termination import cleanup_session
+
+SESSION_ID = "test-stream-session"
+HEADERS = {"x-api-key": "test-api-key"}
+SCAM_TEXT = "URGENT: share your bank account and OTP now or police will arrest you"
+
+
+def setup_function():
+    cleanup_session(SESSION_ID)
+    session_store.evict_session(SESSION_ID)
+
+
+def teardown_function():
+    setup_function()
+
+
+def _events(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        name, data = block.split("\n")
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def _post(text, timestamp):
+    return TestClient(app).post(
+        "/message/stream",
+        json={"sessionId": SESSION_ID, "message": {"sender": "scammer", "text": text, "timestamp": timestamp}},
+        headers=HEADERS,
+    )
+
+
+def test_stream_relays_gemini_chunks_then_envelope(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-api-key")
+    monkeypatch.setenv("GEMINI_API_KEY", "test-gemini-key")
+
+    def fake_stream(prompt, on_chunk):
+        for part in ("Oh no, ", "what should ", "I do now? "):
+            on_chunk(part)
+        return "Oh no, what should I do now?"
+
+    monkeypatch.setattr(llm_client, "stream_gemini", fake_stream)
+    response = _post(SCAM_TEXT, 1)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _events(response.text)
+    assert [name for name, _ in events] == ["chunk", "chunk", "chunk", "reply"]
+    assert "".join(data["text"] for _, data in events[:3]).strip() == events[-1][1]["reply"]
+    assert events[-1][1] == {"status": "success", "reply": "Oh no, what should I do now?"}
+
+
+def test_stream_sends_fallback_as_single_chunk(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-api-key")
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    events = _events(_post(SCAM_TEXT, 1).text)
+    assert [name for name, _ in events] == ["chunk", "reply"]
+    assert events[0][1]["text"] == events[1][1]["reply"]
+    assert any(events[0][1]["text"] in pool for pool in llm_client.FALLBACK_RESPONSES.values())
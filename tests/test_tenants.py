@@ -0,0 +1,138 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.agent import llm_client
+from app.core import session_store, snapshot, tenants
+from app.core.termination import cleanup_session
+from app.metrics import prometheus
+
+SESSIONS = ["test-tenant-a", "test-tenant-b"]
+
+
+def setup_function():
+    for sid in SESSIONS:
+        cleanup_session(sid)
+        session_store.evict_session(sid)
+    prometheus.reset()
+
+
+def teardown_function():
+    setup_function()
+
+
+def _use_key_file(monkeypatch, tmp_path, entries):
+    path = tmp_path / "keys.json"
+    path.write_text(json.dumps(entries))
+    monkeypatch.delenv("API_KEY", raising=False)
+    monkeypatch.delenv("API_KEYS", raising=False)
+    monkeypatch.setenv("API_KEYS_FILE", str(path))
+
+
+def _post(client, key, session_id, timestamp=1):
+    return client.post(
+        "/message",
+        headers={"x-api-key": key},
+        json={"sessionId": session_id, "message": {"sender": "scammer", "text": "Hello", "timestamp": timestamp}},
+    )
+
+
+def test_keys_get_their_own_rate_limit_and_session_cap(monkeypatch, tmp_path):
+    _use_key_file(monkeypatch, tmp_path, [
+        {"name": "acme", "key": "acme-key", "rps": 0.01, "burst": 1},
+        {"name": "globex", "key": "globex-key", "maxSessions": 1},
+    ])
+    client = TestClient(app)
+
+    assert _post(client, "acme-key", "test-tenant-a").status_code == 200
+    limited = _post(client, "acme-key", "test-tenant-a", 2)
+    assert limited.status_code == 429
+    assert int(limited.headers["retry-after"]) >= 1
+    assert _post(client, "unknown-key", "test-tenant-a").status_code == 401
+
+    cleanup_session("test-tenant-a")
+    session_store.evict_session("test-tenant-a")
+    assert _post(client, "globex-key", "test-tenant-a").status_code == 200
+    assert _post(client, "globex-key", "test-tenant-b").status_code == 429
+    assert tenants.session_count("globex") == 1
+    cleanup_session("test-tenant-a")
+    assert _post(client, "globex-key", "test-tenant-b").status_code == 200
+
+    assert prometheus.get_counter("honeypot_tenant_requests_total", tenant="acme", result="rate_limited") == 1
+    assert prometheus.get_counter("honeypot_tenant_requests_total", tenant="globex", result="session_cap") == 1
+    assert 'honeypot_tenant_sessions{tenant="globex"} 1' in prometheus.render()
+
+
+def test_llm_share_caps_a_key_below_the_model_limit(monkeypatch):
+    monkeypatch.setattr(llm_client, "_request_times", type(llm_client._request_times)(list))
+    monkeypatch.setattr(llm_client, "_tenant_request_times", type(llm_client._tenant_request_times)(list))
+    model = "gemini-2.5-flash-lite"
+    noisy = tenants.Tenant("noisy", llm_share=0.2)
+    token = tenants.current_tenant.set(noisy)
+    try:
+        allowed = 0
+        while llm_client._can_make_request(model):
+            llm_client._record_request(model)
+            allowed += 1
+    finally:
+        tenants.current_tenant.reset(token)
+    assert allowed == int(llm_client.MODEL_LIMITS[model] * 0.2)
+    # Another key still has the rest of the model's quota
+    assert llm_client._can_make_request(model)
+
+
+def test_sessions_stay_with_the_key_that_opened_them(monkeypatch):
+    monkeypatch.setenv("API_KEYS", "acme:acme-key,globex:globex-key")
+    tenants.load_registry()
+    client = TestClient(app)
+
+    assert _post(client, "acme-key", "test-tenant-a").status_code == 200
+    foreign = _post(client, "globex-key", "test-tenant-a", 2)
+    assert foreign.status_code == 403
+    assert _post(client, "acme-key", "test-tenant-a", 3).status_code == 200
+    assert prometheus.get_counter("honeypot_tenant_requests_total", tenant="globex", result="foreign_session") == 1
+
+
+def test_idle_sessions_stop_counting_against_the_cap(monkeypatch):
+    globex = tenants.Tenant("globex", max_sessions=1)
+    now = [1000.0]
+    monkeypatch.setattr(tenants.time, "time", lambda: now[0])
+    monkeypatch.setattr(tenants, "TENANT_SESSION_IDLE_SECONDS", 60)
+
+    assert tenants.claim_session(globex, "test-tenant-a")
+    assert not tenants.claim_session(globex, "test-tenant-b")
+    now[0] += 61
+    assert tenants.session_count("globex") == 0
+    assert tenants.claim_session(globex, "test-tenant-b")
+    # The idle session keeps its owner and is counted again on its next turn
+    assert not tenants.owns_session(tenants.Tenant("acme"), "test-tenant-a")
+    assert not tenants.claim_session(globex, "test-tenant-a")
+
+
+def test_session_owners_are_snapshotted(tmp_path):
+    path = str(tmp_path / "state.snap")
+    globex = tenants.Tenant("globex", max_sessions=1)
+    session_store.create_session("test-tenant-a")
+    assert tenants.claim_session(globex, "test-tenant-a")
+
+    snapshot.write_snapshot(path)
+    tenants.release_session("test-tenant-a")
+    snapshot.restore(path)
+
+    assert tenants.session_count("globex") == 1
+    assert not tenants.owns_session(tenants.Tenant("acme"), "test-tenant-a")
+    assert not tenants.claim_session(globex, "test-tenant-b")
+
+
+def test_tiny_llm_share_still_allows_one_request(monkeypatch):
+    monkeypatch.setattr(llm_client, "_request_times", type(llm_client._request_times)(list))
+    monkeypatch.setattr(llm_client, "_tenant_request_times", type(llm_client._tenant_request_times)(list))
+    model = "gemini-2.5-flash-lite"
+    token = tenants.current_tenant.set(tenants.Tenant("tiny", llm_share=0.01))
+    try:
+        assert llm_client._can_make_request(model)
+        llm_client._record_request(model)
+        assert not llm_client._can_make_request(model)
+    finally:
+        tenants.current_tenant.reset(token)
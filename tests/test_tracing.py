@@ -0,0 +1,68 @@
+import asyncio
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api import routes
+from app.api.schemas import IncomingRequest
+from app.core import session_store
+from app.core.termination import cleanup_session
+from app.utils import tracing
+
+SESSION_ID = "test-tracing-session"
+SCAM_TEXT = "URGENT: share your bank account and OTP now or police will arrest you"
+
+
+def setup_function():
+    cleanup_session(SESSION_ID)
+    session_store.evict_session(SESSION_ID)
+    tracing.clear()
+
+
+def teardown_function():
+    setup_function()
+
+
+def _names(span_dict):
+    yield span_dict["name"]
+    for child in span_dict["children"]:
+        yield from _names(child)
+
+
+def test_sampled_turn_records_span_tree(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+    request = IncomingRequest(
+        sessionId=SESSION_ID,
+        message={"sender": "scammer", "text": SCAM_TEXT, "timestamp": 1},
+    )
+    with patch.object(routes.llm_client, "should_use_gemini", return_value=False):
+        asyncio.run(routes.handle_message(request))
+
+    (trace,) = tracing.export_json()
+    names = list(_names(trace))
+    assert trace["attributes"]["session_id"] == SESSION_ID
+    assert {"message", "detection", "store.set_session_state", "llm"} <= set(names)
+
+    chrome = tracing.export_chrome()
+    assert len(chrome["traceEvents"]) == len(names)
+    assert all(e["ph"] == "X" for e in chrome["traceEvents"])
+
+
+def test_unsampled_turns_record_nothing(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0.0)
+    request = IncomingRequest(
+        sessionId=SESSION_ID,
+        message={"sender": "scammer", "text": "Hello", "timestamp": 1},
+    )
+    asyncio.run(routes.handle_message(request))
+    assert tracing.export_json() == []
+
+
+def test_trace_endpoint_requires_admin_key(monkeypatch):
+    monkeypatch.setenv("ADMIN_API_KEY", "test-admin-key")
+    client = TestClient(app)
+    assert client.get("/debug/traces", headers={"x-api-key": "nope"}).status_code == 401
+    response = client.get("/debug/traces?format=chrome", headers={"x-api-key": "test-admin-key"})
+    assert response.status_code == 200
+    assert "traceEvents" in response.json()
@@ -0,0 +1,84 @@
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from app.main import app
+from app.api import ws
+from app.core import history_store, session_store
+from app.core.termination import cleanup_session
+from app.metrics import counters
+
+SESSION_ID = "test-ws-session"
+HEADERS = {"x-api-key": "test-api-key"}
+
+
+def setup_function():
+    cleanup_session(SESSION_ID)
+    session_store.evict_session(SESSION_ID)
+
+
+def teardown_function():
+    setup_function()
+
+
+def test_websocket_channel_keeps_history_server_side(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-api-key")
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    client = TestClient(app)
+
+    with client.websocket_connect(f"/ws?sessionId={SESSION_ID}", headers=HEADERS) as channel:
+        channel.send_json({"message": {"sender": "scammer", "text": "Hello, this is your bank", "timestamp": 1}})
+        assert channel.receive_json()["status"] == "success"
+        channel.send_json({"message": {"sender": "scammer"}})
+        assert channel.receive_json()["error"]["code"] == 422
+        channel.send_json({"sessionId": "someone-else", "message": {"sender": "scammer", "text": "hi", "timestamp": 2}})
+        assert channel.receive_json()["error"]["code"] == 422
+        channel.send_json({"message": {"sender": "scammer", "text": "Share your OTP now", "timestamp": 3}})
+        assert channel.receive_json()["status"] == "success"
+
+    assert counters.get_message_count(SESSION_ID) == 2
+    assert history_store.get_position(SESSION_ID)[0] == 4
+    assert ws.open_connection_count() == 0
+
+
+def test_websocket_rejects_bad_key_and_closes_idle_channels(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-api-key")
+    client = TestClient(app)
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with client.websocket_connect(f"/ws?sessionId={SESSION_ID}", headers={"x-api-key": "wrong"}):
+            pass
+    assert exc.value.code == ws.CLOSE_POLICY
+
+    monkeypatch.setattr(ws, "WS_IDLE_TIMEOUT_SECONDS", 0.05)
+    with client.websocket_connect(f"/ws?sessionId={SESSION_ID}", headers=HEADERS) as channel:
+        with pytest.raises(WebSocketDisconnect) as exc:
+            channel.receive_json()
+    assert exc.value.code == ws.CLOSE_GOING_AWAY
+
+
+def test_connection_is_counted_before_the_handshake_completes(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-api-key")
+    counted_during_accept = []
+    accept = WebSocket.accept
+
+    async def observing_accept(self, *args, **kwargs):
+        counted_during_accept.append(ws.open_connection_count())
+        await accept(self, *args, **kwargs)
+
+    monkeypatch.setattr(WebSocket, "accept", observing_accept)
+    with TestClient(app).websocket_connect(f"/ws?sessionId={SESSION_ID}", headers=HEADERS):
+        pass
+    assert counted_during_accept == [1]
+    assert ws.open_connection_count() == 0
+
+
+def test_frame_limit_counts_utf8_bytes(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-api-key")
+    monkeypatch.setattr(ws, "WS_MAX_FRAME_BYTES", 400)
+    # 150 characters, 450 bytes in UTF-8
+    text = "क" * 150
+    with TestClient(app).websocket_connect(f"/ws?sessionId={SESSION_ID}", headers=HEADERS) as channel:
+        channel.send_text(text)
+        with pytest.raises(WebSocketDisconnect) as exc:
+            channel.receive_json()
+    assert exc.value.code == ws.CLOSE_TOO_BIG